@@ -1,2 +1,17 @@
-from backend.db import get_connection
-from backend.utils.email_utils import send_email_otp
\ No newline at end of file
+from backend.settings import load_env
+
+# Load .env before any backend module reads its settings from the environment
+# at import time (db_config, email_utils, ...). Nothing else is imported here,
+# so `python -m backend.<tool>` and the WSGI/ASGI entry points only load what
+# they use; the old package-level names resolve lazily.
+load_env()
+
+
+def __getattr__(name):
+    if name == "get_connection":
+        from backend.db import get_connection
+        return get_connection
+    if name == "send_email_otp":
+        from backend.utils.email_utils import send_email_otp
+        return send_email_otp
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
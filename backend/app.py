@@ -1,22 +1,108 @@
-from flask import Flask, send_from_directory
+import hmac
+import os
+import secrets
+
+from flask import Flask, Response, current_app, jsonify, request, session
 from flask_cors import CORS
+
+from backend.db import pool_stats
 from backend.routes import auth_bp, bookings_bp, feedback_bp, admin_bp, staff_bp, services_bp
+from backend.utils import assets, cache, metrics, slowlog, staff_directory
+from backend.utils.email_utils import email_queue_stats
+
+# create_app() builds a configured application:
+#   development:  python -m backend.app
+#   production:   gunicorn -c backend/gunicorn.conf.py backend.wsgi:app
+# Outside debug mode SECRET_KEY must be set (in .env or the environment).
+# `from backend.app import app` still works and builds the app on first use.
+# The operational endpoints (/db/pool-stats, /email/queue-stats, /metrics)
+# need an admin session or METRICS_TOKEN.
+
+
+def _ops_forbidden():
+    # An admin session, or "Authorization: Bearer <METRICS_TOKEN>" for
+    # scrapers that can't log in. None when allowed.
+    token = current_app.config.get("METRICS_TOKEN")
+    given = request.headers.get("Authorization", "")
+    if token and hmac.compare_digest(given.encode("utf-8"), f"Bearer {token}".encode("utf-8")):
+        return None
+    if (session.get("role") or "").lower() == "admin":
+        return None
+    return jsonify({"error": "Admin access required"}), 403
+
+
+def create_app(config=None):
+    app = Flask(__name__)
+    app.config["SECRET_KEY"] = os.getenv("SECRET_KEY")
+    app.config["METRICS_TOKEN"] = os.getenv("METRICS_TOKEN")
+    app.config["ASSET_WARMUP"] = os.getenv("ASSET_WARMUP", "1").strip().lower() in ("1", "true", "yes", "on")
+    app.config["STAFF_DIRECTORY_WARMUP"] = os.getenv("STAFF_DIRECTORY_WARMUP", "1").strip().lower() in ("1", "true", "yes", "on")
+    app.config.update(config or {})
+    if not app.config["SECRET_KEY"]:
+        # A per-process key would log users out on every restart and, with
+        # more than one worker, on every request that lands on another one.
+        if not (app.debug or app.testing):
+            raise RuntimeError("SECRET_KEY is not set; every worker must be started with the same SECRET_KEY")
+        print("SECRET_KEY is not set; using a random key for this debug process")
+        app.config["SECRET_KEY"] = secrets.token_hex(32)
+
+    CORS(app, supports_credentials=True)
+    metrics.init_app(app)
+    slowlog.init()
+    metrics.add_gauge_source("db_pool", pool_stats)
+    metrics.add_gauge_source("email_queue", email_queue_stats)
+    metrics.add_gauge_source("response_cache", cache.cache_stats)
+    if app.config["ASSET_WARMUP"]:
+        assets.warm_async()
+    if app.config["STAFF_DIRECTORY_WARMUP"]:
+        staff_directory.warm()
+
+    @app.route('/assets/<path:filename>')
+    def serve_assets(filename):
+        return assets.send_asset(filename)
+
+    @app.route('/db/pool-stats')
+    def db_pool_stats():
+        denied = _ops_forbidden()
+        if denied:
+            return denied
+        return jsonify(pool_stats())
+
+    @app.route('/email/queue-stats')
+    def email_queue_stats_view():
+        denied = _ops_forbidden()
+        if denied:
+            return denied
+        return jsonify(email_queue_stats())
+
+    @app.route('/metrics')
+    def metrics_view():
+        denied = _ops_forbidden()
+        if denied:
+            return denied
+        return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
+
+    # Register blueprints with clear prefixes
+    app.register_blueprint(auth_bp, url_prefix="/auth")
+    app.register_blueprint(bookings_bp, url_prefix="/bookings")
+    app.register_blueprint(feedback_bp, url_prefix="/feedback")
+    app.register_blueprint(admin_bp, url_prefix="/admin")
+    app.register_blueprint(staff_bp, url_prefix="/staff")
+    app.register_blueprint(services_bp, url_prefix="/services")
+    return app
+
+
+_app = None
 
-app = Flask(__name__)
-CORS(app, supports_credentials=True)
-app.secret_key = "supersecretkey"  # use .env in production
 
-@app.route('/assets/<path:filename>')
-def serve_assets(filename):
-    return send_from_directory('../marmu-react/public/assets', filename)
+def __getattr__(name):
+    global _app
+    if name == "app":
+        if _app is None:
+            _app = create_app()
+        return _app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-# Register blueprints with clear prefixes
-app.register_blueprint(auth_bp, url_prefix="/auth")
-app.register_blueprint(bookings_bp, url_prefix="/bookings")
-app.register_blueprint(feedback_bp, url_prefix="/feedback")
-app.register_blueprint(admin_bp, url_prefix="/admin")
-app.register_blueprint(staff_bp, url_prefix="/staff")
-app.register_blueprint(services_bp, url_prefix="/services")
 
 if __name__ == "__main__":
-    app.run(debug=True)
+    create_app({"DEBUG": True}).run(debug=True)
@@ -0,0 +1,206 @@
+import os
+import re
+import time
+from urllib.parse import parse_qsl, urlencode
+
+from werkzeug.datastructures import Headers, MultiDict
+from werkzeug.http import parse_etags, quote_etag
+
+from backend import db_async
+from backend.app import app as flask_app
+from backend.routes import admin, bookings, feedback
+from backend.utils import metrics
+from backend.utils.availability import compute_availability_async, mask_to_times
+from backend.utils.pagination import CursorError, paginate_query_async
+
+try:
+    from asgiref.sync import ThreadSensitiveContext
+    from asgiref.wsgi import WsgiToAsgi
+except ImportError:
+    raise ImportError("ASGI mode needs asgiref: pip install -r backend/requirements-asgi.txt")
+
+# ASGI deployment mode:
+#
+#   SECRET_KEY=... uvicorn backend.asgi:app --workers 4
+#
+# The read-heavy, I/O-bound GET endpoints below run as coroutines on the
+# event loop against an aiomysql pool (backend/db_async.py), so a request
+# waiting on MySQL costs a suspended coroutine instead of a worker thread.
+# Every other route, and all of them when aiomysql is not installed or
+# ASGI_NATIVE=0, is the unchanged Flask app behind asgiref's WSGI adapter;
+# each of those requests gets its own thread (ThreadSensitiveContext), as
+# under a threaded WSGI server. The async handlers reuse the Flask views'
+# argument parsing, SQL and response shaping, so both modes answer alike.
+
+ASGI_NATIVE = os.getenv("ASGI_NATIVE", "1").strip().lower() in ("1", "true", "yes", "on")
+if ASGI_NATIVE and not db_async.available():
+    print("aiomysql is not installed; every route is served through the WSGI adapter")
+
+_wsgi = WsgiToAsgi(flask_app)
+
+
+class AsyncRequest:
+    def __init__(self, scope):
+        self.method = scope["method"]
+        self.path = scope["path"]
+        self.args = MultiDict(parse_qsl(scope.get("query_string", b"").decode("latin-1"), keep_blank_values=True))
+        self.headers = Headers([(k.decode("latin-1"), v.decode("latin-1")) for k, v in scope.get("headers", [])])
+
+
+# Handlers return (status, body, headers); a body that is not bytes is sent
+# as JSON through the Flask app's JSON provider, like jsonify().
+
+async def available_slots(request):
+    try:
+        lookup = bookings._available_slots_args(request.args)
+    except ValueError as e:
+        return 400, {"error": str(e)}, []
+    if lookup is None:
+        return 200, {"available_times": []}, []
+    day, staff_id = lookup
+    async with db_async.async_cursor() as cursor:
+        masks = await compute_availability_async(cursor, [staff_id], day, day)
+    return 200, {"available_times": mask_to_times(masks[staff_id][day])}, []
+
+
+async def availability(request):
+    try:
+        start_day, end_day, staff_ids = bookings._availability_args(request.args)
+    except ValueError as e:
+        return 400, {"error": str(e)}, []
+    async with db_async.async_cursor() as cursor:
+        masks = await compute_availability_async(cursor, staff_ids, start_day, end_day)
+    return 200, bookings._availability_body(start_day, end_day, masks), []
+
+
+async def user_appointments(request, username):
+    try:
+        async with db_async.async_cursor(dictionary=True) as cursor:
+            await cursor.execute(bookings.USER_CLIENT_SQL, (username,))
+            user = await cursor.fetchone()
+            if not user:
+                return 404, {"error": "User not found"}, []
+            await cursor.execute(bookings.USER_APPOINTMENTS_SQL, (user["client_id"],))
+            rows = await cursor.fetchall()
+    except Exception as e:
+        return 500, {"error": str(e)}, []
+    return 200, bookings._format_appointments(rows), []
+
+
+async def feedback_feed(request):
+    # Shares the page cache with the sync view.
+    per_page = feedback._feed_per_page(request.args)
+    token = request.args.get("cursor") or None
+    key = (token or "", per_page)
+    page, versions = feedback._cached_page(key)
+    if page is None:
+        try:
+            statement, params, state = feedback._feed_statement(token, per_page)
+        except CursorError as e:
+            return 400, {"error": str(e)}, []
+        async with db_async.async_cursor(dictionary=True) as cursor:
+            await cursor.execute(statement, params)
+            rows = await cursor.fetchall()
+        page = feedback._store_page(key, feedback._page_from_rows(rows, state), versions)
+
+    headers = [("Content-Type", "application/json"), ("ETag", quote_etag(page["etag"])),
+               ("Cache-Control", "public, no-cache"), ("Access-Control-Expose-Headers", "X-Next-Cursor, Link")]
+    if page["next_cursor"]:
+        next_url = "/feedback?" + urlencode({"cursor": page["next_cursor"], "per_page": per_page})
+        headers += [("X-Next-Cursor", page["next_cursor"]), ("Link", f'<{next_url}>; rel="next"')]
+    if parse_etags(request.headers.get("If-None-Match")).contains(page["etag"]):
+        return 304, b"", headers
+    return 200, page["body"], headers
+
+
+def _admin_list(build_query):
+    async def handler(request):
+        try:
+            async with db_async.async_cursor(dictionary=True) as cursor:
+                result = await paginate_query_async(cursor, request.args, **build_query(request.args))
+        except CursorError as e:
+            return 400, {"error": str(e)}, []
+        return 200, result, []
+    return handler
+
+
+# (method, path pattern, Flask rule used as the metrics label, handler)
+ROUTES = [
+    ("GET", r"/bookings/available_slots", "/bookings/available_slots", available_slots),
+    ("GET", r"/bookings/availability", "/bookings/availability", availability),
+    ("GET", r"/bookings/user/(?P<username>[^/]+)", "/bookings/user/<username>", user_appointments),
+    ("GET", r"/feedback", "/feedback", feedback_feed),
+    ("GET", r"/admin/users", "/admin/users", _admin_list(admin._users_query)),
+    ("GET", r"/admin/appointments", "/admin/appointments", _admin_list(admin._appointments_query)),
+    ("GET", r"/admin/feedback", "/admin/feedback", _admin_list(admin._feedback_query)),
+]
+_routes = [(method, re.compile(f"^{pattern}$"), rule, handler) for method, pattern, rule, handler in ROUTES]
+
+
+def _match(method, path):
+    for route_method, pattern, rule, handler in _routes:
+        if route_method == method:
+            match = pattern.match(path)
+            if match:
+                return rule, handler, match.groupdict()
+    return None
+
+
+def _cors_headers(request):
+    # Mirrors CORS(app, supports_credentials=True) for simple requests;
+    # preflights (OPTIONS) are not routed here and reach flask-cors.
+    origin = request.headers.get("Origin")
+    if not origin:
+        return []
+    return [("Access-Control-Allow-Origin", origin), ("Access-Control-Allow-Credentials", "true"),
+            ("Vary", "Origin")]
+
+
+async def _respond(send, status, body, headers):
+    if not isinstance(body, bytes):
+        body = (flask_app.json.dumps(body, separators=(",", ":")) + "\n").encode("utf-8")
+        headers = [("Content-Type", "application/json")] + headers
+    if status == 304:
+        body = b""
+    else:
+        headers = headers + [("Content-Length", str(len(body)))]
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(k.lower().encode("latin-1"), v.encode("latin-1")) for k, v in headers],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+async def _lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            await db_async.close_async_pool()
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def app(scope, receive, send):
+    if scope["type"] == "lifespan":
+        return await _lifespan(receive, send)
+
+    route = None
+    if scope["type"] == "http" and ASGI_NATIVE and db_async.available():
+        route = _match(scope["method"], scope["path"])
+    if route is None:
+        async with ThreadSensitiveContext():
+            return await _wsgi(scope, receive, send)
+
+    rule, handler, path_params = route
+    request = AsyncRequest(scope)
+    started = time.perf_counter()
+    try:
+        status, body, headers = await handler(request, **path_params)
+    except Exception as e:
+        print(f"Error in {rule}:", e)
+        status, body, headers = 500, {"error": "Internal Server Error"}, []
+    await _respond(send, status, body, headers + _cors_headers(request))
+    metrics.REQUEST_SECONDS.observe((rule, request.method, str(status)), time.perf_counter() - started)
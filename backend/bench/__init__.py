@@ -0,0 +1,40 @@
+import os
+import sys
+
+# The benchmark tools seed, rewrite and delete rows, so they only ever run
+# against a database whose name ends in BENCH_DB_SUFFIX, and they point the
+# app at it explicitly instead of relying on DB_NAME being read after they
+# set it (backend.db_config may already have been imported by then).
+
+BENCH_DB_SUFFIX = "_bench"
+
+
+def require_bench_name(database):
+    if not database or not database.endswith(BENCH_DB_SUFFIX):
+        sys.exit(f"Refusing to run against database {database!r}: "
+                 f"benchmark databases must be named *{BENCH_DB_SUFFIX}")
+
+
+def use_bench_database(database):
+    # Makes every connection this process opens (pool, dedicated, async)
+    # use `database`, whatever was imported first. Returns DB_CONFIG.
+    require_bench_name(database)
+    os.environ["DB_NAME"] = database
+    from backend.db import reset_pool
+    from backend.db_config import DB_CONFIG
+
+    DB_CONFIG["database"] = database
+    reset_pool()
+    return DB_CONFIG
+
+
+def check_bench_connection(conn):
+    # Last line of defence before anything destructive: ask the server.
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT DATABASE()")
+        (current,) = cursor.fetchone()
+    finally:
+        cursor.close()
+    require_bench_name(current)
+    return current
@@ -0,0 +1,164 @@
+import argparse
+import http.client
+import os
+import random
+import shutil
+import subprocess
+import sys
+import threading
+import time
+from datetime import date, timedelta
+
+# Concurrent-request capacity of the two serving modes on the same hardware:
+#
+#   wsgi: gunicorn, one worker with --threads N (the usual deployment); falls
+#         back to the threaded werkzeug server when gunicorn is missing
+#   asgi: uvicorn backend.asgi:app, one worker (needs asgiref, aiomysql, uvicorn)
+#
+# Each server is started as a subprocess against the benchmark database, then
+# driven over real HTTP at increasing client concurrency with the I/O-bound
+# GET endpoints that backend/asgi.py serves natively.
+#
+#   python -m backend.bench.asgi_compare --setup
+#   python -m backend.bench.asgi_compare --concurrency 8 32 128 --threads 8
+
+BENCH_DB_NAME = os.getenv("BENCH_DB_NAME", "marmudb_bench")
+
+
+def request_paths(rng, staff, clients):
+    today = date.today()
+
+    def open_day():
+        day = today + timedelta(days=rng.randint(0, 30))
+        return day if day.weekday() != 6 else day + timedelta(days=1)
+
+    def week():
+        start = open_day()
+        return f"/bookings/availability?start={start}&end={start + timedelta(days=6)}&staff_id=1,2,3"
+
+    makers = [
+        lambda: f"/bookings/available_slots?date={open_day()}&staff_id={rng.randint(1, staff)}",
+        week,
+        lambda: f"/bookings/user/user{rng.randrange(clients)}",
+        lambda: "/feedback?per_page=20",
+        lambda: "/admin/appointments?cursor=&per_page=20&sort=date_desc&total=cached",
+    ]
+    return lambda: rng.choice(makers)()
+
+
+def start_server(mode, port, threads, env):
+    if mode == "asgi":
+        cmd = [sys.executable, "-m", "uvicorn", "backend.asgi:app", "--port", str(port), "--workers", "1",
+               "--log-level", "warning", "--no-access-log"]
+    elif shutil.which("gunicorn"):
+        cmd = ["gunicorn", "backend.app:app", "-b", f"127.0.0.1:{port}", "-w", "1", "-k", "gthread",
+               "--threads", str(threads), "--log-level", "warning"]
+    else:
+        print("gunicorn not installed: using the threaded werkzeug server (one thread per connection)")
+        cmd = [sys.executable, "-c",
+               "from werkzeug.serving import run_simple; from backend.app import app; "
+               f"run_simple('127.0.0.1', {port}, app, threaded=True)"]
+    process = subprocess.Popen(cmd, env=env, stdout=subprocess.DEVNULL)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=2)
+            conn.request("GET", "/db/pool-stats")
+            conn.getresponse().read()
+            conn.close()
+            return process
+        except OSError:
+            if process.poll() is not None:
+                raise RuntimeError(f"{mode} server exited with {process.returncode}")
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError(f"{mode} server did not come up on port {port}")
+
+
+def drive(port, next_path, requests, concurrency, timeout):
+    latencies, statuses = [], {}
+    lock = threading.Lock()
+    remaining = iter(range(requests))
+
+    def worker():
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=timeout)
+        while True:
+            with lock:
+                if next(remaining, None) is None:
+                    break
+                path = next_path()
+            started = time.perf_counter()
+            try:
+                conn.request("GET", path)
+                response = conn.getresponse()
+                response.read()
+                status = response.status
+            except OSError:
+                conn.close()
+                conn = http.client.HTTPConnection("127.0.0.1", port, timeout=timeout)
+                status = "error"
+            elapsed = time.perf_counter() - started
+            with lock:
+                latencies.append(elapsed)
+                statuses[status] = statuses.get(status, 0) + 1
+        conn.close()
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return latencies, statuses, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare WSGI and ASGI serving under concurrent load")
+    parser.add_argument("--database", default=BENCH_DB_NAME)
+    parser.add_argument("--setup", action="store_true", help="(re)create and seed the benchmark database")
+    parser.add_argument("--staff", type=int, default=8)
+    parser.add_argument("--clients", type=int, default=5000)
+    parser.add_argument("--mode", action="append", choices=["wsgi", "asgi"], help="default: both")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[8, 32, 128])
+    parser.add_argument("--requests", type=int, default=2000, help="requests per concurrency level")
+    parser.add_argument("--threads", type=int, default=8, help="WSGI worker threads")
+    parser.add_argument("--port", type=int, default=5077)
+    parser.add_argument("--timeout", type=float, default=30)
+    args = parser.parse_args()
+
+    os.environ.setdefault("EMAIL_ASYNC", "1")
+    os.environ.setdefault("SECRET_KEY", "bench")
+    from backend.bench import use_bench_database
+    from backend.bench.run import percentile
+    # Also sets DB_NAME for the servers started below.
+    DB_CONFIG = use_bench_database(args.database)
+
+    if args.setup:
+        from backend.bench import dataset
+        print(f"Seeding {args.database} ...")
+        dataset.build(DB_CONFIG, args.database, clients=args.clients, staff=args.staff)
+
+    env = dict(os.environ)
+    results = []
+    for mode in args.mode or ["wsgi", "asgi"]:
+        process = start_server(mode, args.port, args.threads, env)
+        try:
+            for concurrency in args.concurrency:
+                next_path = request_paths(random.Random(7), args.staff, args.clients)
+                drive(args.port, next_path, concurrency * 2, concurrency, args.timeout)  # warm-up
+                latencies, statuses, elapsed = drive(args.port, next_path, args.requests, concurrency,
+                                                     args.timeout)
+                results.append((mode, concurrency, len(latencies) / elapsed, latencies, statuses))
+        finally:
+            process.terminate()
+            process.wait(timeout=10)
+
+    print(f"{'mode':<6} {'conc':>5} {'rps':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}  statuses")
+    for mode, concurrency, rps, latencies, statuses in results:
+        print(f"{mode:<6} {concurrency:>5} {rps:>8.1f} {percentile(latencies, 50) * 1000:>9.1f} "
+              f"{percentile(latencies, 95) * 1000:>9.1f} {percentile(latencies, 99) * 1000:>9.1f}  "
+              f"{dict(sorted(statuses.items(), key=str))}")
+
+
+if __name__ == "__main__":
+    main()
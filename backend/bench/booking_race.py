@@ -0,0 +1,241 @@
+import argparse
+import os
+import sys
+import threading
+import time
+from datetime import date, timedelta
+
+# Concurrency check for POST /bookings. Fires groups of simultaneous requests
+# at the benchmark database and then verifies from the table itself that:
+#
+#   * slot race:  N different clients booking the same artist/day/time get
+#                 exactly one 201, the rest 409, and one active row exists;
+#   * quota race: one client booking N different slots at once gets at most
+#                 one 201 (the two-week quota is enforced in the transaction);
+#   * rollup:     tbl_appointment_daily for the race days matches a fresh
+#                 aggregate of tbl_appointment.
+#
+# Contenders for a slot spell its time differently ("14:00", "2:00 PM",
+# "02:00 PM", "14:00:00"), as the frontend and API clients do, so a unique
+# key on the raw time string alone would let them all through.
+#
+#   python -m backend.bench.booking_race --setup       # build + seed first
+#   python -m backend.bench.booking_race --slots 50 --contenders 12
+
+BENCH_DB_NAME = os.getenv("BENCH_DB_NAME", "marmudb_bench")
+RACE_PREFIX = "race"
+
+
+def race_day(offset):
+    # Past the seeded bookings (dataset.seed books at most 60 days ahead).
+    day = date.today() + timedelta(days=offset)
+    return day if day.weekday() != 6 else day + timedelta(days=1)
+
+
+def create_clients(conn, count):
+    from backend.bench.dataset import BENCH_PASSWORD
+    from backend.utils.security import hash_password
+
+    password_hash = hash_password(BENCH_PASSWORD)
+    run = int(time.time())
+    cursor = conn.cursor()
+    usernames = []
+    for i in range(count):
+        username = f"{RACE_PREFIX}{run}_{i}"
+        cursor.execute("INSERT INTO tbl_accounts (username, email, hash_pass, role) VALUES (%s, %s, %s, 'User')",
+                       (username, f"{username}@gmail.com", password_hash))
+        cursor.execute("INSERT INTO tbl_clients (account_id, fullname) VALUES (%s, %s)",
+                       (cursor.lastrowid, f"Race Client {i}"))
+        usernames.append(username)
+    conn.commit()
+    cursor.close()
+    return usernames
+
+
+def fire(app, bodies):
+    # Sends every body at once (one thread each, released by a barrier).
+    results = [None] * len(bodies)
+    barrier = threading.Barrier(len(bodies))
+
+    def worker(i):
+        client = app.test_client()
+        barrier.wait()
+        started = time.perf_counter()
+        response = client.post("/bookings", json=bodies[i])
+        results[i] = (response.status_code, time.perf_counter() - started)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(len(bodies))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results
+
+
+def spellings(hour):
+    twelve = f"{hour % 12 or 12}:00 {'AM' if hour < 12 else 'PM'}"
+    return [f"{hour}:00", twelve, twelve.zfill(8), f"{hour:02d}:00:00"]
+
+
+def booking(username, staff_id, day, time_text):
+    return {"username": username, "fullname": username, "service": "Haircut", "date": day.isoformat(),
+            "time": time_text, "staff_id": staff_id, "remarks": "race"}
+
+
+def active_bookings(conn, day):
+    # (artist_id, minute of day, user_id) for every active booking that day.
+    from backend.utils.slots import row_minute
+
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT artist_id, time_minute, time, user_id FROM tbl_appointment
+        WHERE appointment_date=%s AND (status IS NULL OR status <> 'Cancelled')
+    """, (day,))
+    rows = [(artist_id, row_minute(minute, text), user_id) for artist_id, minute, text, user_id in cursor.fetchall()]
+    cursor.close()
+    return rows
+
+
+def rollup_drift(conn, days):
+    # Rows where the maintained daily rollup disagrees with the raw table.
+    placeholders = ", ".join(["%s"] * len(days))
+    cursor = conn.cursor()
+    cursor.execute(f"""
+        SELECT day, service, artist_id, status, SUM(n) AS drift FROM (
+            SELECT day, service, artist_id, status, appointments AS n
+            FROM tbl_appointment_daily WHERE day IN ({placeholders})
+            UNION ALL
+            SELECT appointment_date, COALESCE(service, ''), COALESCE(artist_id, 0), COALESCE(status, 'Pending'),
+                   -COUNT(*)
+            FROM tbl_appointment WHERE appointment_date IN ({placeholders})
+            GROUP BY appointment_date, COALESCE(service, ''), COALESCE(artist_id, 0), COALESCE(status, 'Pending')
+        ) t
+        GROUP BY day, service, artist_id, status
+        HAVING SUM(n) <> 0
+    """, (*days, *days))
+    rows = cursor.fetchall()
+    cursor.close()
+    return rows
+
+
+def cleanup(conn, days):
+    from backend.bench import check_bench_connection
+    from backend.utils import counters, reports
+
+    check_bench_connection(conn)
+    cursor = conn.cursor()
+    cursor.execute(f"DELETE FROM tbl_appointment WHERE appointment_date IN ({', '.join(['%s'] * len(days))})",
+                   tuple(days))
+    cursor.execute("""
+        DELETE c, a FROM tbl_clients c JOIN tbl_accounts a ON c.account_id=a.id
+        WHERE a.username LIKE %s
+    """, (RACE_PREFIX + "%",))
+    conn.commit()
+    cursor.close()
+    counters.reconcile(conn)
+    for day in days:
+        reports.backfill(conn, day, day)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that concurrent bookings never double-book")
+    parser.add_argument("--database", default=BENCH_DB_NAME)
+    parser.add_argument("--setup", action="store_true", help="(re)create and seed the benchmark database")
+    parser.add_argument("--staff", type=int, default=8, help="staff ids 1..N exist in the dataset")
+    parser.add_argument("--slots", type=int, default=40, help="contested slots in the slot race")
+    parser.add_argument("--contenders", type=int, default=12, help="simultaneous requests per group")
+    parser.add_argument("--clients", type=int, default=10, help="clients in the quota race")
+    parser.add_argument("--keep", action="store_true", help="leave the race bookings in the database")
+    args = parser.parse_args()
+
+    os.environ.setdefault("EMAIL_ASYNC", "1")
+    os.environ.setdefault("SECRET_KEY", "bench")
+    import mysql.connector
+    from backend.bench import check_bench_connection, dataset, use_bench_database
+    DB_CONFIG = use_bench_database(args.database)
+    from backend.bench.run import percentile
+
+    if args.setup:
+        print(f"Seeding {args.database} ...")
+        dataset.build(DB_CONFIG, args.database, staff=args.staff)
+
+    from backend.app import app
+    conn = mysql.connector.connect(**DB_CONFIG)
+    check_bench_connection(conn)
+    slot_day, quota_day = race_day(200), race_day(203)
+    hours = list(range(9, 17))
+    problems, latencies, statuses = [], [], {}
+
+    def tally(results):
+        for status, elapsed in results:
+            statuses[status] = statuses.get(status, 0) + 1
+            latencies.append(elapsed)
+        return [status for status, _ in results]
+
+    try:
+        usernames = create_clients(conn, args.slots * args.contenders + args.clients)
+        started = time.perf_counter()
+
+        # Slot race: every request in a group targets the same slot, each from a fresh client.
+        slots = [((i % args.staff) + 1, hours[(i // args.staff) % len(hours)]) for i in range(args.slots)]
+        winners = {}
+        for n, (staff_id, hour) in enumerate(slots):
+            group = usernames[n * args.contenders:(n + 1) * args.contenders]
+            texts = spellings(hour)
+            codes = tally(fire(app, [booking(u, staff_id, slot_day, texts[i % len(texts)])
+                                     for i, u in enumerate(group)]))
+            winners[(staff_id, hour * 60)] = codes.count(201)
+            if codes.count(201) != 1 or codes.count(409) != len(codes) - 1:
+                problems.append(f"slot {staff_id}@{hour}:00 -> {sorted(codes)}")
+
+        rows = active_bookings(conn, slot_day)
+        per_slot = {}
+        for artist_id, minute, _ in rows:
+            per_slot[(artist_id, minute)] = per_slot.get((artist_id, minute), 0) + 1
+        for key, count in per_slot.items():
+            if count > 1:
+                problems.append(f"double booking in table: staff {key[0]} at minute {key[1]} x{count}")
+            if count != winners.get(key, 0):
+                problems.append(f"staff {key[0]} at minute {key[1]}: {winners.get(key, 0)} x 201 but {count} rows")
+
+        # Quota race: one client, many different free slots at once.
+        quota_clients = usernames[args.slots * args.contenders:]
+        for username in quota_clients:
+            bodies = [booking(username, (i % args.staff) + 1, quota_day, spellings(hours[i % len(hours)])[i % 4])
+                      for i in range(args.contenders)]
+            codes = tally(fire(app, bodies))
+            if codes.count(201) > 1:
+                problems.append(f"{username} booked {codes.count(201)} times inside the quota window")
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT a.username, COUNT(*) FROM tbl_appointment ap
+            JOIN tbl_clients c ON ap.user_id=c.id JOIN tbl_accounts a ON c.account_id=a.id
+            WHERE ap.appointment_date=%s AND ap.status <> 'Cancelled'
+            GROUP BY a.username HAVING COUNT(*) > 1
+        """, (quota_day,))
+        for username, count in cursor.fetchall():
+            problems.append(f"{username} has {count} active bookings in the table")
+        cursor.close()
+        for day, service, artist_id, status, drift in rollup_drift(conn, [slot_day, quota_day]):
+            problems.append(f"rollup off by {drift} for {day} {service} staff {artist_id} {status}")
+        elapsed = time.perf_counter() - started
+    finally:
+        if not args.keep:
+            cleanup(conn, [slot_day, quota_day])
+        conn.close()
+
+    print(f"{len(latencies)} requests in {elapsed:.2f}s, statuses {dict(sorted(statuses.items()))}")
+    print(f"p50 {percentile(latencies, 50) * 1000:.1f} ms, p95 {percentile(latencies, 95) * 1000:.1f} ms, "
+          f"p99 {percentile(latencies, 99) * 1000:.1f} ms")
+    server_errors = sum(n for status, n in statuses.items() if status >= 500)
+    if server_errors:
+        problems.append(f"{server_errors} requests failed with 5xx")
+    for problem in problems:
+        print("FAIL", problem)
+    if problems:
+        sys.exit(1)
+    print("No double bookings")
+
+
+if __name__ == "__main__":
+    main()
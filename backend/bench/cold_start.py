@@ -0,0 +1,71 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+# Cold start of a fresh worker process: time to import backend.wsgi (the
+# create_app() a non-preloaded gunicorn worker runs) and to serve the first
+# request through the test client. Each sample is a new interpreter, so
+# nothing is cached in-process; --importtime lists the slowest imports.
+#
+#   python -m backend.bench.cold_start --runs 10 --importtime 15
+
+PROBE = """
+import json, os, time
+started = time.perf_counter()
+from backend.wsgi import app
+loaded = time.perf_counter()
+response = app.test_client().get(%r, headers={"Authorization": "Bearer " + os.environ["METRICS_TOKEN"]})
+served = time.perf_counter()
+print(json.dumps({"import": loaded - started, "first_request": served - loaded, "status": response.status_code}))
+"""
+
+
+def sample(path, env):
+    out = subprocess.run([sys.executable, "-c", PROBE % path], env=env, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def slowest_imports(env, top):
+    out = subprocess.run([sys.executable, "-X", "importtime", "-c", "import backend.wsgi"], env=env,
+                         capture_output=True, text=True, check=True)
+    rows = []
+    for line in out.stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) == 3 and parts[1].strip().isdigit():
+            rows.append((int(parts[1]), parts[2].rstrip()))
+    # Cumulative times: a package includes the modules it imports.
+    return sorted(rows, reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure worker cold-start time")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--path", default="/metrics", help="first request (one that needs no database)")
+    parser.add_argument("--importtime", type=int, default=0, metavar="N", help="also list the N slowest imports")
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    env.setdefault("ASSET_WARMUP", "0")
+    env.setdefault("STAFF_DIRECTORY_WARMUP", "0")
+    env.setdefault("SECRET_KEY", "bench")
+    env.setdefault("METRICS_TOKEN", "bench")
+    sample(args.path, env)  # populate __pycache__ first
+    samples = [sample(args.path, env) for _ in range(args.runs)]
+
+    print(f"{'phase':<14} {'median ms':>10} {'max ms':>9}")
+    for phase in ("import", "first_request"):
+        values = [s[phase] * 1000 for s in samples]
+        print(f"{phase:<14} {statistics.median(values):>10.1f} {max(values):>9.1f}")
+    print(f"statuses: {sorted({s['status'] for s in samples})}")
+
+    if args.importtime:
+        print(f"\n{'cumulative ms':>13}  module")
+        for micros, name in slowest_imports(env, args.importtime):
+            print(f"{micros / 1000:>13.1f}  {name}")
+
+
+if __name__ == "__main__":
+    main()
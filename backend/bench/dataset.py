@@ -0,0 +1,174 @@
+import random
+from datetime import date, datetime, timedelta
+
+import mysql.connector
+
+from backend.bench import require_bench_name
+from backend.migrations import runner
+from backend.utils import reports, slots
+
+# Builds the benchmark database: a scratch schema on a local MySQL server,
+# created by backend/migrations and filled with realistic volumes of clients,
+# staff, appointments, feedback and blocked hours.
+
+BENCH_PASSWORD = "benchpass123"
+STATUSES = ["Pending", "Approved", "Completed", "Completed", "Completed", "Cancelled", "Denied", "Abandoned"]
+FIRST_NAMES = ["Juan", "Maria", "Jose", "Ana", "Mark", "Grace", "Paolo", "Bea", "Carlo", "Nina", "Miguel", "Rica"]
+LAST_NAMES = ["Santos", "Reyes", "Cruz", "Bautista", "Garcia", "Mendoza", "Torres", "Flores", "Ramos", "Aquino"]
+WORDS = ["great", "service", "fade", "clean", "friendly", "tattoo", "barber", "fast", "booking", "artist",
+         "price", "recommend", "wolf", "design", "careful", "again", "shop", "quality"]
+
+BATCH_SIZE = 1000
+
+
+def server_connection(config):
+    config = dict(config)
+    config.pop("database", None)
+    return mysql.connector.connect(**config)
+
+
+def create_database(config, database):
+    require_bench_name(database)
+    conn = server_connection(config)
+    cursor = conn.cursor()
+    try:
+        cursor.execute(f"DROP DATABASE IF EXISTS `{database}`")
+        cursor.execute(f"CREATE DATABASE `{database}` CHARACTER SET utf8mb4")
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def apply_schema(conn):
+    runner.upgrade(conn)
+
+
+def _insert_many(cursor, table, columns, rows):
+    placeholders = "(" + ", ".join(["%s"] * len(columns)) + ")"
+    for i in range(0, len(rows), BATCH_SIZE):
+        batch = rows[i:i + BATCH_SIZE]
+        cursor.execute(
+            f"INSERT INTO {table} ({', '.join(columns)}) VALUES {', '.join([placeholders] * len(batch))}",
+            tuple(v for row in batch for v in row),
+        )
+
+
+def _name(rng):
+    return f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+
+
+def _slot_text(rng, hour):
+    # Production data mixes 24-hour and 12-hour strings.
+    if rng.random() < 0.5:
+        return f"{hour}:00"
+    return f"{hour % 12 or 12}:00 {'AM' if hour < 12 else 'PM'}"
+
+
+def seed(conn, clients=5000, staff=8, appointments=100000, feedback=5000, unavailability=2000,
+         days_back=730, days_ahead=60, seed_value=42):
+    from backend.utils.security import hash_password
+
+    rng = random.Random(seed_value)
+    cursor = conn.cursor()
+    password_hash = hash_password(BENCH_PASSWORD)
+
+    accounts, client_rows, staff_rows, admin_rows = [], [], [], []
+    account_id = 0
+
+    account_id += 1
+    accounts.append((account_id, "admin", "admin@gmail.com", password_hash, "Admin"))
+    admin_rows.append((account_id, "Shop Admin"))
+
+    staff_ids = []
+    for i in range(staff):
+        account_id += 1
+        role = "Barber" if i % 2 == 0 else "TattooArtist"
+        accounts.append((account_id, f"staff{i}", f"staff{i}@gmail.com", password_hash, role))
+        staff_rows.append((i + 1, account_id, _name(rng), role))
+        staff_ids.append(i + 1)
+
+    for i in range(clients):
+        account_id += 1
+        accounts.append((account_id, f"user{i}", f"user{i}@gmail.com", password_hash, "User"))
+        client_rows.append((i + 1, account_id, _name(rng)))
+
+    _insert_many(cursor, "tbl_accounts", ["id", "username", "email", "hash_pass", "role"], accounts)
+    _insert_many(cursor, "tbl_admins", ["account_id", "fullname"], admin_rows)
+    _insert_many(cursor, "tbl_staff", ["id", "account_id", "fullname", "specialization"], staff_rows)
+    _insert_many(cursor, "tbl_clients", ["id", "account_id", "fullname"], client_rows)
+
+    staff_by_id = {row[0]: row for row in staff_rows}
+    today = date.today()
+    appointment_rows = []
+    booked = set()
+    for _ in range(appointments):
+        client_id, _, client_name = rng.choice(client_rows)
+        staff_id = rng.choice(staff_ids)
+        _, _, artist_name, role = staff_by_id[staff_id]
+        day = today + timedelta(days=rng.randint(-days_back, days_ahead))
+        if day.weekday() == 6:
+            day -= timedelta(days=1)
+        hour = rng.randint(9, 16 if day.weekday() == 5 else 20)
+        status = "Pending" if day > today and rng.random() < 0.6 else rng.choice(STATUSES)
+        # Only one active appointment per slot (uq_appointment_active_slot/_minute).
+        if status != "Cancelled":
+            if (staff_id, day, hour) in booked:
+                status = "Cancelled"
+            else:
+                booked.add((staff_id, day, hour))
+        service = "Haircut" if role == "Barber" else "Tattoo"
+        appointment_rows.append((client_id, client_name, service, day, _slot_text(rng, hour),
+                                 "", status, staff_id, artist_name))
+    _insert_many(cursor, "tbl_appointment",
+                 ["user_id", "fullname", "service", "appointment_date", "time", "remarks", "status",
+                  "artist_id", "artist_name"], appointment_rows)
+
+    feedback_rows = []
+    now = datetime.now()
+    for _ in range(feedback):
+        account, username, _, _, _ = rng.choice(accounts[staff + 1:])
+        message = " ".join(rng.choice(WORDS) for _ in range(rng.randint(5, 25)))
+        replied = rng.random() < 0.7
+        feedback_rows.append((account, username, rng.randint(1, 5), message,
+                              "Thank you!" if replied else None, 1 if replied else 0,
+                              now - timedelta(minutes=rng.randint(0, days_back * 24 * 60))))
+    _insert_many(cursor, "tbl_feedback",
+                 ["account_id", "username", "stars", "message", "reply", "resolved", "date_submitted"],
+                 feedback_rows)
+
+    unavailability_rows = []
+    for _ in range(unavailability):
+        day = today + timedelta(days=rng.randint(-30, days_ahead))
+        unavailability_rows.append((rng.choice(staff_ids), day, _slot_text(rng, rng.randint(9, 16))))
+    _insert_many(cursor, "tbl_staff_unavailability", ["staff_id", "unavailable_date", "unavailable_time"],
+                 unavailability_rows)
+
+    conn.commit()
+    cursor.close()
+    return {
+        "clients": clients,
+        "staff": staff,
+        "appointments": appointments,
+        "feedback": feedback,
+        "unavailability": unavailability,
+    }
+
+
+def build(config, database, **volumes):
+    create_database(config, database)
+    conn = mysql.connector.connect(**{**config, "database": database})
+    try:
+        apply_schema(conn)
+        counts = seed(conn, **volumes)
+        # Seeded rows carry only the legacy time strings, like production
+        # data before migration 0008; convert them the same way.
+        slots.backfill(conn)
+        reports.backfill(conn)
+        cursor = conn.cursor()
+        cursor.execute("ANALYZE TABLE tbl_accounts, tbl_clients, tbl_staff, tbl_appointment, "
+                       "tbl_feedback, tbl_staff_unavailability, tbl_appointment_daily")
+        cursor.fetchall()
+        cursor.close()
+        return counts
+    finally:
+        conn.close()
@@ -0,0 +1,71 @@
+import argparse
+import json
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from backend.utils import security
+
+# Login latency as a function of PBKDF2 cost. Fires a burst of password
+# checks at the bounded hasher pool (the same path auth.login takes) and
+# reports p50/p95/p99 per iteration count.
+#
+#   python -m backend.bench.password_cost --iterations 100000 260000 600000
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(int(round(pct / 100 * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+
+def run(iterations, requests, concurrency):
+    stored = security.hash_password("correct horse 42", iterations=iterations)
+
+    def one(_):
+        started = time.perf_counter()
+        try:
+            security.verify_password("correct horse 42", stored)
+            return time.perf_counter() - started, None
+        except security.PasswordHasherBusy:
+            return time.perf_counter() - started, "busy"
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(one, range(requests)))
+    elapsed = time.perf_counter() - started
+
+    latencies = [t for t, err in results if err is None]
+    return {
+        "iterations": iterations,
+        "requests": requests,
+        "concurrency": concurrency,
+        "rejected": sum(1 for _, err in results if err),
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2) if latencies else None,
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2) if latencies else None,
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2) if latencies else None,
+        "mean_ms": round(statistics.mean(latencies) * 1000, 2) if latencies else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark login password verification cost")
+    parser.add_argument("--iterations", type=int, nargs="+", default=[100000, 260000, 600000])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--json", action="store_true", help="print machine-readable results")
+    args = parser.parse_args()
+
+    results = [run(n, args.requests, args.concurrency) for n in args.iterations]
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"workers={security.PASSWORD_HASH_WORKERS} max_pending={security.PASSWORD_HASH_MAX_PENDING}")
+    print(f"{'iterations':>10} {'rps':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'rejected':>9}")
+    for r in results:
+        print(f"{r['iterations']:>10} {r['rps']:>8} {r['p50_ms']:>9} {r['p95_ms']:>9} {r['p99_ms']:>9} {r['rejected']:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+import argparse
+import os
+import re
+import sys
+import time
+from contextlib import contextmanager
+from datetime import date, timedelta
+
+# Query plan check. Drives every route in backend/routes once against the
+# seeded benchmark database, records each statement the handlers run, then
+# EXPLAINs them and fails if one reads a large table with a full scan
+# (type=ALL). Clients log in for real, every request must answer 2xx, and
+# outgoing mail is recorded instead of sent. Run it after adding a query or
+# a migration:
+#
+#   python -m backend.bench.plan_check --setup     # build + seed, then check
+#   python -m backend.bench.plan_check             # reuse existing data
+
+BENCH_DB_NAME = os.getenv("BENCH_DB_NAME", "marmudb_bench")
+PLAN_CHECK_MIN_ROWS = int(os.getenv("PLAN_CHECK_MIN_ROWS", "1000"))
+CHECKED_VERBS = ("select", "update", "delete", "(select")
+
+
+def route_requests(run):
+    # (method, path, json body, who, reason a full scan is expected or None[, then])
+    # who picks the test client: "client" and "admin" are logged in by the
+    # /auth/login entries. path and body may be callables of the shared state,
+    # filled in by `then(state, json)` from earlier responses. Every request
+    # must answer 2xx, or its statements would not be the ones that matter.
+    from backend.bench.dataset import BENCH_PASSWORD
+
+    today = date.today()
+    day = today + timedelta(days=1 if today.weekday() != 5 else 2)
+    # Far past the seeded bookings; the booking made here is cancelled again.
+    booking_day = today + timedelta(days=300 if (today + timedelta(days=300)).weekday() != 6 else 301)
+    client = f"plancheck{run}"
+    email = f"{client}@gmail.com"
+
+    def keep_slot(state, body):
+        state["time"] = body["available_times"][0]
+
+    def keep_appointment(state, body):
+        state["appointment_id"] = next(a["id"] for a in body if a["status"] == "Pending")
+
+    return [
+        ("POST", "/auth/login", {"username": "user1", "password": BENCH_PASSWORD}, None, None),
+        ("POST", "/auth/login", {"username": "user1@gmail.com", "password": BENCH_PASSWORD}, None, None),
+        ("POST", "/auth/login", {"username": "admin", "password": BENCH_PASSWORD}, "admin", None),
+        ("POST", "/auth/send_otp", {"email": "user2@gmail.com"}, None, None),
+        ("POST", "/auth/signup/send_otp", {"email": email}, None, None),
+        ("POST", "/auth/signup/verify", lambda state: {
+            "fullname": "Plan Check", "username": client, "email": email, "password": BENCH_PASSWORD,
+            "confirm_password": BENCH_PASSWORD, "otp": state["otp"][email]}, None, None),
+        ("POST", "/auth/login", {"username": client, "password": BENCH_PASSWORD}, "client", None),
+        # Changed and changed back, so the check can run again.
+        ("POST", "/auth/change_password", {"current_password": BENCH_PASSWORD, "new_password": "planpass123",
+                                           "confirm_password": "planpass123"}, "client", None),
+        ("POST", "/auth/change_password", {"current_password": "planpass123", "new_password": BENCH_PASSWORD,
+                                           "confirm_password": BENCH_PASSWORD}, "client", None),
+        ("GET", f"/bookings/available_slots?date={booking_day}&staff_id=1", None, "client", None, keep_slot),
+        ("POST", "/bookings", lambda state: {
+            "username": client, "fullname": "Plan Check", "service": "Haircut", "date": booking_day.isoformat(),
+            "time": state["time"], "staff_id": 1, "remarks": ""}, "client", None),
+        ("GET", f"/bookings/user/{client}", None, "client", None, keep_appointment),
+        ("GET", f"/bookings/availability?start={today}&end={today + timedelta(days=14)}&staff_id=1,2,3",
+         None, None, None),
+        ("GET", "/feedback?per_page=20", None, None, None),
+        ("POST", "/feedback", {"username": "user7", "stars": 5, "message": "plan check"}, None, None),
+        ("GET", "/admin/dashboard-data", None, "admin", None),
+        ("GET", "/admin/appointments/summary", None, "admin", None),
+        ("GET", "/admin/appointments/monthly-report", None, "admin", None),
+        ("GET", f"/admin/reports/appointments?start={today - timedelta(days=365)}&end={today}"
+                "&granularity=week&group_by=service,artist,status", None, "admin", None),
+        ("GET", "/admin/users?per_page=20", None, "admin",
+         "sorted by a name that lives in one of three tables; bounded by the account count"),
+        ("GET", "/admin/users?filter=Barber&per_page=20", None, "admin", None),
+        ("GET", "/admin/appointments?per_page=20", None, "admin", None),
+        ("GET", "/admin/appointments?per_page=20&sort=date_desc&total=exact", None, "admin", None),
+        ("GET", "/admin/appointments?per_page=20&status=pending&total=exact", None, "admin", None),
+        ("GET", "/admin/appointments?per_page=20&status=approved&total=exact", None, "admin", None),
+        ("GET", "/admin/appointments?per_page=20&history_only=1", None, "admin", None),
+        ("GET", "/admin/appointments?per_page=20&exclude_history=1", None, "admin", None),
+        ("GET", "/admin/appointments?per_page=20&q=santos", None, "admin", None),
+        ("GET", "/admin/appointments?per_page=20&q=42", None, "admin", None),
+        ("GET", "/admin/appointments?per_page=20&artist=Juan%20Santos", None, "admin", None),
+        ("PUT", lambda state: f"/admin/appointments/{state['appointment_id']}", {"status": "Approved"},
+         "admin", None),
+        ("POST", lambda state: f"/bookings/{state['appointment_id']}/cancel", {}, "client", None),
+        ("GET", "/admin/feedback?per_page=20", None, "admin", None),
+        ("GET", "/admin/feedback?per_page=20&status=resolved", None, "admin", None),
+        ("GET", "/admin/feedback?per_page=20&status=pending&sort=rating", None, "admin", None),
+        ("GET", "/admin/feedback?per_page=20&q=tattoo", None, "admin", None),
+        ("POST", "/admin/feedback/1/reply", {"reply": "Thanks!", "sendEmail": True}, "admin", None),
+        ("POST", "/admin/feedback/1/resolve", {"resolved": True}, "admin", None),
+        ("POST", "/staff/unavailability", {"staff_id": 1, "unavailable_date": day.isoformat(),
+                                           "unavailable_times": ["15:00"]}, "admin", None),
+        ("POST", "/staff/unavailability/bulk", {"staff_ids": [2], "dates": [day.isoformat()],
+                                                "times": ["16:00"]}, "admin", None),
+        ("GET", "/staff/by-service/haircut", None, None, None),
+        ("GET", "/staff/unavailability/list", None, "admin", "admin calendar lists every blocked slot"),
+    ]
+
+
+@contextmanager
+def outbox():
+    # Mail is recorded instead of sent for the duration of the run; the
+    # signup OTP is read back from the recorded message.
+    from backend.utils import email_utils
+
+    sent = []
+    original = email_utils._send_html_email
+    email_utils._send_html_email = lambda to_email, subject, html_body: sent.append((to_email, subject, html_body))
+    try:
+        yield sent
+    finally:
+        email_utils._send_html_email = original
+
+
+def capture_statements(app, requests, sent):
+    from flask import has_request_context
+    from backend.db import add_observer
+    from backend.utils.slowlog import normalize
+
+    captured = {}
+    current = {}
+
+    def observe(event, seconds, statement=None, params=None, **info):
+        if event != "query" or statement is None or not has_request_context():
+            return
+        if isinstance(statement, (bytes, bytearray)):
+            statement = statement.decode("utf-8", "replace")
+        if not statement.lstrip().lower().startswith(CHECKED_VERBS) or (params is None and "%s" in statement):
+            return
+        key = normalize(statement)
+        if key not in captured:
+            captured[key] = {"route": current["route"], "statement": statement, "params": params,
+                             "allow": current["allow"]}
+
+    add_observer(observe)
+    clients = {}
+    state = {"otp": {}}
+    errors = []
+    for method, path, body, who, allow, *then in requests:
+        path = path(state) if callable(path) else path
+        body = body(state) if callable(body) else body
+        current.update(route=f"{method} {path}", allow=allow)
+        client = clients.setdefault(who, app.test_client())
+        response = client.open(path, method=method, json=body)
+        print(f"  {response.status_code}  {method} {path}")
+        if not 200 <= response.status_code < 300:
+            errors.append(f"{method} {path} -> {response.status_code} {response.get_data(as_text=True)[:200]}")
+            continue
+        for to_email, subject, html_body in sent:
+            match = re.search(r"\b(\d{6})\b", html_body) if "OTP" in subject else None
+            if match:
+                state["otp"][to_email] = match.group(1)
+        if then:
+            then[0](state, response.get_json())
+    return list(captured.values()), errors
+
+
+def explain(conn, statement, params):
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute(f"EXPLAIN {statement}", params)
+        return cursor.fetchall()
+    finally:
+        cursor.close()
+
+
+def full_scans(plan, min_rows):
+    return [row for row in plan
+            if row.get("type") == "ALL"
+            and not str(row.get("table") or "").startswith("<")
+            and (row.get("rows") or 0) >= min_rows]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fail if a route query full-scans a large table")
+    parser.add_argument("--database", default=BENCH_DB_NAME)
+    parser.add_argument("--setup", action="store_true", help="(re)create and seed the benchmark database")
+    parser.add_argument("--min-rows", type=int, default=PLAN_CHECK_MIN_ROWS,
+                        help="ignore full scans of tables estimated below this many rows")
+    parser.add_argument("--verbose", action="store_true", help="print every plan")
+    args = parser.parse_args()
+
+    os.environ.setdefault("EMAIL_ASYNC", "1")
+    os.environ.setdefault("SECRET_KEY", "bench")
+    import mysql.connector
+    from backend.bench import check_bench_connection, dataset, use_bench_database
+    DB_CONFIG = use_bench_database(args.database)
+
+    if args.setup:
+        print(f"Seeding {args.database} ...")
+        dataset.build(DB_CONFIG, args.database)
+
+    from backend.app import app
+    from backend.db import connection
+    from backend.utils import counters
+    with connection() as conn:
+        check_bench_connection(conn)
+    # Seed the dashboard rollups outside a request so their one-off
+    # aggregate scans are not attributed to a route.
+    counters.reconcile()
+
+    print("Driving routes ...")
+    with outbox() as sent:
+        statements, errors = capture_statements(app, route_requests(int(time.time())), sent)
+    print(f"  ({len(sent)} emails recorded, none sent)")
+    if errors:
+        for error in errors:
+            print("FAIL    ", error)
+        sys.exit("Some routes did not answer 2xx; their queries were not checked")
+
+    conn = mysql.connector.connect(**DB_CONFIG)
+    failures, allowed = [], []
+    try:
+        check_bench_connection(conn)
+        for entry in statements:
+            try:
+                plan = explain(conn, entry["statement"], entry["params"])
+            except mysql.connector.Error as e:
+                failures.append((entry, f"EXPLAIN failed: {e}"))
+                continue
+            if args.verbose:
+                print(f"\n{entry['route']}\n  {' '.join(entry['statement'].split())}")
+                for row in plan:
+                    print(f"    {row.get('table')}: type={row.get('type')} key={row.get('key')} rows={row.get('rows')}")
+            scans = full_scans(plan, args.min_rows)
+            if not scans:
+                continue
+            detail = ", ".join(f"{row['table']} (~{row['rows']} rows)" for row in scans)
+            if entry["allow"]:
+                allowed.append((entry, detail))
+            else:
+                failures.append((entry, f"full scan of {detail}"))
+    finally:
+        conn.close()
+
+    print(f"\nChecked {len(statements)} distinct statements")
+    for entry, detail in allowed:
+        print(f"ALLOWED  {entry['route']}: {detail} -- {entry['allow']}")
+    for entry, reason in failures:
+        print(f"FAIL     {entry['route']}: {reason}\n         {' '.join(entry['statement'].split())}")
+    if failures:
+        sys.exit(1)
+    print("No unexpected full scans")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+from datetime import date, timedelta
+
+# Endpoint benchmark. Boots backend.app.app against a scratch MySQL database
+# (see dataset.py), drives the hot endpoints at a fixed concurrency through the
+# Flask test client and reports latency percentiles, throughput and database
+# statements per request.
+#
+#   python -m backend.bench.run --setup                      # build + seed, then run
+#   python -m backend.bench.run --save baseline.json         # reuse existing data
+#   python -m backend.bench.run --compare baseline.json      # fail on regressions
+
+BENCH_DB_NAME = os.getenv("BENCH_DB_NAME", "marmudb_bench")
+
+
+def percentile(samples, pct):
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[min(int(round(pct / 100 * (len(ordered) - 1))), len(ordered) - 1)]
+
+
+def scenarios(rng, staff_ids, clients):
+    today = date.today()
+
+    def next_open_day():
+        day = today + timedelta(days=rng.randint(0, 30))
+        return day if day.weekday() != 6 else day + timedelta(days=1)
+
+    def available_slots():
+        return "GET", f"/bookings/available_slots?date={next_open_day()}&staff_id={rng.choice(staff_ids)}", None
+
+    def create_booking():
+        i = rng.randrange(clients)
+        return "POST", "/bookings", {
+            "username": f"user{i}", "fullname": f"User {i}", "service": rng.choice(["Haircut", "Tattoo"]),
+            "date": next_open_day().isoformat(), "time": f"{rng.randint(9, 16)}:00",
+            "staff_id": rng.choice(staff_ids), "remarks": "bench",
+        }
+
+    def admin_appointments():
+        return "GET", f"/admin/appointments?page={rng.randint(1, 50)}&per_page=20&sort=date_desc", None
+
+    def dashboard():
+        return "GET", "/admin/dashboard-data", None
+
+    def feedback():
+        return "GET", "/feedback", None
+
+    def login():
+        from backend.bench.dataset import BENCH_PASSWORD
+        return "POST", "/auth/login", {"username": f"user{rng.randrange(clients)}", "password": BENCH_PASSWORD}
+
+    return {
+        "available_slots": available_slots,
+        "create_booking": create_booking,
+        "admin_appointments": admin_appointments,
+        "dashboard": dashboard,
+        "feedback": feedback,
+        "login": login,
+    }
+
+
+def server_questions(config):
+    import mysql.connector
+    conn = mysql.connector.connect(**config)
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SHOW GLOBAL STATUS LIKE 'Questions'")
+        return int(cursor.fetchone()[1])
+    finally:
+        conn.close()
+
+
+def run_scenario(app, make_request, requests, concurrency):
+    latencies, statuses = [], {}
+    lock = threading.Lock()
+    remaining = iter(range(requests))
+
+    def worker():
+        client = app.test_client()
+        while True:
+            with lock:
+                if next(remaining, None) is None:
+                    return
+                method, path, body = make_request()
+            started = time.perf_counter()
+            response = client.open(path, method=method, json=body)
+            elapsed = time.perf_counter() - started
+            with lock:
+                latencies.append(elapsed)
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return latencies, statuses, time.perf_counter() - started
+
+
+def compare(results, baseline_path, tolerance):
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {r["scenario"]: r for r in json.load(f)["results"]}
+    failures = []
+    for r in results:
+        base = baseline.get(r["scenario"])
+        if not base:
+            continue
+        for metric in ("p95_ms", "queries_per_request"):
+            if base.get(metric) and r.get(metric) and r[metric] > base[metric] * (1 + tolerance):
+                failures.append(f"{r['scenario']}: {metric} {base[metric]} -> {r[metric]}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the hot API endpoints")
+    parser.add_argument("--database", default=BENCH_DB_NAME)
+    parser.add_argument("--setup", action="store_true", help="(re)create and seed the benchmark database")
+    parser.add_argument("--clients", type=int, default=5000)
+    parser.add_argument("--appointments", type=int, default=100000)
+    parser.add_argument("--feedback", type=int, default=5000)
+    parser.add_argument("--staff", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=500, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--scenario", action="append", help="only run these scenarios")
+    parser.add_argument("--save", help="write results as JSON to this path")
+    parser.add_argument("--compare", help="baseline JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed regression ratio")
+    args = parser.parse_args()
+
+    os.environ.setdefault("EMAIL_ASYNC", "1")
+    os.environ.setdefault("SECRET_KEY", "bench")
+    from backend.bench import check_bench_connection, dataset, use_bench_database
+    DB_CONFIG = use_bench_database(args.database)
+
+    if args.setup:
+        print(f"Seeding {args.database} ...")
+        dataset.build(DB_CONFIG, args.database, clients=args.clients, staff=args.staff,
+                      appointments=args.appointments, feedback=args.feedback)
+
+    from backend.app import app
+    from backend.db import connection
+    with connection() as conn:
+        check_bench_connection(conn)
+    rng = random.Random(7)
+    all_scenarios = scenarios(rng, list(range(1, args.staff + 1)), args.clients)
+    selected = args.scenario or list(all_scenarios)
+
+    results = []
+    for name in selected:
+        make_request = all_scenarios[name]
+        run_scenario(app, make_request, min(args.concurrency * 2, args.requests), args.concurrency)  # warm-up
+        before = server_questions(DB_CONFIG)
+        latencies, statuses, elapsed = run_scenario(app, make_request, args.requests, args.concurrency)
+        # Minus the SHOW STATUS statement issued for the second reading.
+        queries = server_questions(DB_CONFIG) - before - 1
+        results.append({
+            "scenario": name,
+            "requests": len(latencies),
+            "concurrency": args.concurrency,
+            "rps": round(len(latencies) / elapsed, 1),
+            "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+            "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+            "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+            "queries_per_request": round(queries / max(len(latencies), 1), 2),
+            "statuses": {str(k): v for k, v in sorted(statuses.items())},
+        })
+
+    print(f"{'scenario':<20} {'rps':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'q/req':>7}  statuses")
+    for r in results:
+        print(f"{r['scenario']:<20} {r['rps']:>8} {r['p50_ms']:>9} {r['p95_ms']:>9} {r['p99_ms']:>9} "
+              f"{r['queries_per_request']:>7}  {r['statuses']}")
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump({"database": args.database, "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                       "results": results}, f, indent=2)
+        print(f"Saved results to {args.save}")
+
+    if args.compare:
+        failures = compare(results, args.compare, args.tolerance)
+        for failure in failures:
+            print("REGRESSION", failure)
+        if failures:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
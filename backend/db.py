@@ -1,5 +1,312 @@
+import threading
+import time
+from contextlib import contextmanager
+
 import mysql.connector
-from backend.db_config import DB_CONFIG
+from backend.db_config import DB_CONFIG, POOL_CONFIG
+
+
+class PoolTimeout(mysql.connector.errors.PoolError):
+    pass
+
+
+# Instrumentation hooks: each observer is called as fn(event, seconds, **info)
+# with event "checkout" (waiting for / opening a connection), "query" (an
+# execute, with statement= and params=) or "fetch" (reading result rows).
+_observers = []
+
+
+def add_observer(fn):
+    if fn not in _observers:
+        _observers.append(fn)
+
+
+def _notify(event, seconds, **info):
+    for fn in _observers:
+        try:
+            fn(event, seconds, **info)
+        except Exception:
+            pass
+
+
+class TimedCursor:
+    def __init__(self, raw):
+        self._raw = raw
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+    def __iter__(self):
+        return iter(self._raw)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._raw.close()
+        return False
+
+    def execute(self, operation, params=None, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return self._raw.execute(operation, params, *args, **kwargs)
+        finally:
+            _notify("query", time.perf_counter() - started, statement=operation, params=params)
+
+    def executemany(self, operation, seq_params, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return self._raw.executemany(operation, seq_params, *args, **kwargs)
+        finally:
+            _notify("query", time.perf_counter() - started, statement=operation, params=None)
+
+    def _timed_fetch(self, method, *args):
+        started = time.perf_counter()
+        try:
+            return getattr(self._raw, method)(*args)
+        finally:
+            _notify("fetch", time.perf_counter() - started)
+
+    def fetchone(self):
+        return self._timed_fetch("fetchone")
+
+    def fetchmany(self, *args):
+        return self._timed_fetch("fetchmany", *args)
+
+    def fetchall(self):
+        return self._timed_fetch("fetchall")
+
+
+class PooledConnection:
+    # Thin proxy around a raw mysql connection. close() hands the connection
+    # back to the pool instead of tearing down the socket, so existing
+    # handlers that call conn.close() keep working unchanged.
+
+    def __init__(self, pool, raw, created_at):
+        self._pool = pool
+        self._raw = raw
+        self._created_at = created_at
+
+    def __getattr__(self, name):
+        raw = self.__dict__.get("_raw")
+        if raw is None:
+            raise mysql.connector.errors.InterfaceError("Connection already returned to the pool")
+        return getattr(raw, name)
+
+    def is_connected(self):
+        return self._raw is not None and self._raw.is_connected()
+
+    def cursor(self, *args, **kwargs):
+        raw_cursor = self.__getattr__("cursor")(*args, **kwargs)
+        return TimedCursor(raw_cursor) if _observers else raw_cursor
+
+    def close(self):
+        raw, self._raw = self._raw, None
+        if raw is not None:
+            self._pool.release(raw, self._created_at)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None and self._raw is not None:
+            try:
+                self._raw.rollback()
+            except Exception:
+                pass
+        self.close()
+        return False
+
+    def __del__(self):
+        # Safety net for handlers that forget to close on an error path.
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+class ConnectionPool:
+    def __init__(self, size=5, max_overflow=10, timeout=30, recycle=1800, pre_ping=True, **connect_args):
+        self.size = max(int(size), 1)
+        self.max_overflow = max(int(max_overflow), 0)
+        self.timeout = timeout
+        self.recycle = recycle
+        self.pre_ping = pre_ping
+        self.connect_args = connect_args
+
+        self._cond = threading.Condition()
+        self._idle = []  # (raw, created_at)
+        self._open = 0
+        self._checked_out = 0
+        self._stats = {
+            "checkouts": 0,
+            "waits": 0,
+            "wait_time_total": 0.0,
+            "wait_time_max": 0.0,
+            "timeouts": 0,
+            "connects": 0,
+            "recycled": 0,
+            "health_check_failures": 0,
+            "discarded": 0,
+        }
+
+    def _connect(self):
+        raw = mysql.connector.connect(**self.connect_args)
+        with self._cond:
+            self._stats["connects"] += 1
+        return raw, time.monotonic()
+
+    def _close_raw(self, raw):
+        try:
+            raw.close()
+        except Exception:
+            pass
+
+    def _check(self, raw, created_at):
+        if self.recycle and time.monotonic() - created_at > self.recycle:
+            self._close_raw(raw)
+            with self._cond:
+                self._stats["recycled"] += 1
+            return self._connect()
+        if self.pre_ping:
+            try:
+                raw.ping(reconnect=False)
+            except Exception:
+                self._close_raw(raw)
+                with self._cond:
+                    self._stats["health_check_failures"] += 1
+                return self._connect()
+        return raw, created_at
+
+    def acquire(self):
+        start = time.monotonic()
+        waited = False
+        with self._cond:
+            while True:
+                if self._idle:
+                    raw, created_at = self._idle.pop()
+                    break
+                if self._open < self.size + self.max_overflow:
+                    self._open += 1
+                    raw, created_at = None, None
+                    break
+                remaining = self.timeout - (time.monotonic() - start)
+                if remaining <= 0:
+                    self._stats["timeouts"] += 1
+                    raise PoolTimeout(
+                        f"Timed out after {self.timeout}s waiting for a database connection "
+                        f"(size={self.size}, max_overflow={self.max_overflow})"
+                    )
+                waited = True
+                self._cond.wait(remaining)
+
+            self._checked_out += 1
+            self._stats["checkouts"] += 1
+            if waited:
+                waited_for = time.monotonic() - start
+                self._stats["waits"] += 1
+                self._stats["wait_time_total"] += waited_for
+                self._stats["wait_time_max"] = max(self._stats["wait_time_max"], waited_for)
+
+        try:
+            if raw is None:
+                raw, created_at = self._connect()
+            else:
+                raw, created_at = self._check(raw, created_at)
+        except Exception:
+            with self._cond:
+                self._open -= 1
+                self._checked_out -= 1
+                self._cond.notify()
+            raise
+        return PooledConnection(self, raw, created_at)
+
+    def release(self, raw, created_at):
+        # Never hand out a connection with an open transaction or unread rows:
+        # the next request would see a stale snapshot or an "Unread result" error.
+        keep = True
+        try:
+            if raw.unread_result or raw.in_transaction:
+                raw.rollback()
+        except Exception:
+            keep = False
+
+        with self._cond:
+            self._checked_out -= 1
+            if keep and len(self._idle) < self.size:
+                self._idle.append((raw, created_at))
+                raw = None
+            else:
+                self._open -= 1
+                if not keep:
+                    self._stats["discarded"] += 1
+            self._cond.notify()
+
+        if raw is not None:
+            self._close_raw(raw)
+
+    def dispose(self):
+        with self._cond:
+            idle, self._idle = self._idle, []
+            self._open -= len(idle)
+        for raw, _ in idle:
+            self._close_raw(raw)
+
+    def stats(self):
+        with self._cond:
+            data = dict(self._stats)
+            data.update({
+                "size": self.size,
+                "max_overflow": self.max_overflow,
+                "open": self._open,
+                "in_use": self._checked_out,
+                "idle": len(self._idle),
+                "overflow": max(self._open - self.size, 0),
+            })
+        data["wait_time_avg"] = data["wait_time_total"] / data["waits"] if data["waits"] else 0.0
+        return data
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(**POOL_CONFIG, **DB_CONFIG)
+    return _pool
+
+
+def reset_pool():
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.dispose()
+
 
 def get_connection():
-    return mysql.connector.connect(**DB_CONFIG)
+    started = time.perf_counter()
+    conn = get_pool().acquire()
+    _notify("checkout", time.perf_counter() - started)
+    return conn
+
+
+@contextmanager
+def connection():
+    conn = get_connection()
+    with conn:
+        yield conn
+
+
+def pool_stats():
+    return get_pool().stats()
+
+
+def get_dedicated_connection(**overrides):
+    # A plain connection outside the pool, for long-running work (streamed
+    # exports) that would otherwise pin a pooled connection for minutes.
+    return mysql.connector.connect(**{**DB_CONFIG, **overrides})
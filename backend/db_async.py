@@ -0,0 +1,105 @@
+import asyncio
+import re
+import time
+from contextlib import asynccontextmanager
+
+from backend.db import _notify
+from backend.db_config import DB_CONFIG, POOL_CONFIG
+
+try:
+    import aiomysql
+except ImportError:  # optional: only needed for the ASGI entry point (backend/asgi.py)
+    aiomysql = None
+
+# Async counterpart of backend/db.py for the ASGI handlers: one aiomysql pool
+# per event loop, sized like the sync pool. Statements are written for
+# mysql-connector, which only substitutes %s; aiomysql (PyMySQL) runs every
+# statement through %-formatting, so any other % is escaped on the way in.
+
+_PERCENT = re.compile(r"%(?!s)")
+
+_pools = {}
+
+
+def available():
+    return aiomysql is not None
+
+
+class AsyncCursor:
+    def __init__(self, raw):
+        self._raw = raw
+
+    @property
+    def rowcount(self):
+        return self._raw.rowcount
+
+    @property
+    def lastrowid(self):
+        return self._raw.lastrowid
+
+    async def execute(self, operation, params=None):
+        statement = _PERCENT.sub("%%", operation) if params is not None else operation
+        started = time.perf_counter()
+        try:
+            return await self._raw.execute(statement, tuple(params) if params is not None else None)
+        finally:
+            _notify("query", time.perf_counter() - started, statement=operation, params=params)
+
+    async def fetchone(self):
+        return await self._raw.fetchone()
+
+    async def fetchall(self):
+        rows = await self._raw.fetchall()
+        return list(rows)
+
+
+async def get_async_pool():
+    if aiomysql is None:
+        raise RuntimeError("aiomysql is not installed (pip install aiomysql)")
+    loop = asyncio.get_running_loop()
+    pool = _pools.get(loop)
+    if pool is None:
+        pool = await aiomysql.create_pool(
+            host=DB_CONFIG["host"],
+            port=DB_CONFIG["port"],
+            user=DB_CONFIG["user"],
+            password=DB_CONFIG["password"],
+            db=DB_CONFIG["database"],
+            minsize=0,
+            maxsize=POOL_CONFIG["size"] + POOL_CONFIG["max_overflow"],
+            pool_recycle=POOL_CONFIG["recycle"],
+            autocommit=True,
+            charset="utf8mb4",
+        )
+        _pools[loop] = pool
+    return pool
+
+
+@asynccontextmanager
+async def async_cursor(dictionary=False):
+    # Read-only use: the pool runs in autocommit mode, so each statement sees
+    # the latest committed data without an explicit transaction.
+    pool = await get_async_pool()
+    started = time.perf_counter()
+    async with pool.acquire() as conn:
+        _notify("checkout", time.perf_counter() - started)
+        cursor = await conn.cursor(aiomysql.DictCursor if dictionary else aiomysql.Cursor)
+        try:
+            yield AsyncCursor(cursor)
+        finally:
+            await cursor.close()
+
+
+async def close_async_pool():
+    pool = _pools.pop(asyncio.get_running_loop(), None)
+    if pool is not None:
+        pool.close()
+        await pool.wait_closed()
+
+
+def async_pool_stats():
+    return {
+        "pools": len(_pools),
+        "size": sum(p.size for p in _pools.values()),
+        "free": sum(p.freesize for p in _pools.values()),
+    }
@@ -14,3 +14,17 @@ DB_CONFIG = {
     "password": os.getenv("DB_PASSWORD", ""),
     "database": os.getenv("DB_NAME", "marmudb"),
 }
+
+def _bool(val, default):
+    if val is None:
+        return default
+    return str(val).strip().lower() in ("1", "true", "yes", "on")
+
+# Connection pool tuning (see backend/db.py)
+POOL_CONFIG = {
+    "size": _int(os.getenv("DB_POOL_SIZE", "5"), 5),
+    "max_overflow": _int(os.getenv("DB_POOL_MAX_OVERFLOW", "10"), 10),
+    "timeout": _int(os.getenv("DB_POOL_TIMEOUT", "30"), 30),
+    "recycle": _int(os.getenv("DB_POOL_RECYCLE", "1800"), 1800),
+    "pre_ping": _bool(os.getenv("DB_POOL_PRE_PING"), True),
+}
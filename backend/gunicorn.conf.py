@@ -0,0 +1,51 @@
+import multiprocessing
+import os
+
+# gunicorn -c backend/gunicorn.conf.py backend.wsgi:app
+#
+# The app is imported and built once in the master (preload_app) and the
+# workers are forked from it, so a new or recycled worker serves its first
+# request without paying the import/startup cost again. Anything that owns
+# sockets, threads or locks (DB pool, SMTP queue, password-hash executor,
+# counters reconciler, response cache, asset index) is created lazily and reset in
+# post_fork, so nothing opened in the master is shared across processes.
+
+bind = os.getenv("BIND", "0.0.0.0:5000")
+workers = int(os.getenv("WEB_CONCURRENCY", str(multiprocessing.cpu_count() * 2 + 1)))
+worker_class = "gthread"
+threads = int(os.getenv("GUNICORN_THREADS", "8"))
+preload_app = True
+
+# Recycle workers after a bounded number of requests (jittered so they don't
+# all restart together) and give in-flight requests time to finish.
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "2000"))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", "200"))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "60"))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "5"))
+
+# The asset warm-up is a background thread; run it in each worker instead of
+# the master so no worker is forked while it holds the asset lock.
+ASSET_WARMUP = os.getenv("ASSET_WARMUP", "1").strip().lower() in ("1", "true", "yes", "on")
+os.environ["ASSET_WARMUP"] = "0"
+
+
+def post_fork(server, worker):
+    from backend.db import reset_pool
+    from backend.utils import assets, cache, counters, security
+    from backend.utils.email_queue import reset_email_queue
+
+    reset_pool()
+    reset_email_queue()
+    security.reset_executor()
+    counters.reset_reconciler()
+    cache.reset_cache()
+    assets.reset()
+    if ASSET_WARMUP:
+        assets.warm_async()
+
+
+def worker_exit(server, worker):
+    # Deliver whatever is still queued before the worker goes away.
+    from backend.utils.email_queue import reset_email_queue
+    reset_email_queue()
@@ -0,0 +1,59 @@
+import argparse
+import sys
+
+import mysql.connector
+
+from backend.db_config import DB_CONFIG
+from backend.migrations import runner
+
+#   python -m backend.migrations status
+#   python -m backend.migrations up [--to N]
+#   python -m backend.migrations down [--to N]     # default: the latest migration only
+#   python -m backend.migrations stamp N           # mark 1..N applied without running them
+#   python -m backend.migrations new "add foo index"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m backend.migrations", description="Database schema migrations")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("status", help="list migrations and whether they are applied")
+    up = commands.add_parser("up", help="apply pending migrations")
+    up.add_argument("--to", type=int, help="stop after this version")
+    down = commands.add_parser("down", help="roll back applied migrations")
+    down.add_argument("--to", type=int, help="roll back everything above this version (0 = all)")
+    stamp = commands.add_parser("stamp", help="record migrations as applied without running them")
+    stamp.add_argument("version", type=int)
+    new = commands.add_parser("new", help="create an empty migration file")
+    new.add_argument("name")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == "new":
+            print(runner.create(args.name))
+            return 0
+
+        conn = mysql.connector.connect(**DB_CONFIG)
+        try:
+            if args.command == "status":
+                for row in runner.status(conn):
+                    applied_at = row["applied_at"] or ""
+                    print(f"{row['version']:04d}  {row['state']:<9} {row['name']:<32} {applied_at}")
+            elif args.command == "up":
+                done = runner.upgrade(conn, target=args.to)
+                print(f"Applied {len(done)} migration(s)" if done else "Already up to date")
+            elif args.command == "down":
+                done = runner.downgrade(conn, target=args.to)
+                print(f"Reverted {len(done)} migration(s)" if done else "Nothing to roll back")
+            elif args.command == "stamp":
+                runner.stamp(conn, args.version)
+                print(f"Stamped up to {args.version:04d}")
+        finally:
+            conn.close()
+    except (runner.MigrationError, mysql.connector.Error) as e:
+        print(f"❌ {e}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
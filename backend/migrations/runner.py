@@ -0,0 +1,297 @@
+import hashlib
+import os
+import re
+
+import mysql.connector
+
+# Versioned schema migrations. Each file in versions/ is named
+# NNNN_description.sql and holds a "-- migrate:up" and a "-- migrate:down"
+# section. Applied versions are recorded in schema_migrations together with a
+# checksum of the file, so an edited migration shows up in `status`.
+#
+# MySQL commits DDL implicitly, so a migration is not atomic: it is recorded
+# only once every statement succeeded, and re-running it skips objects that
+# already exist (duplicate index / column / table errors). A skip is only
+# accepted once information_schema confirms the object is there (or, going
+# down, gone). An ALTER TABLE with several clauses fails as a whole, so on a
+# skip its clauses are applied and checked one at a time.
+
+VERSIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "versions")
+LOCK_NAME = "schema_migrations"
+LOCK_TIMEOUT = int(os.getenv("MIGRATIONS_LOCK_TIMEOUT", "60"))
+
+# Duplicate column / key name, table exists; can't drop missing column or key.
+ALREADY_APPLIED_ERRORS = {1050, 1060, 1061}
+ALREADY_REVERTED_ERRORS = {1091}
+
+_FILENAME = re.compile(r"^(\d{4})_(\w+)\.sql$")
+_ALTER = re.compile(r"^ALTER\s+TABLE\s+`?(\w+)`?\s+(.+)$", re.S | re.I)
+# (pattern, kind); group 1 is the object name, group 2 (if any) its table.
+_OBJECTS = [
+    (re.compile(r"^ADD\s+(?:(?:UNIQUE|FULLTEXT|SPATIAL)\s+)?(?:INDEX|KEY)\s+`?(\w+)`?", re.I), "index"),
+    (re.compile(r"^DROP\s+(?:INDEX|KEY)\s+`?(\w+)`?", re.I), "index"),
+    (re.compile(r"^(?:ADD|DROP)\s+COLUMN\s+`?(\w+)`?", re.I), "column"),
+    (re.compile(r"^CREATE\s+TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?`?(\w+)`?", re.I), "table"),
+    (re.compile(r"^CREATE\s+(?:(?:UNIQUE|FULLTEXT|SPATIAL)\s+)?INDEX\s+`?(\w+)`?\s+ON\s+`?(\w+)`?", re.I), "index"),
+]
+_EXISTS_SQL = {
+    "table": "SELECT COUNT(*) FROM information_schema.TABLES WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s",
+    "index": "SELECT COUNT(*) FROM information_schema.STATISTICS "
+             "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND INDEX_NAME = %s",
+    "column": "SELECT COUNT(*) FROM information_schema.COLUMNS "
+              "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = %s",
+}
+_SECTION = re.compile(r"^--\s*migrate:(up|down)\s*$", re.M)
+
+
+class MigrationError(Exception):
+    pass
+
+
+class Migration:
+    def __init__(self, version, name, path):
+        self.version = version
+        self.name = name
+        self.path = path
+        with open(path, encoding="utf-8") as f:
+            self.source = f.read()
+        self.checksum = hashlib.sha256(self.source.encode("utf-8")).hexdigest()
+        self.up, self.down = self._parse()
+
+    def _parse(self):
+        parts = _SECTION.split(self.source)
+        sections = dict(zip(parts[1::2], parts[2::2]))
+        if "up" not in sections:
+            raise MigrationError(f"{os.path.basename(self.path)} has no '-- migrate:up' section")
+        return split_statements(sections["up"]), split_statements(sections.get("down", ""))
+
+    def __repr__(self):
+        return f"{self.version:04d}_{self.name}"
+
+
+def split_statements(sql):
+    sql = re.sub(r"--[^\n]*", "", sql)
+    return [stmt.strip() for stmt in sql.split(";") if stmt.strip()]
+
+
+def load_migrations(directory=VERSIONS_DIR):
+    migrations = []
+    for filename in sorted(os.listdir(directory)):
+        match = _FILENAME.match(filename)
+        if match:
+            migrations.append(Migration(int(match.group(1)), match.group(2), os.path.join(directory, filename)))
+    versions = [m.version for m in migrations]
+    if len(versions) != len(set(versions)):
+        raise MigrationError("Duplicate migration version in " + directory)
+    return migrations
+
+
+def ensure_table(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INT NOT NULL PRIMARY KEY,
+            name VARCHAR(255) NOT NULL,
+            checksum CHAR(64) NOT NULL,
+            applied_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+
+def applied_versions(cursor):
+    ensure_table(cursor)
+    cursor.execute("SELECT version, name, checksum, applied_at FROM schema_migrations ORDER BY version")
+    return {row[0]: {"name": row[1], "checksum": row[2], "applied_at": row[3]} for row in cursor.fetchall()}
+
+
+def split_clauses(sql):
+    # Top-level comma-separated clauses of an ALTER TABLE body.
+    clauses, depth, quote, start = [], 0, None, 0
+    for i, ch in enumerate(sql):
+        if quote:
+            if ch == quote:
+                quote = None
+        elif ch in "'\"`":
+            quote = ch
+        elif ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+        elif ch == "," and depth == 0:
+            clauses.append(sql[start:i].strip())
+            start = i + 1
+    clauses.append(sql[start:].strip())
+    return [c for c in clauses if c]
+
+
+def _target(table, clause):
+    # (kind, table, name) of the object a clause creates or drops, or None.
+    for pattern, kind in _OBJECTS:
+        match = pattern.match(clause)
+        if match:
+            if kind == "table":
+                return kind, match.group(1), None
+            return kind, table or match.group(2), match.group(1)
+    return None
+
+
+def _exists(cursor, kind, table, name):
+    cursor.execute(_EXISTS_SQL[kind], (table,) if name is None else (table, name))
+    return cursor.fetchone()[0] > 0
+
+
+def _execute(cursor, stmt):
+    cursor.execute(stmt)
+    if cursor.with_rows:
+        cursor.fetchall()
+
+
+def _settle(cursor, migration, stmt, tolerated, present):
+    alter = _ALTER.match(stmt)
+    if alter:
+        table, clauses = alter.group(1), split_clauses(alter.group(2))
+        pieces = [(f"ALTER TABLE {table} {clause}", table, clause) for clause in clauses]
+    else:
+        pieces = [(stmt, None, stmt)]
+    for piece, table, clause in pieces:
+        if len(pieces) > 1:
+            try:
+                _execute(cursor, piece)
+                continue
+            except mysql.connector.Error as e:
+                if e.errno not in tolerated:
+                    raise MigrationError(f"{migration} failed on:\n{piece}\n{e}") from e
+        target = _target(table, clause)
+        if target is None or _exists(cursor, *target) != present:
+            raise MigrationError(f"{migration}: can't confirm the schema already matches, not skipping:\n{piece}")
+        kind, table, name = target
+        print(f"  {migration}: skipped, {kind} {name or table} already {'exists' if present else 'gone'}")
+
+
+def _run(cursor, migration, statements, tolerated, present=True):
+    # present: whether the objects a tolerated error complains about should
+    # exist (upgrade) or not (downgrade).
+    for stmt in statements:
+        try:
+            _execute(cursor, stmt)
+        except mysql.connector.Error as e:
+            if e.errno not in tolerated:
+                raise MigrationError(f"{migration} failed on:\n{stmt}\n{e}") from e
+            _settle(cursor, migration, stmt, tolerated, present)
+
+
+class _Locked:
+    def __init__(self, cursor):
+        self.cursor = cursor
+
+    def __enter__(self):
+        self.cursor.execute("SELECT GET_LOCK(%s, %s)", (LOCK_NAME, LOCK_TIMEOUT))
+        if not self.cursor.fetchone()[0]:
+            raise MigrationError("Another process is running migrations")
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.cursor.execute("SELECT RELEASE_LOCK(%s)", (LOCK_NAME,))
+        self.cursor.fetchall()
+        return False
+
+
+def upgrade(conn, target=None, migrations=None):
+    migrations = migrations if migrations is not None else load_migrations()
+    cursor = conn.cursor()
+    try:
+        with _Locked(cursor):
+            applied = applied_versions(cursor)
+            done = []
+            for migration in migrations:
+                if migration.version in applied or (target is not None and migration.version > target):
+                    continue
+                print(f"Applying {migration} ...")
+                _run(cursor, migration, migration.up, ALREADY_APPLIED_ERRORS)
+                cursor.execute("INSERT INTO schema_migrations (version, name, checksum) VALUES (%s, %s, %s)",
+                               (migration.version, migration.name, migration.checksum))
+                conn.commit()
+                done.append(migration)
+            return done
+    finally:
+        cursor.close()
+
+
+def downgrade(conn, target=None, migrations=None):
+    # Reverts every applied migration above `target`; by default only the latest one.
+    migrations = migrations if migrations is not None else load_migrations()
+    by_version = {m.version: m for m in migrations}
+    cursor = conn.cursor()
+    try:
+        with _Locked(cursor):
+            applied = sorted(applied_versions(cursor), reverse=True)
+            if target is None:
+                target = applied[1] if len(applied) > 1 else 0
+            done = []
+            for version in applied:
+                if version <= target:
+                    break
+                migration = by_version.get(version)
+                if migration is None:
+                    raise MigrationError(f"Version {version} is applied but its file is missing")
+                print(f"Reverting {migration} ...")
+                _run(cursor, migration, migration.down, ALREADY_REVERTED_ERRORS, present=False)
+                cursor.execute("DELETE FROM schema_migrations WHERE version=%s", (version,))
+                conn.commit()
+                done.append(migration)
+            return done
+    finally:
+        cursor.close()
+
+
+def stamp(conn, target, migrations=None):
+    # Records migrations up to `target` as applied without running them, for
+    # databases whose schema was created by hand.
+    migrations = migrations if migrations is not None else load_migrations()
+    cursor = conn.cursor()
+    try:
+        with _Locked(cursor):
+            applied = applied_versions(cursor)
+            for migration in migrations:
+                if migration.version <= target and migration.version not in applied:
+                    cursor.execute("INSERT INTO schema_migrations (version, name, checksum) VALUES (%s, %s, %s)",
+                                   (migration.version, migration.name, migration.checksum))
+            conn.commit()
+    finally:
+        cursor.close()
+
+
+def status(conn, migrations=None):
+    migrations = migrations if migrations is not None else load_migrations()
+    cursor = conn.cursor()
+    try:
+        applied = applied_versions(cursor)
+        conn.commit()
+    finally:
+        cursor.close()
+    rows = []
+    for migration in migrations:
+        record = applied.pop(migration.version, None)
+        if record is None:
+            state = "pending"
+        elif record["checksum"] != migration.checksum:
+            state = "modified"
+        else:
+            state = "applied"
+        rows.append({"version": migration.version, "name": migration.name, "state": state,
+                     "applied_at": record["applied_at"] if record else None})
+    for version, record in sorted(applied.items()):
+        rows.append({"version": version, "name": record["name"], "state": "missing",
+                     "applied_at": record["applied_at"]})
+    return rows
+
+
+def create(name, directory=VERSIONS_DIR):
+    slug = re.sub(r"\W+", "_", name.strip().lower()).strip("_")
+    if not slug:
+        raise MigrationError("Migration name is empty")
+    migrations = load_migrations(directory)
+    version = migrations[-1].version + 1 if migrations else 1
+    path = os.path.join(directory, f"{version:04d}_{slug}.sql")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("-- migrate:up\n\n\n-- migrate:down\n\n")
+    return path
@@ -0,0 +1,75 @@
+-- Baseline tables as used by backend/routes. Safe to run against an existing
+-- database (CREATE TABLE IF NOT EXISTS); use `stamp 1` if the tables were
+-- created by hand and you only want the later migrations.
+
+-- migrate:up
+CREATE TABLE IF NOT EXISTS tbl_accounts (
+    id INT NOT NULL AUTO_INCREMENT PRIMARY KEY,
+    username VARCHAR(100) NOT NULL,
+    email VARCHAR(255) NOT NULL,
+    hash_pass VARCHAR(255) NOT NULL,
+    role VARCHAR(32) NOT NULL DEFAULT 'User'
+);
+
+CREATE TABLE IF NOT EXISTS tbl_clients (
+    id INT NOT NULL AUTO_INCREMENT PRIMARY KEY,
+    account_id INT NOT NULL,
+    fullname VARCHAR(255) NOT NULL,
+    KEY idx_clients_account (account_id)
+);
+
+CREATE TABLE IF NOT EXISTS tbl_staff (
+    id INT NOT NULL AUTO_INCREMENT PRIMARY KEY,
+    account_id INT NOT NULL,
+    fullname VARCHAR(255) NOT NULL,
+    specialization VARCHAR(32) NOT NULL,
+    KEY idx_staff_account (account_id)
+);
+
+CREATE TABLE IF NOT EXISTS tbl_admins (
+    id INT NOT NULL AUTO_INCREMENT PRIMARY KEY,
+    account_id INT NOT NULL,
+    fullname VARCHAR(255) NOT NULL,
+    KEY idx_admins_account (account_id)
+);
+
+CREATE TABLE IF NOT EXISTS tbl_appointment (
+    id INT NOT NULL AUTO_INCREMENT PRIMARY KEY,
+    user_id INT NOT NULL,
+    fullname VARCHAR(255) NOT NULL,
+    service VARCHAR(64) NOT NULL,
+    appointment_date DATE NOT NULL,
+    time VARCHAR(16) NOT NULL,
+    remarks TEXT,
+    status VARCHAR(20) DEFAULT 'Pending',
+    artist_id INT,
+    artist_name VARCHAR(255)
+);
+
+CREATE TABLE IF NOT EXISTS tbl_feedback (
+    id INT NOT NULL AUTO_INCREMENT PRIMARY KEY,
+    account_id INT NOT NULL,
+    username VARCHAR(100) NOT NULL,
+    stars TINYINT NOT NULL,
+    message TEXT NOT NULL,
+    reply TEXT,
+    resolved TINYINT(1) NOT NULL DEFAULT 0,
+    date_submitted DATETIME NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS tbl_staff_unavailability (
+    id INT NOT NULL AUTO_INCREMENT PRIMARY KEY,
+    staff_id INT NOT NULL,
+    unavailable_date DATE NOT NULL,
+    unavailable_time VARCHAR(16),
+    is_booked BOOLEAN NOT NULL DEFAULT FALSE
+);
+
+-- migrate:down
+DROP TABLE IF EXISTS tbl_staff_unavailability;
+DROP TABLE IF EXISTS tbl_feedback;
+DROP TABLE IF EXISTS tbl_appointment;
+DROP TABLE IF EXISTS tbl_admins;
+DROP TABLE IF EXISTS tbl_staff;
+DROP TABLE IF EXISTS tbl_clients;
+DROP TABLE IF EXISTS tbl_accounts;
@@ -0,0 +1,63 @@
+-- Indexes for the predicates and sort orders used by backend/routes.
+-- python -m backend.bench.plan_check fails if a route query full-scans a
+-- large table on the seeded benchmark data, so extend this (in a new
+-- migration) together with any new query shape.
+
+-- migrate:up
+-- Salted PBKDF2 hashes ("pbkdf2_sha256$<iterations>$<salt>$<hash>") are longer
+-- than the legacy 64-char SHA-256 hex digests.
+ALTER TABLE tbl_accounts MODIFY hash_pass VARCHAR(255) NOT NULL;
+
+-- Login, signup, password reset and every username -> client lookup.
+ALTER TABLE tbl_accounts
+    ADD INDEX idx_accounts_username (username),
+    ADD INDEX idx_accounts_email (email),
+    ADD INDEX idx_accounts_role (role);
+
+-- staff/by-service
+ALTER TABLE tbl_staff ADD INDEX idx_staff_specialization (specialization, account_id);
+
+-- Slot-taken check in create_booking and the availability engine: covering
+-- for (artist_id, date range) with the status filter.
+ALTER TABLE tbl_appointment
+    ADD INDEX idx_appointment_slot (artist_id, appointment_date, time, status),
+    -- Two-week quota check and a client's own appointment list.
+    ADD INDEX idx_appointment_client (user_id, service, appointment_date),
+    -- Admin list sorted by date (keyset) and the monthly report range.
+    ADD INDEX idx_appointment_date (appointment_date, time),
+    -- Admin list filtered by status / history tabs.
+    ADD INDEX idx_appointment_status (status, appointment_date, time),
+    ADD INDEX idx_appointment_artist_name (artist_name);
+
+-- Blocked hours per staff member and day (availability, deletes, booking flag).
+ALTER TABLE tbl_staff_unavailability
+    ADD INDEX idx_unavailability_staff_day (staff_id, unavailable_date, unavailable_time);
+
+-- Public feed and admin feedback list (resolved tabs, date and rating sorts).
+ALTER TABLE tbl_feedback
+    ADD INDEX idx_feedback_resolved_date (resolved, date_submitted),
+    ADD INDEX idx_feedback_date (date_submitted),
+    ADD INDEX idx_feedback_stars (stars);
+
+-- migrate:down
+-- hash_pass stays VARCHAR(255): shrinking it would truncate PBKDF2 hashes.
+ALTER TABLE tbl_feedback
+    DROP INDEX idx_feedback_resolved_date,
+    DROP INDEX idx_feedback_date,
+    DROP INDEX idx_feedback_stars;
+
+ALTER TABLE tbl_staff_unavailability DROP INDEX idx_unavailability_staff_day;
+
+ALTER TABLE tbl_appointment
+    DROP INDEX idx_appointment_slot,
+    DROP INDEX idx_appointment_client,
+    DROP INDEX idx_appointment_date,
+    DROP INDEX idx_appointment_status,
+    DROP INDEX idx_appointment_artist_name;
+
+ALTER TABLE tbl_staff DROP INDEX idx_staff_specialization;
+
+ALTER TABLE tbl_accounts
+    DROP INDEX idx_accounts_username,
+    DROP INDEX idx_accounts_email,
+    DROP INDEX idx_accounts_role;
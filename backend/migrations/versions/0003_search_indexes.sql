@@ -0,0 +1,15 @@
+-- FULLTEXT indexes backing the admin search box (backend/utils/search.py).
+-- InnoDB keeps these in sync on every INSERT/UPDATE, so no extra write-path code is needed.
+-- Terms shorter than innodb_ft_min_token_size (default 3) fall back to prefix LIKE.
+
+-- migrate:up
+ALTER TABLE tbl_appointment
+    ADD FULLTEXT INDEX ft_appointment_search (fullname, service, artist_name);
+
+ALTER TABLE tbl_feedback
+    ADD FULLTEXT INDEX ft_feedback_search (username, message);
+
+-- migrate:down
+ALTER TABLE tbl_feedback DROP INDEX ft_feedback_search;
+
+ALTER TABLE tbl_appointment DROP INDEX ft_appointment_search;
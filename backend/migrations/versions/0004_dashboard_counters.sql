@@ -0,0 +1,20 @@
+-- Precomputed dashboard values maintained by backend/utils/counters.py.
+-- Write paths adjust these in the same transaction as the change they count;
+-- reconcile() periodically recomputes them from the raw tables.
+
+-- migrate:up
+CREATE TABLE IF NOT EXISTS tbl_dashboard_counters (
+    name VARCHAR(64) NOT NULL PRIMARY KEY,
+    value BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS tbl_artist_job_counts (
+    artist_id INT NOT NULL PRIMARY KEY,  -- 0 = unassigned
+    total_jobs INT NOT NULL DEFAULT 0,
+    KEY idx_artist_job_counts_total (total_jobs)
+);
+
+-- migrate:down
+DROP TABLE IF EXISTS tbl_artist_job_counts;
+DROP TABLE IF EXISTS tbl_dashboard_counters;
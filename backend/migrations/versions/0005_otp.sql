@@ -0,0 +1,14 @@
+-- One-time passwords shared by every worker process (backend/utils/otp_store.py).
+
+-- migrate:up
+CREATE TABLE IF NOT EXISTS tbl_otp (
+    purpose VARCHAR(16) NOT NULL,
+    email VARCHAR(255) NOT NULL,
+    otp_hash CHAR(64) NOT NULL,
+    expires_at DATETIME NOT NULL,
+    PRIMARY KEY (purpose, email),
+    KEY idx_otp_expires_at (expires_at)
+);
+
+-- migrate:down
+DROP TABLE IF EXISTS tbl_otp;
@@ -0,0 +1,23 @@
+-- One active booking per artist, day and time, enforced by the database.
+-- active_slot is 1 for every appointment that still holds its slot and NULL
+-- once it is cancelled; NULLs never collide in a UNIQUE index, so cancelled
+-- rows drop out of the constraint and the slot can be booked again.
+--
+-- Fails with a duplicate-entry error if the table already holds double
+-- bookings. List them with:
+--   SELECT artist_id, appointment_date, time, COUNT(*) FROM tbl_appointment
+--   WHERE status IS NULL OR status <> 'Cancelled'
+--   GROUP BY artist_id, appointment_date, time HAVING COUNT(*) > 1;
+
+-- migrate:up
+ALTER TABLE tbl_appointment
+    ADD COLUMN active_slot TINYINT
+        GENERATED ALWAYS AS (IF(status <=> 'Cancelled', NULL, 1)) VIRTUAL;
+
+ALTER TABLE tbl_appointment
+    ADD UNIQUE INDEX uq_appointment_active_slot (artist_id, appointment_date, time, active_slot);
+
+-- migrate:down
+ALTER TABLE tbl_appointment DROP INDEX uq_appointment_active_slot;
+
+ALTER TABLE tbl_appointment DROP COLUMN active_slot;
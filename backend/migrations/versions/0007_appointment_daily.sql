@@ -0,0 +1,17 @@
+-- Appointments per day, service, artist and status, maintained by the
+-- counters hooks in the same transaction as the appointment write and read
+-- by backend/utils/reports.py. Fill it for existing data with:
+--   python -m backend.utils.reports backfill
+
+-- migrate:up
+CREATE TABLE IF NOT EXISTS tbl_appointment_daily (
+    day DATE NOT NULL,
+    service VARCHAR(64) NOT NULL,
+    artist_id INT NOT NULL,  -- 0 = unassigned
+    status VARCHAR(20) NOT NULL,
+    appointments INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, service, artist_id, status)
+);
+
+-- migrate:down
+DROP TABLE IF EXISTS tbl_appointment_daily;
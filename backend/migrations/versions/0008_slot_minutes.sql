@@ -0,0 +1,26 @@
+-- Minute-of-day columns next to the free-form time strings, written by every
+-- booking/unavailability write and read instead of parsing the strings (see
+-- backend/utils/slots.py). Existing rows start out NULL; convert them in
+-- batches with:
+--   python -m backend.utils.slots backfill
+--
+-- uq_appointment_active_minute closes the gap left by the string-keyed
+-- uq_appointment_active_slot, which treats "14:00" and "2:00 PM" as
+-- different slots. The string index stays until every row has a minute.
+
+-- migrate:up
+ALTER TABLE tbl_appointment
+    ADD COLUMN time_minute SMALLINT UNSIGNED NULL AFTER time;
+
+ALTER TABLE tbl_appointment
+    ADD UNIQUE INDEX uq_appointment_active_minute (artist_id, appointment_date, time_minute, active_slot);
+
+ALTER TABLE tbl_staff_unavailability
+    ADD COLUMN unavailable_minute SMALLINT UNSIGNED NULL AFTER unavailable_time;
+
+-- migrate:down
+ALTER TABLE tbl_staff_unavailability DROP COLUMN unavailable_minute;
+
+ALTER TABLE tbl_appointment DROP INDEX uq_appointment_active_minute;
+
+ALTER TABLE tbl_appointment DROP COLUMN time_minute;
@@ -0,0 +1,15 @@
+-- Fills tbl_appointment_daily (0007) from the appointments that existed
+-- before the counters hooks started maintaining it. Same aggregate as
+-- `python -m backend.utils.reports backfill`; re-running it just recomputes
+-- the counts.
+
+-- migrate:up
+INSERT INTO tbl_appointment_daily (day, service, artist_id, status, appointments)
+SELECT appointment_date, COALESCE(service, ''), COALESCE(artist_id, 0), COALESCE(status, 'Pending'), COUNT(*)
+FROM tbl_appointment
+WHERE appointment_date IS NOT NULL
+GROUP BY 1, 2, 3, 4
+ON DUPLICATE KEY UPDATE appointments = VALUES(appointments);
+
+-- migrate:down
+-- Nothing to undo: the rows are what the hooks would have written anyway.
@@ -1,8 +1,21 @@
-from .auth import auth_bp
-from .bookings import bookings_bp
-from .feedback import feedback_bp
-from .admin import admin_bp
-from .staff import staff_bp
-from  .services import services_bp
-
-__all__ = ["auth_bp", "bookings_bp", "feedback_bp", "admin_bp", "staff_bp", "services_bp"]
+import importlib
+
+# Blueprints are imported on first access (create_app() asks for all of
+# them), so importing one route module does not load the others.
+_BLUEPRINTS = {
+    "auth_bp": "auth",
+    "bookings_bp": "bookings",
+    "feedback_bp": "feedback",
+    "admin_bp": "admin",
+    "staff_bp": "staff",
+    "services_bp": "services",
+}
+
+__all__ = list(_BLUEPRINTS)
+
+
+def __getattr__(name):
+    module = _BLUEPRINTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(f".{module}", __name__), name)
@@ -1,42 +1,53 @@
-from flask import Blueprint, request, jsonify
+from datetime import date, timedelta
+from flask import Blueprint, request, jsonify, session
 from backend.db import get_connection
-from backend.utils.security import hash_password
+from backend.utils.security import PasswordHasherBusy, hash_password
 from backend.utils.email_utils import send_appointment_status_email
 from backend.utils.email_utils import send_feedback_reply_email
+from backend.utils.pagination import CursorError, clamp_per_page, invalidate_counts, order_sql, paginate_query
+from backend.utils.export import ExportError, stream_query
+from backend.utils.search import search_clause
+from backend.routes.feedback import invalidate_feedback_cache
+from backend.utils import cache, counters, reports, slowlog, staff_directory
+from backend.utils.cache import cached
 import mysql.connector
+from mysql.connector import errorcode
 
 admin_bp = Blueprint("admin", __name__)
 
+def _read_counters(conn, cursor):
+    counters.ensure_reconciler()
+    values, artist_performance = counters.read_dashboard(cursor)
+    if not values:
+        # First run: seed the rollup tables from the raw data.
+        counters.reconcile(conn)
+        values, artist_performance = counters.read_dashboard(cursor)
+    return values, artist_performance
+
+def _export(select_sql, from_sql, where_clauses, params, columns, name):
+    # Same filters and sort as the list endpoint, no LIMIT, streamed as
+    # ?format=csv (default) or ?format=ndjson.
+    if (session.get("role") or "").lower() != "admin":
+        return jsonify({"error": "Admin access required"}), 403
+    where_sql = "WHERE " + " AND ".join(where_clauses) if where_clauses else ""
+    statement = f"SELECT {select_sql} {from_sql} {where_sql} ORDER BY {order_sql(columns)}"
+    try:
+        return stream_query(statement, params, (request.args.get("format") or "csv").lower(),
+                            f"{name}-{date.today():%Y%m%d}")
+    except ExportError as e:
+        return jsonify({"error": str(e)}), 400
+
 @admin_bp.route("/dashboard-data", methods=["GET"])
 def admin_dashboard_data():
     conn = get_connection()
     cursor = conn.cursor(dictionary=True)
     try:
-        cursor.execute("SELECT COUNT(*) AS total_clients FROM tbl_clients")
-        total_clients = cursor.fetchone().get('total_clients', 0)
-
-        cursor.execute("SELECT COUNT(*) AS pending_appointments FROM tbl_appointment WHERE status='Pending'")
-        pending = cursor.fetchone().get('pending_appointments', 0)
-
-        cursor.execute("SELECT COUNT(*) AS new_feedback FROM tbl_feedback WHERE reply IS NULL OR reply=''")
-        new_feedback = cursor.fetchone().get('new_feedback', 0)
-
-        cursor.execute("""
-            SELECT COALESCE(s.fullname, 'Unassigned') AS artist_name, COUNT(*) AS total_jobs
-            FROM tbl_appointment a
-            LEFT JOIN tbl_staff s ON a.artist_id=s.id
-            WHERE a.status IN ('Completed','Done')
-            GROUP BY artist_name
-            ORDER BY total_jobs DESC
-            LIMIT 10
-        """)
-        artist_performance = cursor.fetchall()
-
+        values, artist_performance = _read_counters(conn, cursor)
         return jsonify({
-            "total_clients": total_clients,
+            "total_clients": values.get(counters.TOTAL_CLIENTS, 0),
             "notifications": {
-                "pending_appointments": pending,
-                "new_feedback": new_feedback
+                "pending_appointments": values.get(counters.status_counter("Pending"), 0),
+                "new_feedback": values.get(counters.FEEDBACK_UNREPLIED, 0)
             },
             "artist_performance": artist_performance
         })
@@ -45,106 +56,124 @@ def admin_dashboard_data():
         conn.close()
 
 @admin_bp.route("/appointments/summary", methods=["GET"])
+@cached(ttl=60, tags=("appointments",))
 def appointments_summary():
     conn = get_connection()
     cursor = conn.cursor(dictionary=True)
     try:
-        cursor.execute("""
-            SELECT 
-                COUNT(*) AS totalAppointments,
-                SUM(CASE WHEN status='Pending' THEN 1 ELSE 0 END) AS pendingAppointments,
-                SUM(CASE WHEN status='Approved' THEN 1 ELSE 0 END) AS approvedAppointments
-            FROM tbl_appointment
-        """)
-        summary = cursor.fetchone()
+        values, _ = _read_counters(conn, cursor)
         return jsonify({
-            "totalAppointments": summary["totalAppointments"] or 0,
-            "pendingAppointments": summary["pendingAppointments"] or 0,
-            "approvedAppointments": summary["approvedAppointments"] or 0
+            "totalAppointments": values.get(counters.APPOINTMENTS_TOTAL, 0),
+            "pendingAppointments": values.get(counters.status_counter("Pending"), 0),
+            "approvedAppointments": values.get(counters.status_counter("Approved"), 0)
         })
     finally:
         cursor.close()
         conn.close()
 
 @admin_bp.route("/appointments/monthly-report", methods=["GET"])
+@cached(ttl=300, tags=("appointments",))
 def monthly_report():
+    # Appointments per service for one month (?month=YYYY-MM, default: this
+    # month). haircut/tattoo are always present for the dashboard cards.
+    try:
+        month = request.args.get("month")
+        first = date.fromisoformat(f"{month}-01") if month else date.today().replace(day=1)
+    except ValueError:
+        return jsonify({"error": "month must be YYYY-MM"}), 400
+    last = (first.replace(day=28) + timedelta(days=4)).replace(day=1) - timedelta(days=1)
+
     conn = get_connection()
     cursor = conn.cursor(dictionary=True)
     try:
-        cursor.execute("""
-            SELECT service, COUNT(*) AS count
-            FROM tbl_appointment
-            WHERE appointment_date IS NOT NULL
-              AND MONTH(appointment_date)=MONTH(CURRENT_DATE())
-              AND YEAR(appointment_date)=YEAR(CURRENT_DATE())
-            GROUP BY service
-        """)
-        rows = cursor.fetchall()
+        report = reports.appointment_report(cursor, first, last, granularity="month", group_by=["service"])
         result = {"haircut": 0, "tattoo": 0}
-        for row in rows:
+        for row in report["rows"]:
             key = (row["service"] or "").strip().lower()
-            if key in result:
-                result[key] = row["count"]
+            result[key] = result.get(key, 0) + row["appointments"]
         return jsonify(result)
     finally:
         cursor.close()
         conn.close()
 
-@admin_bp.route("/users", methods=["GET"])
-def get_users():
-    page = int(request.args.get("page", 1))
-    per_page = int(request.args.get("per_page", 20))
-    sort = request.args.get("sort", "name")
-    filter_value = request.args.get("filter")
-    offset = max(page - 1, 0) * per_page
-
+@admin_bp.route("/reports/appointments", methods=["GET"])
+def appointment_report():
+    # ?start=&end=  (YYYY-MM-DD, default: month to date)
+    # ?granularity=day|week|month  ?group_by=service,artist,status
+    # optional filters: ?service= ?artist_id= ?status=
+    group_by = [g.strip() for g in (request.args.get("group_by") or "").split(",") if g.strip()]
     conn = get_connection()
     cursor = conn.cursor(dictionary=True)
     try:
-        where_clauses, params = [], []
-        if filter_value and filter_value != "all":
-            where_clauses.append("a.role=%s")
-            params.append(filter_value)
-        where_sql = "WHERE " + " AND ".join(where_clauses) if where_clauses else ""
-
-        sort_map = {
-            "name": "fullname ASC",
-            "name_desc": "fullname DESC",
-            "username": "a.username ASC",
-            "username_desc": "a.username DESC",
-            "role": "a.role ASC",
-            "role_desc": "a.role DESC",
-        }
-        order_sql = sort_map.get(sort, "fullname ASC")
+        start, end = reports.parse_range(request.args.get("start"), request.args.get("end"))
+        return jsonify(reports.appointment_report(
+            cursor, start, end,
+            granularity=request.args.get("granularity", "day"),
+            group_by=group_by,
+            service=request.args.get("service"),
+            artist_id=request.args.get("artist_id", type=int),
+            status=request.args.get("status"),
+        ))
+    except reports.ReportError as e:
+        return jsonify({"error": str(e)}), 400
+    finally:
+        cursor.close()
+        conn.close()
 
-        cursor.execute(f"""
-            SELECT COUNT(*) AS total
-            FROM tbl_accounts a
-            LEFT JOIN tbl_clients c ON a.id=c.account_id
-            LEFT JOIN tbl_staff s ON a.id=s.account_id
-            LEFT JOIN tbl_admins ad ON a.id=ad.account_id
-            {where_sql}
-        """, tuple(params))
-        total = cursor.fetchone()["total"]
+USER_SORTS = {
+    "name": [("COALESCE(c.fullname, s.fullname, ad.fullname, '')", "ASC"), ("a.id", "ASC")],
+    "name_desc": [("COALESCE(c.fullname, s.fullname, ad.fullname, '')", "DESC"), ("a.id", "DESC")],
+    "username": [("a.username", "ASC"), ("a.id", "ASC")],
+    "username_desc": [("a.username", "DESC"), ("a.id", "DESC")],
+    "role": [("a.role", "ASC"), ("a.id", "ASC")],
+    "role_desc": [("a.role", "DESC"), ("a.id", "DESC")],
+}
+
+USER_SELECT = """a.id, a.username, a.email, a.role,
+       COALESCE(c.fullname, s.fullname, ad.fullname) AS fullname"""
+USER_FROM = """FROM tbl_accounts a
+    LEFT JOIN tbl_clients c ON a.id=c.account_id
+    LEFT JOIN tbl_staff s ON a.id=s.account_id
+    LEFT JOIN tbl_admins ad ON a.id=ad.account_id"""
+
+def _user_filters(args):
+    where_clauses, params = [], []
+    filter_value = args.get("filter")
+    if filter_value and filter_value != "all":
+        where_clauses.append("a.role=%s")
+        params.append(filter_value)
+    return where_clauses, params
+
+def _users_query(args):
+    # paginate_query() arguments for GET /users (shared with backend/asgi.py).
+    sort = args.get("sort", "name")
+    if sort not in USER_SORTS:
+        sort = "name"
+    where_clauses, params = _user_filters(args)
+    return dict(select_sql=USER_SELECT, from_sql=USER_FROM, count_from="FROM tbl_accounts a",
+                where_clauses=where_clauses, params=params,
+                columns=USER_SORTS[sort], sort=sort, table="tbl_accounts")
 
-        cursor.execute(f"""
-            SELECT a.id, a.username, a.email, a.role,
-                   COALESCE(c.fullname, s.fullname, ad.fullname) AS fullname
-            FROM tbl_accounts a
-            LEFT JOIN tbl_clients c ON a.id=c.account_id
-            LEFT JOIN tbl_staff s ON a.id=s.account_id
-            LEFT JOIN tbl_admins ad ON a.id=ad.account_id
-            {where_sql}
-            ORDER BY {order_sql}
-            LIMIT %s OFFSET %s
-        """, (*params, per_page, offset))
-        data = cursor.fetchall()
-
-        return jsonify({"data": data, "total": total, "page": page, "per_page": per_page})
+@admin_bp.route("/users", methods=["GET"])
+def get_users():
+    conn = get_connection()
+    cursor = conn.cursor(dictionary=True)
+    try:
+        result = paginate_query(cursor, request.args, **_users_query(request.args))
+        return jsonify(result)
+    except CursorError as e:
+        return jsonify({"error": str(e)}), 400
     finally:
         cursor.close()
         conn.close()
 
+@admin_bp.route("/users/export", methods=["GET"])
+def export_users():
+    sort = request.args.get("sort", "name")
+    where_clauses, params = _user_filters(request.args)
+    return _export(USER_SELECT, USER_FROM, where_clauses, params,
+                   USER_SORTS.get(sort, USER_SORTS["name"]), "users")
+
 @admin_bp.route('/add_user', methods=['POST'])
 def add_user():
     try:
@@ -181,6 +210,7 @@ def add_user():
                 "INSERT INTO tbl_clients (account_id, fullname) VALUES (%s, %s)",
                 (account_id, fullname)
             )
+            counters.client_added(cursor)
         elif role.lower() in ["barber", "tattooartist"]:
             cursor.execute(
                 "INSERT INTO tbl_staff (account_id, fullname, specialization) VALUES (%s, %s, %s)",
@@ -193,11 +223,16 @@ def add_user():
             )
 
         conn.commit()
+        invalidate_counts("tbl_accounts")
+        if role.lower() in ["barber", "tattooartist"]:
+            staff_directory.invalidate()
         cursor.close()
         conn.close()
 
         return jsonify({"message": "User added successfully"}), 201
 
+    except PasswordHasherBusy as e:
+        return jsonify({"error": str(e)}), 503
     except mysql.connector.Error as db_err:
         print("❌ MySQL Error:", db_err)
         return jsonify({"error": str(db_err)}), 500
@@ -206,76 +241,82 @@ def add_user():
         return jsonify({"error": str(e)}), 500
 
 
+# Times sort by minute of day ("9:00" before "10:00"); rows whose minute
+# hasn't been backfilled yet sort after the rest of their day.
+APPOINTMENT_SORTS = {
+    'date': [('a.appointment_date', 'ASC'), ('COALESCE(a.time_minute, 1440)', 'ASC'), ('a.id', 'ASC')],
+    'date_desc': [('a.appointment_date', 'DESC'), ('COALESCE(a.time_minute, 1440)', 'DESC'), ('a.id', 'DESC')],
+    'name': [("COALESCE(a.fullname, '')", 'ASC'), ('a.id', 'ASC')],
+    'service': [("COALESCE(a.service, '')", 'ASC'), ('a.id', 'ASC')],
+    'artist': [("COALESCE(a.artist_name, '')", 'ASC'), ('a.id', 'ASC')],
+}
+
+APPOINTMENT_SELECT = """a.id, a.fullname, a.service, a.artist_name,
+    a.appointment_date, a.time,
+    COALESCE(a.status, 'Pending') AS status"""
+APPOINTMENT_FROM = "FROM tbl_appointment a"
+
+def _appointment_filters(args):
+    where_clauses, params = [], []
+    status = (args.get('status') or '').strip().lower()
+
+    # NULL status means Pending; spelled out so idx_appointment_status applies.
+    if status and status != 'all':
+        if status == 'pending':
+            where_clauses.append("(a.status=%s OR a.status IS NULL)")
+        else:
+            where_clauses.append("a.status=%s")
+        params.append(status.capitalize())
+    elif args.get('history_only') == '1':
+        where_clauses.append("a.status IN ('Completed','Abandoned','Cancelled')")
+    elif args.get('exclude_history') == '1':
+        where_clauses.append("(a.status IS NULL OR a.status NOT IN ('Completed','Abandoned','Cancelled'))")
+
+    search_sql, search_params = search_clause(
+        args.get('q'), ["a.fullname", "a.service", "a.artist_name"], id_column="a.id")
+    if search_sql:
+        where_clauses.append(search_sql)
+        params.extend(search_params)
+
+    artist = args.get('artist')
+    if artist:
+        where_clauses.append("a.artist_name=%s")
+        params.append(artist.strip())
+    return where_clauses, params
+
+def _appointments_query(args):
+    sort = args.get('sort', 'date')
+    if sort not in APPOINTMENT_SORTS:
+        sort = 'date'
+    where_clauses, params = _appointment_filters(args)
+    return dict(select_sql=APPOINTMENT_SELECT, from_sql=APPOINTMENT_FROM,
+                where_clauses=where_clauses, params=params,
+                columns=APPOINTMENT_SORTS[sort], sort=sort, table="tbl_appointment")
+
 @admin_bp.route("/appointments", methods=["GET"])
 def get_appointments():
-    page = int(request.args.get('page', 1))
-    per_page = int(request.args.get('per_page', 20))
-    q = request.args.get('q')
-    artist = request.args.get('artist')
-    sort = request.args.get('sort', 'date')
-
-    offset = max(page - 1, 0) * per_page
-    status = (request.args.get('status') or '').strip().lower()
-    exclude_history = request.args.get('exclude_history')
-    history_only = request.args.get('history_only')
-
     conn = get_connection()
     cursor = conn.cursor(dictionary=True)
     try:
-        where_clauses, params = [], []
-
-        if status and status != 'all':
-            where_clauses.append("COALESCE(a.status, 'Pending')=%s")
-            params.append(status.capitalize())
-        elif history_only == '1':
-            where_clauses.append("COALESCE(a.status, 'Pending') IN ('Completed','Abandoned','Cancelled')")
-        elif exclude_history == '1':
-            where_clauses.append("COALESCE(a.status, 'Pending') NOT IN ('Completed','Abandoned','Cancelled')")
-
-        if q:
-            like_q = f"%{q}%"
-            where_clauses.append("""
-                (a.fullname LIKE %s OR a.service LIKE %s OR 
-                 a.artist_name LIKE %s OR CAST(a.id AS CHAR) LIKE %s)
-            """)
-            params.extend([like_q, like_q, like_q, like_q])
-
-        if artist:
-            where_clauses.append("a.artist_name=%s")
-            params.append(artist.strip())
-
-        where_sql = "WHERE " + " AND ".join(where_clauses) if where_clauses else ""
-
-        sort_map = {
-            'date': 'a.appointment_date ASC, a.time ASC',
-            'date_desc': 'a.appointment_date DESC, a.time DESC',
-            'name': 'a.fullname ASC',
-            'service': 'a.service ASC',
-            'artist': 'a.artist_name ASC'
-        }
-        order_sql = sort_map.get(sort, sort_map['date'])
-
-        cursor.execute(f"SELECT COUNT(*) AS total FROM tbl_appointment a {where_sql}", tuple(params))
-        row = cursor.fetchone()
-        total = row['total'] if row and 'total' in row else 0
-
-        cursor.execute(f"""
-            SELECT DISTINCT
-                a.id, a.fullname, a.service, a.artist_name,
-                a.appointment_date, a.time,
-                COALESCE(a.status, 'Pending') AS status
-            FROM tbl_appointment a
-            {where_sql}
-            ORDER BY {order_sql}
-            LIMIT %s OFFSET %s
-        """, (*params, per_page, offset))
-        data = cursor.fetchall()
-
-        return jsonify({"data": data, "total": total, "page": page, "per_page": per_page})
+        result = paginate_query(cursor, request.args, **_appointments_query(request.args))
+        return jsonify(result)
+    except CursorError as e:
+        return jsonify({"error": str(e)}), 400
     finally:
         cursor.close()
         conn.close()
 
+@admin_bp.route("/appointments/export", methods=["GET"])
+def export_appointments():
+    sort = request.args.get('sort', 'date')
+    where_clauses, params = _appointment_filters(request.args)
+    return _export(APPOINTMENT_SELECT, APPOINTMENT_FROM, where_clauses, params,
+                   APPOINTMENT_SORTS.get(sort, APPOINTMENT_SORTS['date']), "appointments")
+
+# Statuses the client is emailed about.
+NOTIFY_STATUSES = ("approved", "denied")
+MAX_BULK_STATUS_IDS = 500
+
 @admin_bp.route("/appointments/<int:appointment_id>", methods=["PUT"])
 def update_appointment(appointment_id):
     data = request.get_json(silent=True) or {}
@@ -286,8 +327,26 @@ def update_appointment(appointment_id):
     conn = get_connection()
     cursor = conn.cursor(dictionary=True)
     try:
-        cursor.execute("UPDATE tbl_appointment SET status=%s WHERE id=%s", (new_status, appointment_id))
+        cursor.execute("""
+            SELECT status, artist_id, appointment_date, service FROM tbl_appointment WHERE id=%s FOR UPDATE
+        """, (appointment_id,))
+        current = cursor.fetchone()
+        if not current:
+            return jsonify({"error": "Appointment not found"}), 404
+
+        try:
+            cursor.execute("UPDATE tbl_appointment SET status=%s WHERE id=%s", (new_status, appointment_id))
+        except mysql.connector.IntegrityError as e:
+            if e.errno != errorcode.ER_DUP_ENTRY:
+                raise
+            # Reopening a cancelled appointment whose slot was booked again.
+            conn.rollback()
+            return jsonify({"error": "This time slot is already booked"}), 409
+        counters.appointment_status_changed(cursor, current["artist_id"], current["appointment_date"],
+                                            current["service"], current["status"], new_status)
         conn.commit()
+        invalidate_counts("tbl_appointment")
+        cache.invalidate("appointments")
 
         cursor.execute("""
             SELECT a.fullname, acc.email, a.service, a.artist_name,
@@ -299,7 +358,7 @@ def update_appointment(appointment_id):
         """, (appointment_id,))
         user = cursor.fetchone()
 
-        if user and new_status.lower() in ("approved", "denied"):
+        if user and new_status.lower() in NOTIFY_STATUSES:
             send_appointment_status_email(
                 email=user["email"],
                 fullname=user["fullname"],
@@ -315,63 +374,180 @@ def update_appointment(appointment_id):
         cursor.close()
         conn.close()
 
-@admin_bp.route("/feedback", methods=["GET"])
-def get_feedback_admin():
+def _placeholders(values):
+    return ", ".join(["%s"] * len(values))
+
+def _bulk_status_ids(data):
+    ids = data.get("ids")
+    if not isinstance(ids, list) or not ids:
+        raise ValueError("ids must be a non-empty list of appointment ids")
+    if len(ids) > MAX_BULK_STATUS_IDS:
+        raise ValueError(f"At most {MAX_BULK_STATUS_IDS} appointments per request")
+    try:
+        return list(dict.fromkeys(int(i) for i in ids))
+    except (TypeError, ValueError):
+        raise ValueError("ids must be a non-empty list of appointment ids")
+
+@admin_bp.route("/appointments/status", methods=["POST"])
+def bulk_update_appointments():
+    # {"ids": [...], "status": "Approved"} -> one transaction for all of them.
+    # Per-id result: updated, unchanged (already in that status), not_found,
+    # or conflict (reopening a cancelled appointment whose slot was booked
+    # again). Emails go to the mail queue after the commit.
+    data = request.get_json(silent=True) or {}
+    new_status = data.get("status")
+    if not new_status:
+        return jsonify({"error": "Missing status field"}), 400
+    try:
+        ids = _bulk_status_ids(data)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    conn = get_connection()
+    cursor = conn.cursor(dictionary=True)
     try:
-        page = int(request.args.get('page', 1))
-        per_page = int(request.args.get('per_page', 50))
-        status = request.args.get('status')
-        q = request.args.get('q')
-        sort = request.args.get('sort', 'date')
+        cursor.execute(f"""
+            SELECT id, status, artist_id, appointment_date, service FROM tbl_appointment
+            WHERE id IN ({_placeholders(ids)}) FOR UPDATE
+        """, tuple(ids))
+        current = {row["id"]: row for row in cursor.fetchall()}
+        results = {i: "not_found" for i in ids if i not in current}
+        changing = []
+        for i in ids:
+            if i in current:
+                if (current[i]["status"] or "Pending") == new_status:
+                    results[i] = "unchanged"
+                else:
+                    changing.append(i)
+
+        updated = []
+        if changing:
+            try:
+                cursor.execute(f"UPDATE tbl_appointment SET status=%s WHERE id IN ({_placeholders(changing)})",
+                               (new_status, *changing))
+                updated = changing
+            except mysql.connector.IntegrityError as e:
+                if e.errno != errorcode.ER_DUP_ENTRY:
+                    raise
+                # Only the failed statement was rolled back; the row locks are
+                # still held, so find the conflicting ids one at a time.
+                for i in changing:
+                    try:
+                        cursor.execute("UPDATE tbl_appointment SET status=%s WHERE id=%s", (new_status, i))
+                        updated.append(i)
+                    except mysql.connector.IntegrityError as e:
+                        if e.errno != errorcode.ER_DUP_ENTRY:
+                            raise
+                        results[i] = "conflict"
+
+        groups = {}
+        for i in updated:
+            row = current[i]
+            key = (row["artist_id"], row["appointment_date"], row["service"], row["status"])
+            groups[key] = groups.get(key, 0) + 1
+        for (artist_id, day, service, old_status), count in groups.items():
+            counters.appointment_status_changed(cursor, artist_id, day, service, old_status, new_status, count=count)
+        conn.commit()
+        if updated:
+            invalidate_counts("tbl_appointment")
+            cache.invalidate("appointments")
+
+        notified = set()
+        if updated and new_status.lower() in NOTIFY_STATUSES:
+            cursor.execute(f"""
+                SELECT a.id, a.fullname, acc.email, a.service, a.artist_name,
+                       a.appointment_date, a.time
+                FROM tbl_appointment a
+                JOIN tbl_clients c ON a.user_id=c.id
+                JOIN tbl_accounts acc ON c.account_id=acc.id
+                WHERE a.id IN ({_placeholders(updated)})
+            """, tuple(updated))
+            for user in cursor.fetchall():
+                if not user["email"]:
+                    continue
+                try:
+                    send_appointment_status_email(
+                        email=user["email"],
+                        fullname=user["fullname"],
+                        status=new_status,
+                        artist_name=user["artist_name"],
+                        service=user["service"],
+                        appointment_date=user["appointment_date"],
+                        time=user["time"],
+                    )
+                    notified.add(user["id"])
+                except Exception as e:
+                    print(f"Status email for appointment #{user['id']} failed:", e)
+
+        for i in updated:
+            results[i] = "updated"
+        return jsonify({
+            "status": new_status,
+            "updated": len(updated),
+            "results": [{"id": i, "result": results[i], "notified": i in notified} for i in ids],
+        }), 200
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+        conn.close()
 
-        offset = max(page - 1, 0) * per_page
+FEEDBACK_SORTS = {
+    'date': [('f.date_submitted', 'DESC'), ('f.id', 'DESC')],
+    'rating': [('f.stars', 'DESC'), ('f.id', 'DESC')],
+}
+
+FEEDBACK_SELECT = """f.id, f.username AS user, f.stars, f.message, COALESCE(f.reply, '') AS reply,
+       f.resolved,
+       DATE_FORMAT(f.date_submitted, '%Y-%m-%d %H:%i') AS date_submitted"""
+FEEDBACK_FROM = "FROM tbl_feedback f"
+
+def _feedback_filters(args):
+    where_clauses, params = [], []
+    status = args.get('status')
+    if status == 'resolved':
+        where_clauses.append('f.resolved = 1')
+    elif status == 'pending':
+        where_clauses.append('f.resolved = 0')
+    search_sql, search_params = search_clause(args.get('q'), ["f.username", "f.message"], id_column="f.id")
+    if search_sql:
+        where_clauses.append(search_sql)
+        params.extend(search_params)
+    return where_clauses, params
+
+def _feedback_query(args):
+    sort = args.get('sort', 'date')
+    if sort not in FEEDBACK_SORTS:
+        sort = 'date'
+    where_clauses, params = _feedback_filters(args)
+    return dict(select_sql=FEEDBACK_SELECT, from_sql=FEEDBACK_FROM,
+                where_clauses=where_clauses, params=params,
+                columns=FEEDBACK_SORTS[sort], sort=sort, table="tbl_feedback",
+                default_per_page=50)
 
+@admin_bp.route("/feedback", methods=["GET"])
+def get_feedback_admin():
+    try:
         conn = get_connection()
         cursor = conn.cursor(dictionary=True, buffered=True)
-
-        where_clauses = []
-        params = []
-        if status == 'resolved':
-            where_clauses.append('resolved = 1')
-        elif status == 'pending':
-            where_clauses.append('resolved = 0')
-        if q:
-            like_q = f"%{q}%"
-            where_clauses.append('(username LIKE %s OR message LIKE %s)')
-            params.extend([like_q, like_q])
-
-        where_sql = 'WHERE ' + ' AND '.join(where_clauses) if where_clauses else ''
-
-        sort_map = {
-            'date': "date_submitted DESC",
-            'rating': "stars DESC"
-        }
-        order_sql = sort_map.get(sort, sort_map['date'])
-
-        count_sql = f"SELECT COUNT(*) AS total FROM tbl_feedback {where_sql}"
-        cursor.execute(count_sql, tuple(params))
-        row = cursor.fetchone()
-        total = row['total'] if row and 'total' in row else 0
-
-        sql = f"""
-            SELECT id, username AS user, stars, message, COALESCE(reply, '') AS reply,
-                   resolved,
-                   DATE_FORMAT(date_submitted, '%%Y-%%m-%%d %%H:%%i') AS date_submitted
-            FROM tbl_feedback
-            {where_sql}
-            ORDER BY {order_sql}
-            LIMIT %s OFFSET %s
-        """
-        exec_params = params + [per_page, offset]
-        cursor.execute(sql, tuple(exec_params))
-        feedback = cursor.fetchall()
+        result = paginate_query(cursor, request.args, **_feedback_query(request.args))
         cursor.close()
         conn.close()
-        return jsonify({"data": feedback, "total": total, "page": page, "per_page": per_page})
+        return jsonify(result)
+    except CursorError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         print("Error in get_feedback_admin:", e)
         return jsonify({"error": str(e)}), 500
 
+@admin_bp.route("/feedback/export", methods=["GET"])
+def export_feedback():
+    sort = request.args.get('sort', 'date')
+    where_clauses, params = _feedback_filters(request.args)
+    return _export(FEEDBACK_SELECT, FEEDBACK_FROM, where_clauses, params,
+                   FEEDBACK_SORTS.get(sort, FEEDBACK_SORTS['date']), "feedback")
+
 
 @admin_bp.route("/feedback/<int:feedback_id>/reply", methods=["POST"])
 def admin_reply_feedback(feedback_id):
@@ -386,7 +562,7 @@ def admin_reply_feedback(feedback_id):
         conn = get_connection()
         cursor = conn.cursor(dictionary=True)
 
-        cursor.execute("SELECT username, account_id FROM tbl_feedback WHERE id = %s", (feedback_id,))
+        cursor.execute("SELECT username, account_id, reply FROM tbl_feedback WHERE id = %s FOR UPDATE", (feedback_id,))
         feedback = cursor.fetchone()
         if not feedback:
             return jsonify({"message": "Feedback not found."}), 404
@@ -396,7 +572,10 @@ def admin_reply_feedback(feedback_id):
             SET reply = %s, resolved = 1
             WHERE id = %s
         """, (reply, feedback_id))
+        counters.feedback_replied(cursor, feedback["reply"])
         conn.commit()
+        invalidate_counts("tbl_feedback")
+        invalidate_feedback_cache()
 
         if send_email:
             cursor.execute("""
@@ -432,6 +611,7 @@ def toggle_feedback_resolved(feedback_id):
             WHERE id = %s
         """, (resolved_status, feedback_id))
         conn.commit()
+        invalidate_counts("tbl_feedback")
 
         if cursor.rowcount == 0:
             return jsonify({"message": "Feedback not found."}), 404
@@ -444,4 +624,19 @@ def toggle_feedback_resolved(feedback_id):
     finally:
         if 'conn' in locals() and conn.is_connected():
             cursor.close()
-            conn.close()
\ No newline at end of file
+            conn.close()
+
+@admin_bp.route("/slow-queries", methods=["GET", "DELETE"])
+def slow_queries():
+    if (session.get("role") or "").lower() != "admin":
+        return jsonify({"error": "Admin access required"}), 403
+
+    if request.method == "DELETE":
+        slowlog.reset()
+        return jsonify({"message": "Slow query log cleared"}), 200
+
+    limit = clamp_per_page(request.args.get("limit"), 20)
+    return jsonify({
+        "threshold_ms": slowlog.SLOW_QUERY_MS,
+        "queries": slowlog.top(limit, request.args.get("sort", "total_ms"))
+    }), 200
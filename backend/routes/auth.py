@@ -1,14 +1,18 @@
 from flask import Blueprint, request, jsonify, session
 from backend.db import get_connection
-from backend.utils.security import hash_password, is_valid_email, is_strong_password
+from backend.utils.pagination import invalidate_counts
+from backend.utils import counters
+from backend.utils.security import (
+    PasswordHasherBusy, burn_password_check, hash_password, is_valid_email, is_strong_password, needs_rehash,
+    verify_password,
+)
 from backend.utils.email_utils import send_email_otp
-from datetime import datetime, timedelta
+from backend.utils.otp_store import get_otp_store
 import random
 
 auth_bp = Blueprint("auth", __name__)
 
 OTP_EXPIRY_MINUTES = 5
-otp_storage = {}  
 
 @auth_bp.route("/login", methods=["POST"])
 def login():
@@ -19,22 +23,42 @@ def login():
         return jsonify({"error": "Username/Email and password required"}), 400
 
     conn = get_connection()
-    cursor = conn.cursor(dictionary=True)
-    cursor.execute("""
-        SELECT a.id AS account_id, a.username, a.email, a.hash_pass, a.role,
-               COALESCE(c.fullname, s.fullname, ad.fullname) AS fullname
-        FROM tbl_accounts a
-        LEFT JOIN tbl_clients c ON a.id = c.account_id
-        LEFT JOIN tbl_staff s ON a.id = s.account_id
-        LEFT JOIN tbl_admins ad ON a.id = ad.account_id
-        WHERE a.username = %s OR a.email = %s
-    """, (username_or_email, username_or_email))
-    user = cursor.fetchone()
-    cursor.close()
-    conn.close()
-
-    if not user or hash_password(password) != user["hash_pass"]:
-        return jsonify({"error": "Invalid username/email or password"}), 401
+    cursor = conn.cursor(dictionary=True, buffered=True)
+    try:
+        # One indexed lookup per field instead of "username = %s OR email = %s".
+        cursor.execute("""
+            SELECT a.id AS account_id, a.username, a.email, a.hash_pass, a.role,
+                   COALESCE(c.fullname, s.fullname, ad.fullname) AS fullname
+            FROM (
+                SELECT id FROM tbl_accounts WHERE username = %s
+                UNION
+                SELECT id FROM tbl_accounts WHERE email = %s
+            ) m
+            JOIN tbl_accounts a ON a.id = m.id
+            LEFT JOIN tbl_clients c ON a.id = c.account_id
+            LEFT JOIN tbl_staff s ON a.id = s.account_id
+            LEFT JOIN tbl_admins ad ON a.id = ad.account_id
+            LIMIT 1
+        """, (username_or_email, username_or_email))
+        user = cursor.fetchone()
+
+        try:
+            if not user:
+                burn_password_check(password)
+                return jsonify({"error": "Invalid username/email or password"}), 401
+            if not verify_password(password, user["hash_pass"]):
+                return jsonify({"error": "Invalid username/email or password"}), 401
+
+            # Upgrade legacy / low-cost hashes now that we know the password.
+            if needs_rehash(user["hash_pass"]):
+                cursor.execute("UPDATE tbl_accounts SET hash_pass=%s WHERE id=%s",
+                               (hash_password(password), user["account_id"]))
+                conn.commit()
+        except PasswordHasherBusy as e:
+            return jsonify({"error": str(e)}), 503
+    finally:
+        cursor.close()
+        conn.close()
 
     session.update({
         "account_id": user["account_id"],
@@ -89,10 +113,10 @@ def change_password():
         if not row:
             return jsonify({'success': False, 'message': 'User not found'}), 404
 
-        if hash_password(current_password) != row['hash_pass']:
+        if not verify_password(current_password, row['hash_pass']):
             return jsonify({'success': False, 'message': 'Current password is incorrect'}), 403
 
-        if hash_password(new_password) == row['hash_pass']:
+        if verify_password(new_password, row['hash_pass']):
             return jsonify({'success': False, 'message': 'New password must be different from the current password'}), 400
 
         cursor.close()
@@ -101,6 +125,8 @@ def change_password():
                        (hash_password(new_password), username))
         conn.commit()
         return jsonify({'success': True, 'message': 'Password updated successfully'})
+    except PasswordHasherBusy as e:
+        return jsonify({'success': False, 'message': str(e)}), 503
     except Exception as e:
         return jsonify({'success': False, 'message': f'Error updating password: {str(e)}'}), 500
     finally:
@@ -123,10 +149,7 @@ def forgot_send_otp():
         conn.close()
 
     otp = str(random.randint(100000, 999999))
-    otp_storage[email] = {
-        'otp': otp,
-        'expires_at': datetime.now() + timedelta(minutes=OTP_EXPIRY_MINUTES)
-    }
+    get_otp_store().put("reset", email, otp, OTP_EXPIRY_MINUTES * 60)
 
     try:
         send_email_otp(email, "Your OTP for Password Reset", otp)
@@ -149,8 +172,13 @@ def reset_password():
     if new_pass != confirm:
         return jsonify({'success': False, 'message': 'Passwords do not match'}), 400
 
-    stored = otp_storage.get(email)
-    if not stored or datetime.now() > stored['expires_at'] or otp != stored['otp']:
+    # Hash first: a busy hasher must not use up the OTP.
+    try:
+        hashed = hash_password(new_pass)
+    except PasswordHasherBusy as e:
+        return jsonify({'success': False, 'message': str(e)}), 503
+
+    if not get_otp_store().verify_and_consume("reset", email, otp):
         return jsonify({'success': False, 'message': 'Invalid or expired OTP'}), 400
 
     try:
@@ -158,10 +186,9 @@ def reset_password():
         cursor = conn.cursor()
         cursor.execute(
             "UPDATE tbl_accounts SET hash_pass=%s WHERE email=%s",
-            (hash_password(new_pass), email)
+            (hashed, email)
         )
         conn.commit()
-        del otp_storage[email]
         return jsonify({'success': True, 'message': 'Password reset successful'})
     except Exception as e:
         return jsonify({'success': False, 'message': f'Database error: {str(e)}'}), 500
@@ -176,7 +203,7 @@ def signup_send_otp():
         return jsonify({"error": "Please enter a valid Gmail address"}), 400
 
     otp = str(random.randint(100000, 999999))
-    otp_storage[email] = {"otp": otp, "expires": datetime.now() + timedelta(minutes=OTP_EXPIRY_MINUTES)}
+    get_otp_store().put("signup", email, otp, OTP_EXPIRY_MINUTES * 60)
     try:
         send_email_otp(email, "Your OTP for Signup", otp, OTP_EXPIRY_MINUTES)
         return jsonify({"message": "OTP sent successfully!"})
@@ -198,10 +225,6 @@ def signup_verify():
     if password != confirm:
         return jsonify({"error": "Passwords do not match"}), 400
 
-    record = otp_storage.get(email)
-    if not record or datetime.now() > record["expires"] or record["otp"] != otp:
-        return jsonify({"error": "Invalid or expired OTP"}), 400
-
     conn = get_connection()
     cursor = conn.cursor()
     try:
@@ -209,18 +232,27 @@ def signup_verify():
         if cursor.fetchone():
             return jsonify({"error": "Username or email already exists"}), 409
 
+        # Consume only once the signup can otherwise go ahead (the hash
+        # included: a busy hasher must not use up the OTP).
+        hashed = hash_password(password)
+        if not get_otp_store().verify_and_consume("signup", email, otp):
+            return jsonify({"error": "Invalid or expired OTP"}), 400
+
         role = "User"
         cursor.execute("""
             INSERT INTO tbl_accounts (username, email, hash_pass, role)
             VALUES (%s, %s, %s, %s)
-        """, (username, email, hash_password(password), role))
+        """, (username, email, hashed, role))
         account_id = cursor.lastrowid
 
         cursor.execute("INSERT INTO tbl_clients (account_id, fullname) VALUES (%s, %s)", (account_id, fullname))
+        counters.client_added(cursor)
         conn.commit()
+        invalidate_counts("tbl_accounts")
 
-        del otp_storage[email]
         return jsonify({"message": "Signup successful!"}), 201
+    except PasswordHasherBusy as e:
+        return jsonify({"error": str(e)}), 503
     except Exception as err:
         return jsonify({"error": f"Database error: {err}"}), 500
     finally:
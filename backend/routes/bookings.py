@@ -1,10 +1,20 @@
+import os
 from flask import Blueprint, request, jsonify, session
-from datetime import datetime
+import mysql.connector
+from mysql.connector import errorcode
 from backend.db import get_connection
+from backend.utils.pagination import invalidate_counts
+from backend.utils import cache, counters, staff_directory
 from backend.utils.email_utils import send_appointment_status_email
+from backend.utils.slots import format_slot, parse_slot, row_minute
+from backend.utils.availability import (
+    MAX_RANGE_DAYS, SLOT_LABELS, compute_availability, mask_to_times, open_mask, parse_day,
+)
 
 bookings_bp = Blueprint("bookings", __name__)
 
+BOOKING_DEADLOCK_RETRIES = int(os.getenv("BOOKING_DEADLOCK_RETRIES", "2"))
+
 @bookings_bp.route("", methods=["POST"])
 def create_booking():
     data = request.get_json()
@@ -17,108 +27,126 @@ def create_booking():
     fullname = data["fullname"]
     service = data["service"]
     date = data["date"]
-    time = data["time"]
+    minute = parse_slot(data["time"])
     staff_id = data["staff_id"]
     remarks = data.get("remarks", "")
+    if minute is None:
+        return jsonify({"error": "Invalid time slot"}), 400
+
+    for attempt in range(BOOKING_DEADLOCK_RETRIES + 1):
+        try:
+            return _book(username, fullname, service, date, minute, staff_id, remarks)
+        except mysql.connector.Error as e:
+            if e.errno == errorcode.ER_DUP_ENTRY:
+                return jsonify({"error": "This time slot is already booked"}), 409
+            if e.errno == errorcode.ER_LOCK_DEADLOCK and attempt < BOOKING_DEADLOCK_RETRIES:
+                continue
+            print("Error creating booking:", e)
+            return jsonify({"error": "An error occurred while processing your request."}), 500
+        except Exception as e:
+            print("Error creating booking:", e)
+            return jsonify({"error": "An error occurred while processing your request."}), 500
+
+def _book(username, fullname, service, date, minute, staff_id, remarks):
+    # One transaction. Locking the client row serializes a client's own
+    # bookings so the quota COUNT below sees any booking committed ahead of
+    # us; double bookings of a slot are rejected by uq_appointment_active_slot
+    # (ER_DUP_ENTRY -> 409 in create_booking).
+    artist = staff_directory.get(staff_id)
+    if artist is None:
+        return jsonify({"error": "Artist not found"}), 404
+    artist_name = artist["fullname"]
 
     conn = get_connection()
     cursor = conn.cursor()
     try:
-        cursor.execute("SELECT c.id FROM tbl_clients c JOIN tbl_accounts a ON c.account_id=a.id WHERE a.username=%s", (username,))
-        user = cursor.fetchone()
-        if not user:
+        cursor.execute("""
+            SELECT c.id
+            FROM tbl_accounts a
+            JOIN tbl_clients c ON c.account_id=a.id
+            WHERE a.username=%s
+            FOR UPDATE OF c
+        """, (username,))
+        row = cursor.fetchone()
+        if not row:
             return jsonify({"error": "User not found"}), 404
-
-        cursor.execute("SELECT s.fullname FROM tbl_staff s WHERE s.id=%s", (staff_id,))
-        artist = cursor.fetchone()
-        if not artist:
-            return jsonify({"error": "Artist not found"}), 404
-        artist_name = artist[0]
+        client_id = row[0]
 
         cursor.execute("""
-            SELECT id FROM tbl_appointment
-            WHERE appointment_date=%s AND time=%s AND artist_id=%s AND status!='Cancelled'
-        """, (date, time, staff_id))
-        if cursor.fetchone():
-            return jsonify({"error": "This time slot is already booked"}), 409
-
-        try:
-            cursor.execute("""
-                SELECT COUNT(*) FROM tbl_appointment
-                WHERE user_id=%s AND service=%s AND appointment_date>=DATE_SUB(CURDATE(), INTERVAL 14 DAY) AND status!='Cancelled'
-            """, (user[0], service))
-            recent_count = cursor.fetchone()[0]
-            if recent_count and recent_count >= 1:
-                return jsonify({"error": f"You can only book one {service} every 2 weeks."}), 400
-        except Exception:
-            pass
+            SELECT COUNT(*) FROM tbl_appointment
+            WHERE user_id=%s AND service=%s AND appointment_date>=DATE_SUB(CURDATE(), INTERVAL 14 DAY) AND status!='Cancelled'
+        """, (client_id, service))
+        if cursor.fetchone()[0] >= 1:
+            conn.rollback()
+            return jsonify({"error": f"You can only book one {service} every 2 weeks."}), 400
 
         cursor.execute("""
             INSERT INTO tbl_appointment
-                (user_id, fullname, service, appointment_date, time, remarks, status, artist_id, artist_name)
-            VALUES (%s, %s, %s, %s, %s, %s, 'Pending', %s, %s)
-        """, (user[0], fullname, service, date, time, remarks, staff_id, artist_name))
+                (user_id, fullname, service, appointment_date, time, time_minute, remarks, status, artist_id,
+                 artist_name)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, 'Pending', %s, %s)
+        """, (client_id, fullname, service, date, format_slot(minute), minute, remarks, staff_id, artist_name))
+        counters.appointment_created(cursor, staff_id, date, service)
 
         cursor.execute("""
             UPDATE tbl_staff_unavailability
             SET is_booked=TRUE
-            WHERE staff_id=%s AND unavailable_date=%s AND unavailable_time=%s
-        """, (staff_id, date, time))
+            WHERE staff_id=%s AND unavailable_date=%s AND unavailable_minute=%s
+        """, (staff_id, date, minute))
 
         conn.commit()
+        invalidate_counts("tbl_appointment")
+        cache.invalidate("appointments")
         return jsonify({"message": "Booking created successfully!", "status": "Pending"}), 201
-    except Exception as e:
-        print("Error creating booking:", e)
-        return jsonify({"error": "An error occurred while processing your request."}), 500
+    except Exception:
+        conn.rollback()
+        raise
     finally:
+        cursor.close()
         conn.close()
 
+# Statements and shaping shared with the async handlers in backend/asgi.py.
+USER_CLIENT_SQL = """
+    SELECT a.id AS account_id, c.id AS client_id
+    FROM tbl_accounts a
+    JOIN tbl_clients c ON c.account_id=a.id
+    WHERE a.username=%s
+"""
+USER_APPOINTMENTS_SQL = """
+    SELECT id,
+           fullname,
+           service,
+           appointment_date,
+           time,
+           time_minute,
+           remarks,
+           status,
+           artist_name
+    FROM tbl_appointment
+    WHERE user_id=%s
+    ORDER BY appointment_date DESC, time_minute DESC, time DESC
+"""
+
+def _format_appointments(appointments):
+    # 12-hour "02:00 PM"; unparseable legacy strings are returned as-is
+    for apt in appointments:
+        minute = row_minute(apt.pop("time_minute"), apt["time"])
+        if minute is not None:
+            apt["time"] = format_slot(minute, padded=True)
+    return appointments
 
 @bookings_bp.route("/user/<username>", methods=["GET"])
 def get_user_appointments(username):
     conn = get_connection()
     cursor = conn.cursor(dictionary=True)
     try:
-        cursor.execute("""
-            SELECT a.id AS account_id, c.id AS client_id
-            FROM tbl_accounts a
-            JOIN tbl_clients c ON c.account_id=a.id
-            WHERE a.username=%s
-        """, (username,))
+        cursor.execute(USER_CLIENT_SQL, (username,))
         user = cursor.fetchone()
         if not user:
             return jsonify({"error": "User not found"}), 404
 
-        cursor.execute("""
-            SELECT id,
-                   fullname,
-                   service,
-                   appointment_date,
-                   time,
-                   remarks,
-                   status,
-                   artist_name
-            FROM tbl_appointment
-            WHERE user_id=%s
-            ORDER BY appointment_date DESC, time DESC
-        """, (user["client_id"],))
-        appointments = cursor.fetchall()
-
-        # Normalize time strings to 12-hour format with AM/PM
-        for apt in appointments:
-            t = apt.get("time")
-            if t:
-                try:
-                    # handle "14:00", "2:00 PM", etc.
-                    try:
-                        parsed = datetime.strptime(t.strip(), "%H:%M")
-                    except ValueError:
-                        parsed = datetime.strptime(t.strip(), "%I:%M %p")
-                    apt["time"] = parsed.strftime("%I:%M %p")
-                except Exception:
-                    apt["time"] = t  # leave as-is if parsing fails
-
-        return jsonify(appointments), 200
+        cursor.execute(USER_APPOINTMENTS_SQL, (user["client_id"],))
+        return jsonify(_format_appointments(cursor.fetchall())), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
     finally:
@@ -148,17 +176,21 @@ def cancel_appointment(appointment_id):
             return jsonify({'error': 'Appointment already in a terminal state, cannot be cancelled'}), 400
 
         cursor.execute("UPDATE tbl_appointment SET status='Cancelled' WHERE id=%s", (appointment_id,))
+        counters.appointment_status_changed(cursor, apt['artist_id'], apt['appointment_date'], apt['service'],
+                                            apt['status'], 'Cancelled')
 
         try:
             cursor.execute("""
                 UPDATE tbl_staff_unavailability
-                SET unavailable_time=NULL
-                WHERE staff_id=%s AND unavailable_date=%s AND unavailable_time=%s
-            """, (apt['artist_id'], apt['appointment_date'], apt['time']))
+                SET unavailable_time=NULL, unavailable_minute=NULL
+                WHERE staff_id=%s AND unavailable_date=%s AND unavailable_minute=%s
+            """, (apt['artist_id'], apt['appointment_date'], row_minute(apt['time_minute'], apt['time'])))
         except Exception:
             pass
 
         conn.commit()
+        invalidate_counts("tbl_appointment")
+        cache.invalidate("appointments")
 
         # send cancellation email if email exists
         try:
@@ -189,55 +221,85 @@ def cancel_appointment(appointment_id):
         conn.close()
 
 
-@bookings_bp.route("/available_slots", methods=["GET"])
-def get_available_slots():
-    date = request.args.get("date")
-    staff_id = request.args.get("staff_id")
+def _available_slots_args(args):
+    # (day, staff_id) to look up, or None when the answer is an empty list.
+    date = args.get("date")
+    staff_id = args.get("staff_id")
     if not date or not staff_id:
-        return jsonify({"error": "Missing parameters"}), 400
-
-    conn = get_connection()
-    cursor = conn.cursor(dictionary=True)
-    cursor.execute("""
-        SELECT unavailable_time FROM tbl_staff_unavailability
-        WHERE staff_id=%s AND unavailable_date=%s
-        ORDER BY unavailable_time ASC
-    """, (staff_id, date))
-    rows = cursor.fetchall()
-    unavailable_times = {row["unavailable_time"] for row in rows}
+        raise ValueError("Missing parameters")
+    try:
+        day = parse_day(date)
+        staff_id = int(staff_id)
+    except (TypeError, ValueError):
+        return None
+    if not open_mask(day):
+        return None
+    return day, staff_id
 
+@bookings_bp.route("/available_slots", methods=["GET"])
+def get_available_slots():
     try:
-        dt = datetime.strptime(date, "%Y-%m-%d")
-        weekday = dt.weekday()
-    except Exception:
-        cursor.close()
-        conn.close()
+        lookup = _available_slots_args(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if lookup is None:
         return jsonify({"available_times": []})
+    day, staff_id = lookup
 
-    # closed on Sundays
-    if weekday == 6:
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        masks = compute_availability(cursor, [staff_id], day, day)
+        return jsonify({"available_times": mask_to_times(masks[staff_id][day])})
+    finally:
         cursor.close()
         conn.close()
-        return jsonify({"available_times": []})
 
-    start_hour = 9
-    end_hour = 17 if weekday == 5 else 21
-    default_slots = [f"{h%12 or 12}:{m:02d} {'AM' if h < 12 else 'PM'}"
-                     for h in range(start_hour, end_hour) for m in [0]]
 
-    cursor.execute("""
-        SELECT time FROM tbl_appointment
-        WHERE appointment_date=%s AND artist_id=%s AND status!='Cancelled'
-    """, (date, staff_id))
-    booked = {row["time"] for row in cursor.fetchall()}
+def _availability_args(args):
+    start = args.get("start")
+    end = args.get("end") or start
+    raw_ids = args.getlist("staff_id")
+    if not start or not raw_ids:
+        raise ValueError("Missing parameters")
 
-    # normalize to 12hr strings
-    unavailable_times_12hr = set([datetime.strptime(t, "%H:%M").strftime("%I:%M %p") for t in unavailable_times])
-    booked_12hr = set([datetime.strptime(t, "%H:%M").strftime("%I:%M %p") for t in booked])
-    all_unavailable = unavailable_times_12hr | booked_12hr
-
-    available_times = [t for t in default_slots if t not in all_unavailable]
+    try:
+        start_day, end_day = parse_day(start), parse_day(end)
+        staff_ids = [int(s) for part in raw_ids for s in part.split(",") if s.strip()]
+    except (TypeError, ValueError):
+        raise ValueError("Invalid date or staff_id")
+    if end_day < start_day:
+        raise ValueError("end must not be before start")
+    if (end_day - start_day).days >= MAX_RANGE_DAYS:
+        raise ValueError(f"Range is limited to {MAX_RANGE_DAYS} days")
+    return start_day, end_day, staff_ids
+
+
+def _availability_body(start_day, end_day, masks):
+    # Each day is a bitmap over "slots": bit i set means slots[i] is free.
+    return {
+        "start": start_day.isoformat(),
+        "end": end_day.isoformat(),
+        "slots": SLOT_LABELS,
+        "staff": {
+            str(staff_id): {day.isoformat(): mask for day, mask in days.items()}
+            for staff_id, days in masks.items()
+        }
+    }
+
+
+@bookings_bp.route("/availability", methods=["GET"])
+def get_availability():
+    try:
+        start_day, end_day, staff_ids = _availability_args(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
-    cursor.close()
-    conn.close()
-    return jsonify({"available_times": available_times})
\ No newline at end of file
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        masks = compute_availability(cursor, staff_ids, start_day, end_day)
+    finally:
+        cursor.close()
+        conn.close()
+    return jsonify(_availability_body(start_day, end_day, masks))
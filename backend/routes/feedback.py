@@ -1,24 +1,95 @@
-from flask import Blueprint, request, jsonify
+import hashlib
+import json
+import os
+from flask import Blueprint, request, jsonify, make_response, url_for
 from backend.db import get_connection
+from backend.utils.pagination import CursorError, clamp_per_page, invalidate_counts, keyset_result, keyset_statement
+from backend.utils import cache, counters
 from backend.utils.email_utils import send_feedback_reply_email
 from datetime import datetime
 
 feedback_bp = Blueprint("feedback", __name__)
 
-@feedback_bp.route("", methods=["GET"])
-def get_feedback():
+# The public testimonials feed is read far more than it is written, so pages
+# are kept in the response cache (backend/utils/cache.py) as ready-to-send
+# JSON under the "feedback" tag. post_feedback and admin_reply_feedback
+# invalidate it; FEEDBACK_CACHE_TTL bounds how stale a page can be in worker
+# processes that don't share the cache backend.
+FEEDBACK_PAGE_SIZE = int(os.getenv("FEEDBACK_PAGE_SIZE", "20"))
+FEEDBACK_MAX_PAGE_SIZE = int(os.getenv("FEEDBACK_MAX_PAGE_SIZE", "100"))
+FEEDBACK_CACHE_TTL = float(os.getenv("FEEDBACK_CACHE_TTL", "60"))
+FEEDBACK_CACHE_TAGS = ("feedback",)
+FEEDBACK_SORT = [("date_submitted", "DESC"), ("id", "DESC")]
+
+def invalidate_feedback_cache():
+    cache.invalidate(*FEEDBACK_CACHE_TAGS)
+
+FEED_SELECT = """username, stars, message, COALESCE(reply, '') AS reply,
+               DATE_FORMAT(date_submitted, '%Y-%m-%d %H:%i') AS date"""
+
+def _feed_statement(token, per_page):
+    return keyset_statement(FEED_SELECT, "FROM tbl_feedback", [], [], FEEDBACK_SORT, "feed", per_page, token)
+
+def _page_from_rows(rows, state):
+    rows, next_cursor, _ = keyset_result(rows, state)
+    body = json.dumps(rows).encode("utf-8")
+    return {"body": body, "etag": hashlib.sha256(body).hexdigest()[:32], "next_cursor": next_cursor}
+
+def _load_page(token, per_page):
+    statement, params, state = _feed_statement(token, per_page)
     conn = get_connection()
     cursor = conn.cursor(dictionary=True)
-    cursor.execute("""
-        SELECT username, stars, message, COALESCE(reply, '') AS reply,
-               DATE_FORMAT(date_submitted, '%Y-%m-%d %H:%i') AS date
-        FROM tbl_feedback
-        ORDER BY date_submitted DESC
-    """)
-    feedback = cursor.fetchall()
-    cursor.close()
-    conn.close()
-    return jsonify(feedback)
+    try:
+        cursor.execute(statement, params)
+        rows = cursor.fetchall()
+    finally:
+        cursor.close()
+        conn.close()
+    return _page_from_rows(rows, state)
+
+def _page_key(key):
+    token, per_page = key
+    return f"feedback.page:{token}:{per_page}"
+
+def _cached_page(key):
+    # (page or None, tag versions to pass to _store_page)
+    return cache.lookup("feedback.get_feedback", _page_key(key), FEEDBACK_CACHE_TAGS)
+
+def _store_page(key, page, versions):
+    # Not stored if a write invalidated the feed while we were reading.
+    return cache.store("feedback.get_feedback", _page_key(key), page, FEEDBACK_CACHE_TTL,
+                       FEEDBACK_CACHE_TAGS, versions)
+
+def _get_page(token, per_page):
+    key = (token or "", per_page)
+    page, versions = _cached_page(key)
+    if page:
+        return page
+    return _store_page(key, _load_page(token, per_page), versions)
+
+def _feed_per_page(args):
+    return min(clamp_per_page(args.get("per_page"), FEEDBACK_PAGE_SIZE), FEEDBACK_MAX_PAGE_SIZE)
+
+@feedback_bp.route("", methods=["GET"])
+def get_feedback():
+    # Newest first, one page per request. The body stays a plain list; the
+    # cursor for the next page is in X-Next-Cursor (and a Link header).
+    per_page = _feed_per_page(request.args)
+    try:
+        page = _get_page(request.args.get("cursor") or None, per_page)
+    except CursorError as e:
+        return jsonify({"error": str(e)}), 400
+
+    response = make_response(page["body"])
+    response.mimetype = "application/json"
+    response.set_etag(page["etag"])
+    response.headers["Cache-Control"] = "public, no-cache"
+    if page["next_cursor"]:
+        response.headers["X-Next-Cursor"] = page["next_cursor"]
+        next_url = url_for("feedback.get_feedback", cursor=page["next_cursor"], per_page=per_page)
+        response.headers["Link"] = f'<{next_url}>; rel="next"'
+    response.headers.add("Access-Control-Expose-Headers", "X-Next-Cursor, Link")
+    return response.make_conditional(request)
 
 @feedback_bp.route("", methods=["POST"])
 def post_feedback():
@@ -40,7 +111,10 @@ def post_feedback():
             INSERT INTO tbl_feedback (account_id, username, stars, message, date_submitted)
             VALUES (%s, %s, %s, %s, %s)
         """, (account_id, username, stars, message, datetime.now()))
+        counters.feedback_added(cursor)
         conn.commit()
+        invalidate_counts("tbl_feedback")
+        invalidate_feedback_cache()
         return jsonify({"message": "Feedback submitted successfully!"}), 201
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -1,38 +1,85 @@
+import hashlib
+import json
 import os
-from flask import Blueprint, jsonify, send_from_directory
+import threading
+import time
+from flask import Blueprint, make_response, request
+
+from backend.utils.assets import asset_path, send_asset
 
 services_bp = Blueprint("services", __name__)
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 REACT_PUBLIC_PATH = os.path.join(BASE_DIR, "../../marmu-react/public/assets")
+TATTOO_FOLDER = os.path.join(REACT_PUBLIC_PATH, "tattoo_images")
+HAIRCUT_FOLDER = os.path.join(REACT_PUBLIC_PATH, "haircut_images")
+
+# Public origin the image URLs are built from; set to "" for relative URLs.
+ASSET_BASE_URL = os.getenv("ASSET_BASE_URL", "http://localhost:5000").rstrip("/")
+CATALOGUE_CHECK_INTERVAL = float(os.getenv("CATALOGUE_CHECK_INTERVAL", "5"))
+
+# {"key", "body", "etag"}; replaced whole, never updated in place, so a reader
+# always gets a body and the etag computed from it.
+_catalogue = None
+_catalogue_checked_at = 0.0
+_catalogue_lock = threading.Lock()
 
-# Serve static images directly
+# Serve static images directly (fingerprinted names are cached as immutable)
 @services_bp.route('/assets/<path:filename>')
 def serve_assets(filename):
-    return send_from_directory(REACT_PUBLIC_PATH, filename)
+    return send_asset(filename)
+
+def _get_images(folder, service_type):
+    images = []
+    if not os.path.exists(folder):
+        return []
+    for filename in os.listdir(folder):
+        if filename.lower().endswith(".png"):
+            name = os.path.splitext(filename)[0].replace("_", " ").replace("-", " ").title()
+            image_url = f"{ASSET_BASE_URL}/assets/{asset_path(f'{service_type}_images/{filename}')}"
+            images.append({"name": name, "image": image_url})
+    return sorted(images, key=lambda x: x["name"])
+
+def _folder_mtime(folder):
+    # Includes the files' own mtimes: an image replaced in place changes its
+    # fingerprinted URL without touching the folder.
+    try:
+        with os.scandir(folder) as entries:
+            files = tuple(sorted((e.name, e.stat().st_mtime_ns) for e in entries))
+        return (os.stat(folder).st_mtime_ns, files)
+    except OSError:
+        return None
+
+def _get_catalogue():
+    # The catalogue only changes when images are added, removed or replaced.
+    # Rebuild on an mtime change, and stat at most every few seconds.
+    global _catalogue, _catalogue_checked_at
+    now = time.monotonic()
+    catalogue = _catalogue
+    if catalogue is not None and now - _catalogue_checked_at < CATALOGUE_CHECK_INTERVAL:
+        return catalogue
+    with _catalogue_lock:
+        catalogue = _catalogue
+        key = (_folder_mtime(TATTOO_FOLDER), _folder_mtime(HAIRCUT_FOLDER), ASSET_BASE_URL)
+        if catalogue is None or catalogue["key"] != key:
+            tattoos = _get_images(TATTOO_FOLDER, "tattoo")
+            haircuts = _get_images(HAIRCUT_FOLDER, "haircut")
+            body = json.dumps({
+                "tattoos": tattoos,
+                "haircuts": haircuts,
+                "total": len(tattoos) + len(haircuts)
+            }).encode("utf-8")
+            catalogue = {"key": key, "body": body, "etag": hashlib.sha256(body).hexdigest()[:32]}
+            _catalogue = catalogue
+        _catalogue_checked_at = now
+    return catalogue
 
 # Return list of tattoo + haircut images
 @services_bp.route("/images", methods=["GET"])
 def get_service_images():
-    tattoo_folder = os.path.join(REACT_PUBLIC_PATH, "tattoo_images")
-    haircut_folder = os.path.join(REACT_PUBLIC_PATH, "haircut_images")
-
-    def get_images(folder, service_type):
-        images = []
-        if not os.path.exists(folder):
-            return []
-        for filename in os.listdir(folder):
-            if filename.lower().endswith(".png"):
-                name = os.path.splitext(filename)[0].replace("_", " ").replace("-", " ").title()
-                image_url = f"http://localhost:5000/assets/{service_type}_images/{filename}"
-                images.append({"name": name, "image": image_url})
-        return sorted(images, key=lambda x: x["name"])
-
-    tattoos = get_images(tattoo_folder, "tattoo")
-    haircuts = get_images(haircut_folder, "haircut")
-
-    return jsonify({
-        "tattoos": tattoos,
-        "haircuts": haircuts,
-        "total": len(tattoos) + len(haircuts)
-    }), 200
+    catalogue = _get_catalogue()
+    response = make_response(catalogue["body"])
+    response.mimetype = "application/json"
+    response.set_etag(catalogue["etag"])
+    response.headers["Cache-Control"] = "public, no-cache"
+    return response.make_conditional(request)
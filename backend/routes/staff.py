@@ -1,8 +1,33 @@
 from flask import Blueprint, request, jsonify
 from backend.db import get_connection
+from backend.utils import staff_directory
+from backend.utils.cache import cached
+from backend.utils.availability import iter_days, parse_day, slot_index
+from backend.utils.slots import format_slot, parse_slot
 
 staff_bp = Blueprint("staff", __name__)
 
+INSERT_BATCH_SIZE = 500
+MAX_BULK_ROWS = 20000
+MAX_BULK_DAYS = 366
+
+def _insert_unavailability(cursor, rows):
+    # rows: (staff_id, date, minute of day). Multi-row INSERTs,
+    # INSERT_BATCH_SIZE rows per statement.
+    for i in range(0, len(rows), INSERT_BATCH_SIZE):
+        batch = rows[i:i + INSERT_BATCH_SIZE]
+        values = ", ".join(["(%s, %s, %s, %s)"] * len(batch))
+        cursor.execute(
+            "INSERT INTO tbl_staff_unavailability (staff_id, unavailable_date, unavailable_time, unavailable_minute) "
+            f"VALUES {values}",
+            tuple(v for staff_id, day, minute in batch for v in (staff_id, day, format_slot(minute), minute)),
+        )
+
+def _grid_minute(value):
+    # Minute of day of a time on the shop-hours grid (the only slots
+    # availability reads), else None. Both unavailability endpoints use it.
+    return parse_slot(value) if slot_index(value) is not None else None
+
 @staff_bp.route("/unavailability", methods=["POST"])
 def add_unavailability():
     data = request.get_json()
@@ -12,17 +37,16 @@ def add_unavailability():
 
     if not staff_id or not unavailable_date or not unavailable_times:
         return jsonify({"error": "Missing required fields"}), 400
+    minutes = [_grid_minute(t) for t in unavailable_times]
+    if None in minutes:
+        return jsonify({"error": f"Invalid time slot: {unavailable_times[minutes.index(None)]}"}), 400
 
     conn = get_connection()
     cursor = conn.cursor()
     try:
         cursor.execute("DELETE FROM tbl_staff_unavailability WHERE staff_id=%s AND unavailable_date=%s",
                        (staff_id, unavailable_date))
-        for t in unavailable_times:
-            cursor.execute("""
-                INSERT INTO tbl_staff_unavailability (staff_id, unavailable_date, unavailable_time)
-                VALUES (%s, %s, %s)
-            """, (staff_id, unavailable_date, t))
+        _insert_unavailability(cursor, [(staff_id, unavailable_date, m) for m in dict.fromkeys(minutes)])
         conn.commit()
         return jsonify({"message": "Unavailability saved successfully"}), 201
     except Exception as e:
@@ -30,10 +54,91 @@ def add_unavailability():
     finally:
         conn.close()
 
+def _expand_bulk_request(data):
+    # Turns a bulk request into {date: [minutes of day]}. Days come from "dates" and/or
+    # "ranges" ([{"start", "end"}]). Times come from a weekly template
+    # ("weekly": {"0": [...], "5": [...]}, Monday=0) or from "times" applied
+    # to every day whose weekday is in "weekdays" (default: all).
+    days = set()
+    for d in data.get("dates") or []:
+        days.add(parse_day(d))
+    for r in data.get("ranges") or []:
+        start = parse_day(r["start"])
+        end = parse_day(r.get("end") or r["start"])
+        if end < start or (end - start).days >= MAX_BULK_DAYS:
+            raise ValueError(f"Each range must run forward and span at most {MAX_BULK_DAYS} days")
+        days.update(iter_days(start, end))
+
+    minutes = {}
+    for t in list(data.get("times") or []) + [t for v in (data.get("weekly") or {}).values() for t in v]:
+        if t not in minutes:
+            minutes[t] = _grid_minute(t)
+            if minutes[t] is None:
+                raise ValueError(f"Invalid time slot: {t}")
+    weekly = {int(k): [minutes[t] for t in v] for k, v in (data.get("weekly") or {}).items()}
+    times = [minutes[t] for t in data.get("times") or []]
+    weekdays = set(int(w) for w in data.get("weekdays", range(7)))
+
+    plan = {}
+    for day in sorted(days):
+        if weekly:
+            day_times = weekly.get(day.weekday(), [])
+        else:
+            day_times = times if day.weekday() in weekdays else []
+        if day_times:
+            plan[day] = list(dict.fromkeys(day_times))
+    return plan
+
+@staff_bp.route("/unavailability/bulk", methods=["POST"])
+def add_unavailability_bulk():
+    data = request.get_json(silent=True) or {}
+    staff_ids = data.get("staff_ids") or ([data["staff_id"]] if data.get("staff_id") else [])
+    replace = data.get("replace", True)
+
+    try:
+        staff_ids = sorted({int(s) for s in staff_ids})
+        plan = _expand_bulk_request(data)
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify({"error": f"Invalid request: {e}"}), 400
+    if not staff_ids or not plan:
+        return jsonify({"error": "Missing staff_ids, days or times"}), 400
+
+    rows = [(staff_id, day, m) for staff_id in staff_ids for day, day_minutes in plan.items() for m in day_minutes]
+    if len(rows) > MAX_BULK_ROWS:
+        return jsonify({"error": f"Request expands to {len(rows)} slots; the limit is {MAX_BULK_ROWS}"}), 400
+
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        if replace:
+            # Same semantics as the single-day endpoint: the listed days are rewritten.
+            staff_sql = ", ".join(["%s"] * len(staff_ids))
+            days = list(plan)
+            for i in range(0, len(days), INSERT_BATCH_SIZE):
+                batch = days[i:i + INSERT_BATCH_SIZE]
+                day_sql = ", ".join(["%s"] * len(batch))
+                cursor.execute(
+                    f"DELETE FROM tbl_staff_unavailability WHERE staff_id IN ({staff_sql}) AND unavailable_date IN ({day_sql})",
+                    (*staff_ids, *batch),
+                )
+        _insert_unavailability(cursor, rows)
+        conn.commit()
+        return jsonify({
+            "message": "Unavailability saved successfully",
+            "staff": len(staff_ids),
+            "days": len(plan),
+            "inserted": len(rows)
+        }), 201
+    except Exception as e:
+        conn.rollback()
+        return jsonify({"error": str(e)}), 500
+    finally:
+        cursor.close()
+        conn.close()
+
 @staff_bp.route("/by-service/<service>", methods=["GET"])
+@cached(ttl=300, tags=("staff",))
 def get_staff_by_service(service):
-    conn = get_connection()
-    cursor = conn.cursor(dictionary=True)
     try:
         role = None
         if service.lower() == "haircut":
@@ -43,34 +148,24 @@ def get_staff_by_service(service):
         if not role:
             return jsonify([]), 200
 
-        query = """
-            SELECT a.id, s.fullname
-            FROM tbl_accounts AS a
-            JOIN tbl_staff AS s ON s.account_id = a.id
-            WHERE a.role = %s AND s.specialization = %s
-        """
-        cursor.execute(query, (role, role))
-        staff = cursor.fetchall()
-
+        # Account id and name of staff whose account role matches too.
+        staff = [{"id": member["account_id"], "fullname": member["fullname"]}
+                 for member in staff_directory.by_specialization(role)
+                 if (member["role"] or "").lower() == role.lower()]
         return jsonify(staff), 200
     except Exception as e:
         print("❌ Error in get_staff_by_service:", e)
         return jsonify({"error": str(e)}), 500
-    finally:
-        cursor.close()
-        conn.close()
 
 @staff_bp.route("/unavailability/list", methods=["GET"])
 def get_staff_unavailability_list():
     conn = get_connection()
     cursor = conn.cursor(dictionary=True)
     try:
-        cursor.execute("""
-            SELECT tsu.*, s.fullname AS staff_name
-            FROM tbl_staff_unavailability tsu
-            JOIN tbl_staff s ON tsu.staff_id = s.id
-        """)
-        results = cursor.fetchall()
+        cursor.execute("SELECT * FROM tbl_staff_unavailability")
+        names = staff_directory.names()
+        results = [dict(row, staff_name=names[row["staff_id"]]) for row in cursor.fetchall()
+                   if row["staff_id"] in names]
         return jsonify(results), 200
     finally:
         cursor.close()
@@ -0,0 +1,30 @@
+import os
+import threading
+
+from dotenv import load_dotenv
+
+# .env loading, done once when the backend package is first imported, i.e.
+# before any module that reads its settings from the environment at import
+# time. Variables already set in the environment win over the file;
+# DOTENV_PATH points at a file other than ./.env.
+
+_loaded = False
+_lock = threading.Lock()
+
+
+def load_env(path=None):
+    global _loaded
+    if _loaded:
+        return
+    with _lock:
+        if not _loaded:
+            load_dotenv(path or os.getenv("DOTENV_PATH") or None)
+            _loaded = True
+
+
+def instance_dir(*parts):
+    # Where the app keeps files it writes for itself (response cache, built
+    # assets): INSTANCE_DIR, default backend/instance. Not a shared temp dir,
+    # where another local user could plant or read them.
+    root = os.getenv("INSTANCE_DIR") or os.path.join(os.path.dirname(os.path.abspath(__file__)), "instance")
+    return os.path.join(root, *parts)
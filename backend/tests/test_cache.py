@@ -0,0 +1,93 @@
+import time
+
+import pytest
+from flask import Flask, jsonify
+
+from backend.utils import cache
+from backend.utils.cache import MemoryCache, SQLiteCache
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def backend(request, tmp_path):
+    if request.param == "memory":
+        return MemoryCache(max_entries=3)
+    return SQLiteCache(str(tmp_path / "cache.sqlite3"), max_entries=3)
+
+
+def test_get_returns_what_was_set(backend):
+    value = [b"\x00body", [["Content-Type", "application/json"]]]
+    assert backend.set("k", value, 30, ("staff",))
+    assert backend.get("k") == value
+    assert backend.get("missing") is None
+
+
+def test_expired_entries_miss(backend):
+    backend.set("k", "v", 0.01)
+    time.sleep(0.05)
+    assert backend.get("k") is None
+
+
+def test_invalidate_drops_tagged_entries_and_bumps_the_version(backend):
+    backend.set("a", "1", 30, ("staff",))
+    backend.set("b", "2", 30, ("feedback",))
+    assert backend.versions(["staff", "feedback"]) == {"staff": 0, "feedback": 0}
+    backend.invalidate(["staff"])
+    assert backend.get("a") is None and backend.get("b") == "2"
+    assert backend.versions(["staff", "feedback"]) == {"staff": 1, "feedback": 0}
+
+
+def test_store_is_skipped_when_a_tag_moved_since_the_read(backend):
+    versions = backend.versions(["staff"])
+    backend.invalidate(["staff"])  # a write lands while the view computes
+    assert not backend.set("k", "stale", 30, ("staff",), versions)
+    assert backend.get("k") is None
+    assert backend.set("k", "fresh", 30, ("staff",), backend.versions(["staff"]))
+    assert backend.get("k") == "fresh"
+
+
+def test_least_recently_used_entry_is_evicted(backend):
+    for key in ("a", "b", "c"):
+        backend.set(key, key, 30)
+    if isinstance(backend, SQLiteCache):
+        backend.TOUCH_INTERVAL = 0
+        time.sleep(0.01)
+    assert backend.get("a") == "a"
+    backend.set("d", "d", 30)
+    assert backend.size() == 3
+    assert backend.get("b") is None and backend.get("a") == "a"
+
+
+def test_sqlite_cache_refuses_values_json_cannot_hold(tmp_path):
+    with pytest.raises(TypeError):
+        SQLiteCache(str(tmp_path / "cache.sqlite3")).set("k", object(), 30)
+
+
+@pytest.fixture
+def app(monkeypatch):
+    monkeypatch.setattr(cache, "_cache", MemoryCache())
+    monkeypatch.setattr(cache, "CACHE_ENABLED", True)
+    calls = []
+    app = Flask(__name__)
+
+    @app.route("/staff")
+    @cache.cached(ttl=30, tags=("staff",))
+    def staff():
+        calls.append(1)
+        return jsonify(count=len(calls))
+
+    app.calls = calls
+    return app
+
+
+def test_cached_view_hits_until_its_tag_is_invalidated(app):
+    client = app.test_client()
+    first = client.get("/staff")
+    assert first.headers["X-Cache"] == "MISS" and first.json == {"count": 1}
+    second = client.get("/staff")
+    assert second.headers["X-Cache"] == "HIT" and second.json == {"count": 1}
+    assert client.get("/staff", headers={"If-None-Match": first.headers["ETag"]}).status_code == 304
+
+    cache.invalidate("staff")
+    third = client.get("/staff")
+    assert third.headers["X-Cache"] == "MISS" and third.json == {"count": 2}
+    assert len(app.calls) == 2
@@ -0,0 +1,179 @@
+import smtplib
+import socketserver
+import threading
+from email.message import EmailMessage
+
+import pytest
+
+from backend.utils.email_queue import EmailQueue, _transient
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    def reply(self, line):
+        self.wfile.write(line.encode("ascii") + b"\r\n")
+
+    def handle(self):
+        stub = self.server.stub
+        with stub.lock:
+            stub.connections += 1
+        self.reply("220 stub ESMTP")
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            verb = line.decode("ascii", "replace").strip().split(" ")[0].upper()
+            with stub.lock:
+                scripted = stub.script.get(verb)
+                reply = scripted.pop(0) if scripted else None
+            if reply == "drop":
+                return
+            if reply:
+                self.reply(reply)
+            elif verb in ("EHLO", "HELO"):
+                self.reply("250 stub")
+            elif verb in ("MAIL", "RCPT", "RSET", "NOOP"):
+                self.reply("250 ok")
+            elif verb == "DATA":
+                self.reply("354 go ahead")
+                lines = []
+                while True:
+                    data = self.rfile.readline()
+                    if data in (b".\r\n", b""):
+                        break
+                    lines.append(data)
+                with stub.lock:
+                    stub.messages.append(b"".join(lines))
+                self.reply("250 queued")
+            elif verb == "QUIT":
+                self.reply("221 bye")
+                return
+            else:
+                self.reply("502 not implemented")
+
+
+class SMTPStub:
+    # Local SMTP stand-in: records delivered messages, counts connections and
+    # answers a verb with scripted replies first ("drop" closes the socket).
+
+    def __init__(self):
+        self.messages = []
+        self.connections = 0
+        self.script = {}
+        self.lock = threading.Lock()
+        self.server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), _SMTPHandler)
+        self.server.daemon_threads = True
+        self.server.stub = self
+        self.port = self.server.server_address[1]
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def smtp():
+    stub = SMTPStub()
+    yield stub
+    stub.close()
+
+
+@pytest.fixture
+def make_queue(smtp):
+    queues = []
+
+    def make(**kwargs):
+        config = dict(starttls=False, workers=1, backoff=0, timeout=5)
+        config.update(kwargs)
+        q = EmailQueue("127.0.0.1", smtp.port, **config)
+        queues.append(q)
+        return q
+
+    yield make
+    for q in queues:
+        q.stop()
+
+
+def message(n=0):
+    msg = EmailMessage()
+    msg["From"] = "shop@example.com"
+    msg["To"] = f"client{n}@example.com"
+    msg["Subject"] = f"Test {n}"
+    msg.set_content("hello")
+    return msg
+
+
+def test_messages_share_one_session(smtp, make_queue):
+    q = make_queue()
+    for n in range(3):
+        assert q.enqueue(message(n))
+    q.join()
+    stats = q.stats()
+    assert len(smtp.messages) == 3
+    assert stats["sent"] == 3
+    assert stats["sessions_opened"] == 1
+    assert smtp.connections == 1
+
+
+def test_4xx_is_retried_on_a_fresh_session(smtp, make_queue):
+    smtp.script["DATA"] = ["451 try again later"]
+    q = make_queue()
+    q.enqueue(message())
+    q.join()
+    stats = q.stats()
+    assert stats["sent"] == 1 and stats["retries"] == 1 and stats["failed"] == 0
+    assert smtp.connections == 2
+
+
+def test_dropped_connection_is_retried(smtp, make_queue):
+    smtp.script["MAIL"] = ["drop"]
+    q = make_queue()
+    q.enqueue(message())
+    q.join()
+    assert q.stats()["sent"] == 1
+    assert len(smtp.messages) == 1
+
+
+def test_permanent_failure_is_not_retried(smtp, make_queue):
+    smtp.script["RCPT"] = ["550 no such user"]
+    q = make_queue()
+    q.enqueue(message())
+    q.join()
+    stats = q.stats()
+    assert stats["failed"] == 1 and stats["retries"] == 0 and stats["sent"] == 0
+    assert "SMTPRecipientsRefused" in stats["last_error"]
+
+
+def test_gives_up_after_max_retries(smtp, make_queue):
+    smtp.script["DATA"] = ["451 try again later"] * 5
+    q = make_queue(max_retries=2)
+    q.enqueue(message())
+    q.join()
+    stats = q.stats()
+    assert stats["failed"] == 1 and stats["retries"] == 2
+    assert not smtp.messages
+
+
+def test_full_queue_drops_instead_of_raising(make_queue):
+    q = make_queue(maxsize=1)
+    q.start = lambda: None  # no workers, so nothing drains the queue
+    assert q.enqueue(message(1))
+    assert not q.enqueue(message(2))
+    stats = q.stats()
+    assert stats["enqueued"] == 1 and stats["dropped"] == 1
+
+
+@pytest.mark.parametrize("error, transient", [
+    (smtplib.SMTPServerDisconnected("gone"), True),
+    (smtplib.SMTPConnectError(421, b"busy"), True),
+    (smtplib.SMTPDataError(451, b"later"), True),
+    (ConnectionRefusedError(), True),
+    (TimeoutError(), True),
+    (smtplib.SMTPDataError(554, b"rejected"), False),
+    (smtplib.SMTPSenderRefused(553, b"no", "shop@example.com"), False),
+    (smtplib.SMTPAuthenticationError(535, b"bad credentials"), False),
+    (smtplib.SMTPRecipientsRefused({"a@example.com": (550, b"no")}), False),
+    (ValueError("bad message"), False),
+])
+def test_transient(error, transient):
+    assert _transient(error) is transient
@@ -0,0 +1,89 @@
+import pytest
+
+from backend.utils.pagination import (
+    CursorError, _offset_statement, clamp_per_page, decode_cursor, encode_cursor, keyset_condition,
+    keyset_result, keyset_statement,
+)
+
+COLUMNS = [("a.appointment_date", "ASC"), ("COALESCE(a.time_minute, 1440)", "ASC"), ("a.id", "ASC")]
+
+
+def test_cursor_round_trip():
+    token = encode_cursor(["2026-05-01", 840, 17], "next", "date")
+    assert "=" not in token
+    assert decode_cursor(token, "date", 3) == (["2026-05-01", 840, 17], "next")
+
+
+@pytest.mark.parametrize("token, sort, width", [
+    ("not a cursor!", "date", 3),
+    (encode_cursor([1, 2, 3], "next", "date"), "name", 3),   # another sort
+    (encode_cursor([1, 2], "next", "date"), "date", 3),      # wrong width
+    (encode_cursor([1, 2, 3], "sideways", "date"), "date", 3),
+])
+def test_decode_cursor_rejects(token, sort, width):
+    with pytest.raises(CursorError):
+        decode_cursor(token, sort, width)
+
+
+def test_keyset_condition_follows_each_direction():
+    sql, params = keyset_condition([("a", "ASC"), ("b", "DESC"), ("c", "ASC")], [1, 2, 3])
+    assert sql == "(a > %s OR (a = %s AND (b < %s OR (b = %s AND c > %s))))"
+    assert params == [1, 1, 2, 2, 3]
+    sql, _ = keyset_condition([("a", "ASC"), ("c", "ASC")], [1, 3], reverse=True)
+    assert sql == "(a < %s OR (a = %s AND c < %s))"
+
+
+def test_keyset_condition_rejects_null_keys():
+    with pytest.raises(CursorError):
+        keyset_condition(COLUMNS, ["2026-05-01", None, 3])
+
+
+def test_first_page_has_no_boundary():
+    statement, params, _ = keyset_statement("a.id", "FROM tbl_appointment a", ["a.status=%s"], ["Pending"],
+                                            COLUMNS, "date", 20, "")
+    assert "WHERE a.status=%s\n" in statement
+    assert "ORDER BY a.appointment_date ASC, COALESCE(a.time_minute, 1440) ASC, a.id ASC" in statement
+    assert params == ("Pending", 21)
+
+
+def test_prev_cursor_reverses_the_order():
+    token = encode_cursor(["2026-05-01", 840, 17], "prev", "date")
+    statement, params, _ = keyset_statement("a.id", "FROM tbl_appointment a", [], [], COLUMNS, "date", 20, token)
+    assert "ORDER BY a.appointment_date DESC, COALESCE(a.time_minute, 1440) DESC, a.id DESC" in statement
+    assert params == ("2026-05-01", "2026-05-01", 840, 840, 17, 21)
+
+
+def rows(ids):
+    return [{"id": i, "_k0": "2026-05-01", "_k1": 600 + i, "_k2": i} for i in ids]
+
+
+def test_keyset_result_forward_pages():
+    state = (COLUMNS, "date", 2, None, False)
+    page, next_cursor, prev_cursor = keyset_result(rows([1, 2, 3]), state)
+    assert page == [{"id": 1}, {"id": 2}]
+    assert decode_cursor(next_cursor, "date", 3) == (["2026-05-01", 602, 2], "next")
+    assert prev_cursor is None
+
+    state = (COLUMNS, "date", 2, ["2026-05-01", 602, 2], False)
+    page, next_cursor, prev_cursor = keyset_result(rows([3]), state)
+    assert page == [{"id": 3}] and next_cursor is None
+    assert decode_cursor(prev_cursor, "date", 3) == (["2026-05-01", 603, 3], "prev")
+
+
+def test_keyset_result_backward_page_comes_back_in_order():
+    state = (COLUMNS, "date", 2, ["2026-05-01", 605, 5], True)
+    page, next_cursor, prev_cursor = keyset_result(rows([4, 3, 2]), state)
+    assert page == [{"id": 3}, {"id": 4}]
+    assert next_cursor is not None and prev_cursor is not None
+
+
+@pytest.mark.parametrize("value, expected", [(None, 20), ("abc", 20), ("0", 1), ("5", 5), ("10000", 200)])
+def test_clamp_per_page(value, expected):
+    assert clamp_per_page(value, 20) == expected
+
+
+def test_offset_page_must_be_a_number():
+    page, _, params = _offset_statement({"page": "3"}, "a.id", "FROM t a", [], [], COLUMNS, 20)
+    assert page == 3 and params[-2:] == (20, 40)
+    with pytest.raises(CursorError):
+        _offset_statement({"page": "abc"}, "a.id", "FROM t a", [], [], COLUMNS, 20)
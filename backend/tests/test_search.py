@@ -0,0 +1,57 @@
+import pytest
+
+from backend.utils import search
+from backend.utils.search import search_clause, search_terms
+
+COLUMNS = ["f.username", "f.message"]
+
+
+def test_empty_query_adds_nothing():
+    assert search_clause("", COLUMNS) == (None, [])
+    assert search_clause("  ", COLUMNS) == (None, [])
+    assert search_clause("!!", COLUMNS) == (None, [])
+
+
+def test_numeric_query_is_an_id_lookup():
+    assert search_clause("42", COLUMNS, id_column="f.id") == ("f.id = %s", [42])
+
+
+def test_numeric_query_without_id_column_is_a_term():
+    sql, params = search_clause("2024", COLUMNS)
+    assert sql.startswith("MATCH(")
+    assert params == ["+2024*"]
+
+
+def test_long_terms_use_fulltext_prefixes():
+    sql, params = search_clause("john smith", COLUMNS)
+    assert sql == "MATCH(f.username, f.message) AGAINST (%s IN BOOLEAN MODE)"
+    assert params == ["+john* +smith*"]
+
+
+def test_short_terms_match_any_word_start():
+    sql, params = search_clause("jo", COLUMNS)
+    assert sql == ("(f.username LIKE %s OR f.username LIKE %s OR f.message LIKE %s OR f.message LIKE %s)")
+    assert params == ["jo%", "% jo%", "jo%", "% jo%"]
+
+
+def test_short_terms_filter_the_fulltext_match():
+    sql, params = search_clause("jo smith", ["f.message"])
+    assert sql == "MATCH(f.message) AGAINST (%s IN BOOLEAN MODE) AND (f.message LIKE %s OR f.message LIKE %s)"
+    assert params == ["+smith*", "jo%", "% jo%"]
+
+
+def test_like_wildcards_in_terms_are_escaped():
+    _, params = search_clause("a_", ["f.message"])
+    assert params == ["a\\_%", "% a\\_%"]
+
+
+def test_punctuation_is_dropped_and_terms_are_capped():
+    assert search_terms("o'brien; DROP--") == ["o", "brien", "DROP"]
+    assert len(search_terms(" ".join(f"w{i}" for i in range(20)))) == search.MAX_TERMS
+
+
+@pytest.mark.parametrize("q", ["abc", "ab"])
+def test_min_token_size_decides_the_path(monkeypatch, q):
+    monkeypatch.setattr(search, "FT_MIN_TOKEN_SIZE", 3)
+    sql, _ = search_clause(q, COLUMNS)
+    assert sql.startswith("MATCH(") == (len(q) >= 3)
@@ -0,0 +1,57 @@
+from datetime import time, timedelta
+
+import pytest
+
+from backend.utils.slots import format_slot, parse_slot, row_minute
+
+
+@pytest.mark.parametrize("value, minute", [
+    ("14:00", 840),
+    ("2:00 PM", 840),
+    ("02:00 PM", 840),
+    ("2:00pm", 840),
+    ("14:00:00", 840),
+    (" 9:30 ", 570),
+    ("9:30 AM", 570),
+    ("12:00 AM", 0),
+    ("12:00 PM", 720),
+    ("12:30 PM", 750),
+    ("0:00", 0),
+    ("23:59", 1439),
+    (b"10:15", 615),
+    (840, 840),
+    (0, 0),
+    (timedelta(hours=14), 840),
+    (timedelta(hours=9, minutes=30, seconds=59), 570),
+    (time(14, 5), 845),
+])
+def test_parse_slot(value, minute):
+    assert parse_slot(value) == minute
+
+
+@pytest.mark.parametrize("value", [
+    None, True, "", "noon", "24:00", "12:60", "13:00 PM", "0:00 AM", "14", "14:0", -1, 1440,
+])
+def test_parse_slot_rejects(value):
+    assert parse_slot(value) is None
+
+
+@pytest.mark.parametrize("minute, text", [(0, "12:00 AM"), (540, "9:00 AM"), (720, "12:00 PM"), (840, "2:00 PM"),
+                                          (1439, "11:59 PM")])
+def test_format_slot(minute, text):
+    assert format_slot(minute) == text
+    assert format_slot(minute, padded=True) == text.zfill(8)
+
+
+def test_every_minute_round_trips_through_both_spellings():
+    for minute in range(24 * 60):
+        assert parse_slot(format_slot(minute)) == minute
+        assert parse_slot(format_slot(minute, padded=True)) == minute
+        assert parse_slot(f"{minute // 60}:{minute % 60:02d}") == minute
+
+
+def test_row_minute_prefers_the_stored_integer():
+    assert row_minute(600, "2:00 PM") == 600
+    assert row_minute(0, "2:00 PM") == 0
+    assert row_minute(None, "2:00 PM") == 840
+    assert row_minute(None, "garbage") is None
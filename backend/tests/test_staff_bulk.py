@@ -0,0 +1,45 @@
+from datetime import date
+
+import pytest
+
+from backend.routes.staff import _expand_bulk_request
+
+
+def test_dates_and_ranges_with_times_on_weekdays():
+    plan = _expand_bulk_request({
+        "dates": ["2026-11-02"],
+        "ranges": [{"start": "2026-11-04", "end": "2026-11-08"}],
+        "times": ["9:00 AM", "14:00"],
+        "weekdays": [0, 2, 4],  # Mon, Wed, Fri
+    })
+    assert plan == {
+        date(2026, 11, 2): [540, 840],
+        date(2026, 11, 4): [540, 840],
+        date(2026, 11, 6): [540, 840],
+    }
+
+
+def test_weekly_template_wins_over_times():
+    plan = _expand_bulk_request({
+        "ranges": [{"start": "2026-11-02", "end": "2026-11-08"}],
+        "weekly": {"0": ["10:00"], "5": ["3:00 PM", "15:00"]},
+        "times": ["9:00"],
+    })
+    assert plan == {date(2026, 11, 2): [600], date(2026, 11, 7): [900]}
+
+
+def test_range_without_end_is_one_day():
+    assert _expand_bulk_request({"ranges": [{"start": "2026-11-03"}], "times": ["11:00"]}) == {
+        date(2026, 11, 3): [660]}
+
+
+@pytest.mark.parametrize("data", [
+    {"dates": ["2026-11-02"], "times": ["3:00 AM"]},         # before opening
+    {"dates": ["2026-11-02"], "times": ["noon"]},
+    {"ranges": [{"start": "2026-11-05", "end": "2026-11-01"}], "times": ["10:00"]},
+    {"ranges": [{"start": "2026-01-01", "end": "2027-12-31"}], "times": ["10:00"]},
+    {"dates": ["not a date"], "times": ["10:00"]},
+])
+def test_rejects(data):
+    with pytest.raises(ValueError):
+        _expand_bulk_request(data)
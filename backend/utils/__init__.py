@@ -1,15 +1,25 @@
-from .security import hash_password, is_strong_password, is_valid_email
-from .email_utils import (
-    send_email_otp,
-    send_feedback_reply_email,
-    send_appointment_status_email,
-)
-
-__all__ = [
-    "hash_password",
-    "is_strong_password",
-    "is_valid_email",
-    "send_email_otp",
-    "send_feedback_reply_email",
-    "send_appointment_status_email",
-]
+import importlib
+
+# Re-exports resolved on first access, so `backend.utils.<module>` imports
+# (and the CLIs built on them) don't pull in SMTP and Flask via email_utils.
+_EXPORTS = {
+    "hash_password": "security",
+    "verify_password": "security",
+    "burn_password_check": "security",
+    "needs_rehash": "security",
+    "is_strong_password": "security",
+    "is_valid_email": "security",
+    "send_email_otp": "email_utils",
+    "send_feedback_reply_email": "email_utils",
+    "send_appointment_status_email": "email_utils",
+    "email_queue_stats": "email_utils",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(f".{module}", __name__), name)
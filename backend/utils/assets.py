@@ -0,0 +1,230 @@
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import re
+import sys
+import threading
+
+from flask import abort, request, send_file
+from werkzeug.security import safe_join
+
+from backend.settings import instance_dir
+
+try:
+    import brotli
+except ImportError:  # optional: pip install brotli
+    brotli = None
+
+# Static asset pipeline for marmu-react/public/assets. Every file gets a
+# content hash; "name.<hash>.ext" URLs (see asset_path) are served with a
+# one-year immutable Cache-Control, plain names with no-cache + ETag so they
+# revalidate to a 304. Compressed variants are built once per content hash
+# into ASSET_CACHE_DIR and kept only when they are meaningfully smaller
+# (PNG/JPEG rarely are, so those go out as-is). Range requests are served
+# from the uncompressed file.
+#
+#   python -m backend.utils.assets build    # precompute at deploy time
+
+ASSET_ROOT = os.path.abspath(os.getenv(
+    "ASSET_ROOT", os.path.join(os.path.dirname(__file__), "..", "..", "marmu-react", "public", "assets")))
+ASSET_CACHE_DIR = os.getenv("ASSET_CACHE_DIR", instance_dir("asset-cache"))
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+COMPRESS_MIN_SIZE = 1024
+COMPRESS_MIN_SAVING = 0.1
+FINGERPRINT_LENGTH = 12
+
+_FINGERPRINTED = re.compile(r"^(?P<stem>.+)\.(?P<hash>[0-9a-f]{%d})(?P<ext>\.[^./]+)$" % FINGERPRINT_LENGTH)
+
+_entries = {}
+_decisions = None  # content hash -> {"gzip": bool, "br": bool}, persisted in the cache dir
+_lock = threading.Lock()
+
+
+def _encoders():
+    encoders = {"gzip": lambda data: gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        encoders["br"] = lambda data: brotli.compress(data, quality=11)
+    return encoders
+
+
+def _manifest_path():
+    return os.path.join(ASSET_CACHE_DIR, "decisions.json")
+
+
+def _load_decisions():
+    global _decisions
+    if _decisions is None:
+        try:
+            with open(_manifest_path(), encoding="utf-8") as f:
+                _decisions = json.load(f)
+        except (OSError, ValueError):
+            _decisions = {}
+    return _decisions
+
+
+def _save_decisions():
+    os.makedirs(ASSET_CACHE_DIR, mode=0o700, exist_ok=True)
+    tmp = _manifest_path() + f".{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(_decisions, f)
+    os.replace(tmp, _manifest_path())
+
+
+def _variant_path(digest, encoding):
+    return os.path.join(ASSET_CACHE_DIR, digest[:2], f"{digest}.{encoding}")
+
+
+def _build_variants(digest, data):
+    decisions = _load_decisions()
+    known = decisions.get(digest)
+    encoders = _encoders()
+    if known is not None and all(e in known for e in encoders) \
+            and all(os.path.exists(_variant_path(digest, e)) for e, keep in known.items() if keep):
+        return {e: _variant_path(digest, e) for e, keep in known.items() if keep and e in encoders}
+
+    known = {}
+    for encoding, encode in encoders.items():
+        encoded = encode(data) if len(data) >= COMPRESS_MIN_SIZE else None
+        keep = encoded is not None and len(encoded) <= len(data) * (1 - COMPRESS_MIN_SAVING)
+        known[encoding] = keep
+        if keep:
+            path = _variant_path(digest, encoding)
+            os.makedirs(os.path.dirname(path), mode=0o700, exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(encoded)
+            os.replace(tmp, path)
+    decisions[digest] = known
+    _save_decisions()
+    return {e: _variant_path(digest, e) for e, keep in known.items() if keep}
+
+
+def _entry(relpath):
+    # Cached per file and rebuilt when its size or mtime changes.
+    path = safe_join(ASSET_ROOT, relpath)
+    if path is None:
+        return None
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    if not os.path.isfile(path):
+        return None
+    stamp = (st.st_size, st.st_mtime_ns)
+    entry = _entries.get(relpath)
+    if entry is not None and entry["stamp"] == stamp:
+        return entry
+
+    with _lock:
+        entry = _entries.get(relpath)
+        if entry is not None and entry["stamp"] == stamp:
+            return entry
+        with open(path, "rb") as f:
+            data = f.read()
+        digest = hashlib.sha256(data).hexdigest()
+        try:
+            variants = _build_variants(digest, data)
+        except OSError as e:
+            print(f"Asset cache unavailable ({e}); serving {relpath} uncompressed")
+            variants = {}
+        entry = {
+            "path": path,
+            "stamp": stamp,
+            "mtime": st.st_mtime,
+            "hash": digest,
+            "mimetype": mimetypes.guess_type(path)[0] or "application/octet-stream",
+            "variants": variants,
+        }
+        _entries[relpath] = entry
+        return entry
+
+
+def asset_path(relpath):
+    # "images/BG.png" -> "images/BG.<hash>.png"; unknown files are returned as-is.
+    entry = _entry(relpath)
+    if entry is None:
+        return relpath
+    stem, ext = os.path.splitext(relpath)
+    return f"{stem}.{entry['hash'][:FINGERPRINT_LENGTH]}{ext}"
+
+
+def _negotiate(variants):
+    best, best_q = None, 0
+    for encoding in ("br", "gzip"):
+        if encoding in variants:
+            q = request.accept_encodings[encoding]
+            if q > best_q:
+                best, best_q = encoding, q
+    return best
+
+
+def send_asset(filename):
+    entry, fingerprint = _entry(filename), None
+    if entry is None:
+        match = _FINGERPRINTED.match(filename)
+        if match:
+            fingerprint = match.group("hash")
+            entry = _entry(match.group("stem") + match.group("ext"))
+    if entry is None:
+        abort(404)
+    # A stale fingerprint (file replaced since the URL was built) still gets
+    # the current content, just not cached as immutable.
+    immutable = fingerprint is not None and entry["hash"].startswith(fingerprint)
+
+    encoding = None if "Range" in request.headers else _negotiate(entry["variants"])
+    etag = entry["hash"][:32] + (f"-{encoding}" if encoding else "")
+    response = send_file(
+        entry["variants"][encoding] if encoding else entry["path"],
+        mimetype=entry["mimetype"],
+        conditional=True,
+        etag=etag,
+        last_modified=entry["mtime"],
+        max_age=IMMUTABLE_MAX_AGE if immutable else None,
+    )
+    if encoding:
+        response.headers["Content-Encoding"] = encoding
+    if entry["variants"]:
+        response.vary.add("Accept-Encoding")
+    if immutable:
+        response.cache_control.immutable = True
+    else:
+        response.cache_control.public = True
+        response.cache_control.no_cache = True
+    return response
+
+
+def build(root=ASSET_ROOT):
+    # Hash and compress every asset; returns {relpath: fingerprinted relpath}.
+    manifest = {}
+    for dirpath, _, filenames in os.walk(root):
+        for filename in sorted(filenames):
+            relpath = os.path.relpath(os.path.join(dirpath, filename), root).replace(os.sep, "/")
+            manifest[relpath] = asset_path(relpath)
+    return manifest
+
+
+def warm_async():
+    threading.Thread(target=build, name="asset-warmup", daemon=True).start()
+
+
+def reset():
+    # After a fork: a warm-up thread in the parent may have held the lock,
+    # and its half-built entries are no use without it.
+    global _entries, _decisions, _lock
+    _lock = threading.Lock()
+    _entries = {}
+    _decisions = None
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] != ["build"]:
+        sys.exit("usage: python -m backend.utils.assets build")
+    manifest = build()
+    os.makedirs(ASSET_CACHE_DIR, mode=0o700, exist_ok=True)
+    with open(os.path.join(ASSET_CACHE_DIR, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    compressed = sum(1 for rel in manifest if _entries[rel]["variants"])
+    print(f"{len(manifest)} assets, {compressed} with compressed variants"
+          f"{'' if brotli else ' (brotli not installed: gzip only)'}; cache in {ASSET_CACHE_DIR}")
@@ -0,0 +1,114 @@
+from datetime import date as date_cls, datetime, timedelta
+
+from backend.utils.slots import format_slot, parse_slot, row_minute
+
+# Shop hours: hourly slots from 9 AM, closing 5 PM on Saturday and 9 PM on
+# weekdays, closed on Sunday. A day's availability is an int bitmap where
+# bit i set means the slot starting at OPEN_HOUR + i is free.
+OPEN_HOUR = 9
+WEEKDAY_CLOSE_HOUR = 21
+SATURDAY_CLOSE_HOUR = 17
+MAX_RANGE_DAYS = 62
+
+SLOT_LABELS = [format_slot(h * 60) for h in range(OPEN_HOUR, WEEKDAY_CLOSE_HOUR)]
+
+
+def closing_hour(day):
+    weekday = day.weekday()
+    if weekday == 6:
+        return None
+    return SATURDAY_CLOSE_HOUR if weekday == 5 else WEEKDAY_CLOSE_HOUR
+
+
+def open_mask(day):
+    close = closing_hour(day)
+    if close is None:
+        return 0
+    return (1 << (close - OPEN_HOUR)) - 1
+
+
+def minute_index(minute):
+    if minute is None:
+        return None
+    index = minute // 60 - OPEN_HOUR
+    if index < 0 or index >= len(SLOT_LABELS):
+        return None
+    return index
+
+
+def slot_index(value):
+    return minute_index(parse_slot(value))
+
+
+def mask_to_times(mask):
+    return [label for i, label in enumerate(SLOT_LABELS) if mask >> i & 1]
+
+
+def parse_day(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date_cls):
+        return value
+    return datetime.strptime(value, "%Y-%m-%d").date()
+
+
+def iter_days(start, end):
+    day = start
+    while day <= end:
+        yield day
+        day += timedelta(days=1)
+
+
+def _empty_availability(staff_ids, start, end):
+    return {
+        staff_id: {day: open_mask(day) for day in iter_days(start, end)}
+        for staff_id in staff_ids
+    }
+
+
+def _busy_statement(staff_ids, start, end):
+    # Bookings and blocked hours for every staff member and day in one pass.
+    # A booking is busy exactly when it holds its slot in the unique index
+    # (active_slot = 1, migration 0006; NULL status counts as active), which
+    # is also the index that serves this half: uq_appointment_active_minute.
+    placeholders = ", ".join(["%s"] * len(staff_ids))
+    return f"""
+        SELECT staff_id, unavailable_date AS day, unavailable_minute AS minute, unavailable_time AS time
+        FROM tbl_staff_unavailability
+        WHERE staff_id IN ({placeholders}) AND unavailable_date BETWEEN %s AND %s
+        UNION ALL
+        SELECT artist_id, appointment_date, time_minute, time
+        FROM tbl_appointment
+        WHERE artist_id IN ({placeholders}) AND appointment_date BETWEEN %s AND %s
+          AND active_slot = 1
+    """, (*staff_ids, start, end, *staff_ids, start, end)
+
+
+def _clear_busy(result, rows):
+    for staff_id, day, minute, time in rows:
+        days = result.get(int(staff_id))
+        if days is None:
+            continue
+        day = parse_day(day)
+        index = minute_index(row_minute(minute, time))
+        if index is not None and day in days:
+            days[day] &= ~(1 << index)
+    return result
+
+
+def compute_availability(cursor, staff_ids, start, end):
+    staff_ids = [int(s) for s in staff_ids]
+    result = _empty_availability(staff_ids, start, end)
+    if not staff_ids:
+        return result
+    cursor.execute(*_busy_statement(staff_ids, start, end))
+    return _clear_busy(result, cursor.fetchall())
+
+
+async def compute_availability_async(cursor, staff_ids, start, end):
+    staff_ids = [int(s) for s in staff_ids]
+    result = _empty_availability(staff_ids, start, end)
+    if not staff_ids:
+        return result
+    await cursor.execute(*_busy_statement(staff_ids, start, end))
+    return _clear_busy(result, await cursor.fetchall())
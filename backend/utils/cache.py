@@ -0,0 +1,374 @@
+import base64
+import functools
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlencode
+
+from flask import current_app, request
+
+from backend.settings import instance_dir
+
+# Response cache for read-heavy GET views.
+#
+#   @staff_bp.route("/by-service/<service>")
+#   @cached(ttl=300, tags=("staff",))
+#   def get_staff_by_service(service): ...
+#
+#   invalidate("staff")   # after the write handler commits
+#
+# Entries are keyed by endpoint, path and query string, carry tags, and are
+# evicted least-recently-used beyond CACHE_MAX_ENTRIES or when their TTL runs
+# out. Backends (CACHE_BACKEND):
+#
+#   memory  one LRU per process (default). invalidate() only reaches the
+#           process it runs in, so with several workers the TTL bounds how
+#           stale the others can be.
+#   sqlite  one SQLite file (CACHE_PATH) shared by every worker process on
+#           the host, so an invalidation is seen by all of them at once.
+#           Values are stored as JSON (bytes base64-encoded, tuples read
+#           back as lists), never pickled.
+#
+# Each tag has a version that invalidate() bumps. A reader snapshots the
+# versions before computing and the store is skipped if they moved, so a
+# response computed from pre-write data is never cached after the write.
+# Decorated views must not depend on the session or the logged-in user.
+
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory").strip().lower()
+CACHE_PATH = os.getenv("CACHE_PATH", instance_dir("response-cache.sqlite3"))
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "1000"))
+CACHE_DEFAULT_TTL = float(os.getenv("CACHE_DEFAULT_TTL", "30"))
+CACHE_ENABLED = os.getenv("CACHE_ENABLED", "1").strip().lower() in ("1", "true", "yes", "on")
+
+# Response headers worth replaying on a hit; per-request ones (Server-Timing,
+# CORS, session cookies) are added after the view by the app's hooks.
+STORED_HEADERS = ("Content-Type", "ETag", "Cache-Control", "Last-Modified", "Link", "X-Next-Cursor",
+                  "Access-Control-Expose-Headers")
+
+
+class MemoryCache:
+    def __init__(self, max_entries=CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (value, expires, tags)
+        self._tags = {}                # tag -> set of keys
+        self._versions = {}
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[1] <= time.monotonic():
+                self._drop(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def versions(self, tags):
+        with self._lock:
+            return {tag: self._versions.get(tag, 0) for tag in tags}
+
+    def set(self, key, value, ttl, tags=(), versions=None):
+        with self._lock:
+            if versions is not None and any(self._versions.get(t, 0) != v for t, v in versions.items()):
+                return False
+            self._drop(key)
+            self._entries[key] = (value, time.monotonic() + ttl, tuple(tags))
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+            return True
+
+    def invalidate(self, tags):
+        with self._lock:
+            for tag in tags:
+                self._versions[tag] = self._versions.get(tag, 0) + 1
+                for key in list(self._tags.pop(tag, ())):
+                    self._drop(key)
+
+    def size(self):
+        return len(self._entries)
+
+    def _drop(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            for tag in entry[2]:
+                keys = self._tags.get(tag)
+                if keys is not None:
+                    keys.discard(key)
+                    if not keys:
+                        del self._tags[tag]
+
+
+def _json_default(value):
+    if isinstance(value, bytes):
+        return {"__bytes__": base64.b64encode(value).decode("ascii")}
+    raise TypeError(f"{type(value).__name__} is not cacheable")
+
+
+def _json_object(obj):
+    if obj.keys() == {"__bytes__"}:
+        return base64.b64decode(obj["__bytes__"])
+    return obj
+
+
+class SQLiteCache:
+    # One connection per thread (and per process: a connection opened before
+    # a fork is never reused after it). Times are wall-clock so that every
+    # process agrees on expiry.
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS cache_entries (key TEXT PRIMARY KEY, value TEXT NOT NULL,"
+        " expires REAL NOT NULL, used REAL NOT NULL)",
+        "CREATE INDEX IF NOT EXISTS idx_cache_entries_used ON cache_entries (used)",
+        "CREATE TABLE IF NOT EXISTS cache_tags (tag TEXT NOT NULL, key TEXT NOT NULL, PRIMARY KEY (tag, key))",
+        "CREATE INDEX IF NOT EXISTS idx_cache_tags_key ON cache_tags (key)",
+        "CREATE TABLE IF NOT EXISTS cache_tag_versions (tag TEXT PRIMARY KEY, version INTEGER NOT NULL)",
+    )
+    # Recency is only rewritten when it is this stale, so most hits stay reads.
+    TOUCH_INTERVAL = 1.0
+
+    def __init__(self, path=CACHE_PATH, max_entries=CACHE_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self._local = threading.local()
+        self.evictions = 0
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), mode=0o700, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            for statement in self.SCHEMA:
+                conn.execute(statement)
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def get(self, key):
+        conn = self._conn()
+        row = conn.execute("SELECT value, expires, used FROM cache_entries WHERE key=?", (key,)).fetchone()
+        if row is None:
+            return None
+        now = time.time()
+        if row[1] <= now:
+            return None
+        if now - row[2] > self.TOUCH_INTERVAL:
+            conn.execute("UPDATE cache_entries SET used=? WHERE key=?", (now, key))
+        try:
+            return json.loads(row[0], object_hook=_json_object)
+        except ValueError:
+            return None  # written by an older version; the next store replaces it
+
+    def versions(self, tags):
+        return self._read_versions(self._conn(), tags)
+
+    def _read_versions(self, conn, tags):
+        tags = list(tags)
+        if not tags:
+            return {}
+        rows = conn.execute(
+            f"SELECT tag, version FROM cache_tag_versions WHERE tag IN ({', '.join('?' * len(tags))})", tags
+        ).fetchall()
+        found = dict(rows)
+        return {tag: found.get(tag, 0) for tag in tags}
+
+    def set(self, key, value, ttl, tags=(), versions=None):
+        conn = self._conn()
+        blob = json.dumps(value, default=_json_default, separators=(",", ":"))
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if versions is not None and self._read_versions(conn, versions) != versions:
+                conn.execute("ROLLBACK")
+                return False
+            conn.execute("INSERT OR REPLACE INTO cache_entries (key, value, expires, used) VALUES (?, ?, ?, ?)",
+                         (key, blob, now + ttl, now))
+            conn.execute("DELETE FROM cache_tags WHERE key=?", (key,))
+            conn.executemany("INSERT OR IGNORE INTO cache_tags (tag, key) VALUES (?, ?)", [(t, key) for t in tags])
+            self._evict(conn, now)
+            conn.execute("COMMIT")
+            return True
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _evict(self, conn, now):
+        count = conn.execute("SELECT COUNT(*) FROM cache_entries").fetchone()[0]
+        if count <= self.max_entries:
+            return
+        conn.execute("DELETE FROM cache_entries WHERE expires <= ?", (now,))
+        excess = conn.execute("SELECT COUNT(*) FROM cache_entries").fetchone()[0] - self.max_entries
+        if excess > 0:
+            conn.execute("DELETE FROM cache_entries WHERE key IN "
+                         "(SELECT key FROM cache_entries ORDER BY used LIMIT ?)", (excess,))
+            self.evictions += excess
+        conn.execute("DELETE FROM cache_tags WHERE key NOT IN (SELECT key FROM cache_entries)")
+
+    def invalidate(self, tags):
+        tags = list(tags)
+        placeholders = ", ".join("?" * len(tags))
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(f"DELETE FROM cache_entries WHERE key IN "
+                         f"(SELECT key FROM cache_tags WHERE tag IN ({placeholders}))", tags)
+            conn.execute("DELETE FROM cache_tags WHERE key NOT IN (SELECT key FROM cache_entries)")
+            conn.executemany("INSERT INTO cache_tag_versions (tag, version) VALUES (?, 1) "
+                             "ON CONFLICT (tag) DO UPDATE SET version=version+1", [(t,) for t in tags])
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def size(self):
+        return self._conn().execute("SELECT COUNT(*) FROM cache_entries").fetchone()[0]
+
+
+_cache = None
+_cache_lock = threading.Lock()
+_stats = {}  # name -> {"hits", "misses", "stores", "skipped"}
+_stats_lock = threading.Lock()
+
+
+def get_cache():
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                if CACHE_BACKEND == "sqlite":
+                    _cache = SQLiteCache()
+                else:
+                    if CACHE_BACKEND != "memory":
+                        print(f"Unknown CACHE_BACKEND {CACHE_BACKEND!r}; using the in-process cache")
+                    _cache = MemoryCache()
+    return _cache
+
+
+def reset_cache():
+    # After a fork: start from a fresh backend object (the memory cache's lock
+    # and the SQLite connections belong to the parent).
+    global _cache
+    with _cache_lock:
+        _cache = None
+
+
+def _count(name, event):
+    with _stats_lock:
+        counts = _stats.setdefault(name, {"hits": 0, "misses": 0, "stores": 0, "skipped": 0})
+        counts[event] += 1
+
+
+# Failures of the cache itself (a locked or unwritable SQLite file, say)
+# are logged and treated as a miss: the view still answers from the database.
+
+def lookup(name, key, tags=()):
+    # (value or None, tag versions to pass to store)
+    if not CACHE_ENABLED:
+        return None, None
+    cache = get_cache()
+    try:
+        versions = cache.versions(tags)
+        value = cache.get(key)
+    except Exception as e:
+        print("Cache lookup failed:", e)
+        return None, None
+    _count(name, "misses" if value is None else "hits")
+    return value, versions
+
+
+def store(name, key, value, ttl=None, tags=(), versions=None):
+    if not CACHE_ENABLED:
+        return value
+    try:
+        stored = get_cache().set(key, value, CACHE_DEFAULT_TTL if ttl is None else ttl, tags, versions)
+    except Exception as e:
+        print("Cache store failed:", e)
+        return value
+    _count(name, "stores" if stored else "skipped")
+    return value
+
+
+def tag_versions(*tags):
+    # Current versions of the tags, or None when they can't be read; lets
+    # other in-process caches follow the same invalidations.
+    if not CACHE_ENABLED:
+        return None
+    try:
+        return get_cache().versions(tags)
+    except Exception as e:
+        print("Cache version read failed:", e)
+        return None
+
+
+def invalidate(*tags):
+    if not CACHE_ENABLED or not tags:
+        return
+    try:
+        get_cache().invalidate(tags)
+    except Exception as e:
+        print(f"Cache invalidation of {tags} failed:", e)
+
+
+def _request_key():
+    args = urlencode(sorted(request.args.items(multi=True)))
+    return f"{request.endpoint}:{request.path}?{args}"
+
+
+def _replay(entry, status):
+    body, headers = entry
+    response = current_app.response_class(body, status=200, headers=headers)
+    response.headers["X-Cache"] = status
+    return response.make_conditional(request)
+
+
+def cached(ttl=None, tags=()):
+    # Caches 200 responses of a GET view; anything else passes through.
+    # The response gets an ETag (if the view set none) so clients can
+    # revalidate with If-None-Match.
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            if request.method not in ("GET", "HEAD"):
+                return view(*args, **kwargs)
+            name = request.endpoint
+            key = _request_key()
+            entry, versions = lookup(name, key, tags)
+            if entry is not None:
+                return _replay(entry, "HIT")
+
+            response = current_app.make_response(view(*args, **kwargs))
+            if (response.status_code != 200 or response.is_streamed or response.direct_passthrough
+                    or "Set-Cookie" in response.headers):
+                return response
+            if not response.get_etag()[0]:
+                response.add_etag()
+            headers = [(k, v) for k, v in response.headers.items() if k in STORED_HEADERS]
+            entry = store(name, key, (response.get_data(), headers), ttl, tags, versions)
+            return _replay(entry, "MISS")
+        return wrapper
+    return decorator
+
+
+def cache_stats():
+    with _stats_lock:
+        per_view = {name: dict(counts) for name, counts in _stats.items()}
+    data = {event: sum(c[event] for c in per_view.values()) for event in ("hits", "misses", "stores", "skipped")}
+    for name, counts in per_view.items():
+        for event in ("hits", "misses"):
+            data[f"{event}_{name.replace('.', '_')}"] = counts[event]
+    cache = _cache
+    if cache is not None:
+        data["evictions"] = cache.evictions
+        try:
+            data["entries"] = cache.size()
+        except Exception:
+            pass
+    return data
@@ -0,0 +1,188 @@
+import os
+import sys
+import threading
+import time
+
+from backend.db import get_connection
+from backend.utils import reports
+
+# Dashboard rollups (tables from migration 0004_dashboard_counters.sql). The write
+# paths call the hooks below with their own cursor, before they commit, so a
+# counter changes in the same transaction as the row it counts. reconcile()
+# recomputes everything from the raw tables to repair any drift. The
+# appointment hooks also maintain the daily rollup in backend/utils/reports.py.
+
+COMPLETED_STATUSES = ("Completed", "Done")
+RECONCILE_INTERVAL = int(os.getenv("COUNTERS_RECONCILE_INTERVAL", "300"))
+
+TOTAL_CLIENTS = "total_clients"
+APPOINTMENTS_TOTAL = "appointments:total"
+FEEDBACK_UNREPLIED = "feedback:unreplied"
+
+_reconciler = None
+_reconciler_lock = threading.Lock()
+
+
+def status_counter(status):
+    return f"appointments:{status or 'Pending'}"
+
+
+def _is_completed(status):
+    return status in COMPLETED_STATUSES
+
+
+def bump(cursor, deltas):
+    deltas = [(name, delta) for name, delta in deltas.items() if delta]
+    if not deltas:
+        return
+    values = ", ".join(["(%s, %s)"] * len(deltas))
+    cursor.execute(f"""
+        INSERT INTO tbl_dashboard_counters (name, value) VALUES {values}
+        ON DUPLICATE KEY UPDATE value = value + VALUES(value)
+    """, tuple(v for pair in deltas for v in pair))
+
+
+def bump_artist(cursor, artist_id, delta):
+    if not delta:
+        return
+    cursor.execute("""
+        INSERT INTO tbl_artist_job_counts (artist_id, total_jobs) VALUES (%s, %s)
+        ON DUPLICATE KEY UPDATE total_jobs = total_jobs + VALUES(total_jobs)
+    """, (artist_id or 0, delta))
+
+
+def appointment_created(cursor, artist_id, day, service, status="Pending", count=1):
+    bump(cursor, {APPOINTMENTS_TOTAL: count, status_counter(status): count})
+    if _is_completed(status):
+        bump_artist(cursor, artist_id, count)
+    reports.bump_daily(cursor, [(day, service, artist_id, status, count)])
+
+
+def appointment_status_changed(cursor, artist_id, day, service, old_status, new_status, count=1):
+    old_status, new_status = old_status or "Pending", new_status or "Pending"
+    if old_status == new_status:
+        return
+    deltas = {status_counter(old_status): -count}
+    deltas[status_counter(new_status)] = deltas.get(status_counter(new_status), 0) + count
+    bump(cursor, deltas)
+    if _is_completed(old_status) != _is_completed(new_status):
+        bump_artist(cursor, artist_id, count if _is_completed(new_status) else -count)
+    reports.bump_daily(cursor, [(day, service, artist_id, old_status, -count),
+                                (day, service, artist_id, new_status, count)])
+
+
+def client_added(cursor):
+    bump(cursor, {TOTAL_CLIENTS: 1})
+
+
+def feedback_added(cursor):
+    bump(cursor, {FEEDBACK_UNREPLIED: 1})
+
+
+def feedback_replied(cursor, previous_reply):
+    if not previous_reply:
+        bump(cursor, {FEEDBACK_UNREPLIED: -1})
+
+
+def read_dashboard(cursor):
+    cursor.execute("SELECT name, value FROM tbl_dashboard_counters")
+    counters = {row["name"]: row["value"] for row in cursor.fetchall()}
+    cursor.execute("""
+        SELECT COALESCE(s.fullname, 'Unassigned') AS artist_name, j.total_jobs
+        FROM tbl_artist_job_counts j
+        LEFT JOIN tbl_staff s ON s.id = NULLIF(j.artist_id, 0)
+        WHERE j.total_jobs > 0
+        ORDER BY j.total_jobs DESC
+        LIMIT 10
+    """)
+    return counters, cursor.fetchall()
+
+
+def reconcile(conn=None):
+    own_conn = conn is None
+    conn = conn or get_connection()
+    cursor = conn.cursor()
+    try:
+        # Only one process reconciles at a time.
+        cursor.execute("SELECT GET_LOCK('dashboard_counters_reconcile', 0)")
+        if not cursor.fetchone()[0]:
+            return False
+        try:
+            # Lock the counter rows first: writers that commit after this point
+            # block on them and apply their delta on top of our fresh values.
+            cursor.execute("SELECT name FROM tbl_dashboard_counters FOR UPDATE")
+            cursor.fetchall()
+            cursor.execute("SELECT artist_id FROM tbl_artist_job_counts FOR UPDATE")
+            cursor.fetchall()
+
+            counters = {}
+            cursor.execute("SELECT COUNT(*) FROM tbl_clients")
+            counters[TOTAL_CLIENTS] = cursor.fetchone()[0]
+            cursor.execute("SELECT COUNT(*) FROM tbl_feedback WHERE reply IS NULL OR reply=''")
+            counters[FEEDBACK_UNREPLIED] = cursor.fetchone()[0]
+            cursor.execute("SELECT COALESCE(status, 'Pending'), COUNT(*) FROM tbl_appointment GROUP BY 1")
+            by_status = cursor.fetchall()
+            counters[APPOINTMENTS_TOTAL] = sum(n for _, n in by_status)
+            for status, n in by_status:
+                counters[status_counter(status)] = counters.get(status_counter(status), 0) + n
+            cursor.execute("""
+                SELECT COALESCE(artist_id, 0), COUNT(*) FROM tbl_appointment
+                WHERE status IN ('Completed','Done')
+                GROUP BY 1
+            """)
+            artists = cursor.fetchall()
+
+            cursor.execute("DELETE FROM tbl_dashboard_counters")
+            values = ", ".join(["(%s, %s)"] * len(counters))
+            cursor.execute(f"INSERT INTO tbl_dashboard_counters (name, value) VALUES {values}",
+                           tuple(v for pair in counters.items() for v in pair))
+            cursor.execute("DELETE FROM tbl_artist_job_counts")
+            if artists:
+                cursor.executemany("INSERT INTO tbl_artist_job_counts (artist_id, total_jobs) VALUES (%s, %s)",
+                                   artists)
+            conn.commit()
+            return True
+        finally:
+            cursor.execute("SELECT RELEASE_LOCK('dashboard_counters_reconcile')")
+            cursor.fetchall()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+        if own_conn:
+            conn.close()
+
+
+def _reconcile_loop():
+    while True:
+        time.sleep(RECONCILE_INTERVAL)
+        try:
+            reconcile()
+        except Exception as e:
+            print("Dashboard counter reconciliation failed:", e)
+
+
+def ensure_reconciler():
+    global _reconciler
+    if _reconciler is not None or RECONCILE_INTERVAL <= 0:
+        return
+    with _reconciler_lock:
+        if _reconciler is None:
+            _reconciler = threading.Thread(target=_reconcile_loop, name="counters-reconcile", daemon=True)
+            _reconciler.start()
+
+
+def reset_reconciler():
+    # After a fork: the thread did not survive it, so let the next
+    # ensure_reconciler() call start a new one in this process.
+    global _reconciler
+    with _reconciler_lock:
+        _reconciler = None
+
+
+if __name__ == "__main__":
+    # python -m backend.utils.counters reconcile
+    if sys.argv[1:] != ["reconcile"]:
+        sys.exit("usage: python -m backend.utils.counters reconcile")
+    print("reconciled" if reconcile() else "another process is reconciling")
@@ -0,0 +1,212 @@
+import atexit
+import queue
+import threading
+import time
+
+# Background delivery for outgoing mail. Request handlers enqueue a message and
+# return immediately; worker threads keep a logged-in SMTP session open and
+# reuse it for every message until it goes idle or the server drops it.
+# Only failures that can clear up on their own (a dropped connection, a 4xx
+# "try again later") are retried; bad credentials, refused recipients and
+# other 5xx replies are logged and the message dropped.
+
+_STOP = object()
+
+
+def _transient(error):
+    import smtplib
+
+    if isinstance(error, (smtplib.SMTPAuthenticationError, smtplib.SMTPRecipientsRefused)):
+        return False
+    if isinstance(error, (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError)):
+        return True
+    if isinstance(error, smtplib.SMTPResponseException):
+        return 400 <= error.smtp_code < 500
+    if isinstance(error, smtplib.SMTPException):
+        return False
+    return isinstance(error, OSError)  # refused, reset, timed out
+
+
+class EmailQueue:
+    def __init__(self, host, port, username=None, password=None, starttls=True,
+                 workers=2, max_retries=3, backoff=2.0, session_idle=60, maxsize=1000,
+                 timeout=30):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.workers = max(int(workers), 1)
+        self.max_retries = max(int(max_retries), 0)
+        self.backoff = backoff
+        self.session_idle = session_idle
+        self.timeout = timeout
+
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._threads = []
+        self._lock = threading.Lock()
+        self._stats = {
+            "enqueued": 0,
+            "sent": 0,
+            "failed": 0,
+            "dropped": 0,
+            "retries": 0,
+            "sessions_opened": 0,
+            "send_time_total": 0.0,
+            "send_time_max": 0.0,
+            "latency_total": 0.0,
+            "latency_max": 0.0,
+            "last_error": None,
+        }
+
+    def start(self):
+        with self._lock:
+            if self._threads:
+                return
+            for i in range(self.workers):
+                t = threading.Thread(target=self._run, name=f"email-worker-{i}", daemon=True)
+                t.start()
+                self._threads.append(t)
+
+    def stop(self, timeout=10):
+        with self._lock:
+            threads, self._threads = self._threads, []
+        for _ in threads:
+            self._queue.put(_STOP)
+        deadline = time.monotonic() + timeout
+        for t in threads:
+            t.join(max(deadline - time.monotonic(), 0))
+
+    def enqueue(self, msg):
+        # False when the queue is full: the message is dropped and counted,
+        # never an error in the request that sent it.
+        self.start()
+        try:
+            self._queue.put_nowait((msg, time.monotonic()))
+        except queue.Full:
+            with self._lock:
+                self._stats["dropped"] += 1
+            print(f"Email queue full, dropped message to {msg['To']}")
+            return False
+        with self._lock:
+            self._stats["enqueued"] += 1
+        return True
+
+    def join(self):
+        self._queue.join()
+
+    def stats(self):
+        with self._lock:
+            data = dict(self._stats)
+            data["workers"] = len(self._threads)
+        data["depth"] = self._queue.qsize()
+        data["send_time_avg"] = data["send_time_total"] / data["sent"] if data["sent"] else 0.0
+        data["latency_avg"] = data["latency_total"] / data["sent"] if data["sent"] else 0.0
+        return data
+
+    def _open_session(self):
+        import smtplib  # loaded by the worker thread, not at app startup
+
+        server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        if self.starttls:
+            server.starttls()
+        if self.username and self.password:
+            server.login(self.username, self.password)
+        with self._lock:
+            self._stats["sessions_opened"] += 1
+        return server
+
+    def _close_session(self, server):
+        if server is None:
+            return
+        try:
+            server.quit()
+        except Exception:
+            try:
+                server.close()
+            except Exception:
+                pass
+
+    def _run(self):
+        server, last_used = None, 0.0
+        while True:
+            try:
+                item = self._queue.get(timeout=self.session_idle)
+            except queue.Empty:
+                # Let an idle session go before the server times it out on us.
+                self._close_session(server)
+                server = None
+                continue
+
+            if item is _STOP:
+                self._queue.task_done()
+                self._close_session(server)
+                return
+
+            msg, enqueued_at = item
+            try:
+                server, last_used = self._deliver(server, last_used, msg, enqueued_at)
+            finally:
+                self._queue.task_done()
+
+    def _deliver(self, server, last_used, msg, enqueued_at):
+        attempt = 0
+        while True:
+            try:
+                if server is not None and time.monotonic() - last_used > self.session_idle:
+                    self._close_session(server)
+                    server = None
+                if server is None:
+                    server = self._open_session()
+                started = time.monotonic()
+                server.send_message(msg)
+                finished = time.monotonic()
+                with self._lock:
+                    send_time = finished - started
+                    latency = finished - enqueued_at
+                    self._stats["sent"] += 1
+                    self._stats["send_time_total"] += send_time
+                    self._stats["send_time_max"] = max(self._stats["send_time_max"], send_time)
+                    self._stats["latency_total"] += latency
+                    self._stats["latency_max"] = max(self._stats["latency_max"], latency)
+                return server, finished
+            except Exception as e:
+                # The session may be half-dead after any error; start fresh next try.
+                self._close_session(server)
+                server = None
+                transient = _transient(e)
+                if not transient or attempt >= self.max_retries:
+                    with self._lock:
+                        self._stats["failed"] += 1
+                        self._stats["last_error"] = f"{type(e).__name__}: {e}"
+                    if transient:
+                        print(f"Email to {msg['To']} failed after {attempt + 1} attempts:", e)
+                    else:
+                        print(f"Email to {msg['To']} dropped, not retrying:", e)
+                    return None, 0.0
+                with self._lock:
+                    self._stats["retries"] += 1
+                time.sleep(self.backoff * (2 ** attempt))
+                attempt += 1
+
+
+_email_queue = None
+_email_queue_lock = threading.Lock()
+
+
+def get_email_queue(**config):
+    global _email_queue
+    if _email_queue is None:
+        with _email_queue_lock:
+            if _email_queue is None:
+                _email_queue = EmailQueue(**config)
+                atexit.register(_email_queue.stop)
+    return _email_queue
+
+
+def reset_email_queue():
+    global _email_queue
+    with _email_queue_lock:
+        q, _email_queue = _email_queue, None
+    if q is not None:
+        q.stop()
@@ -1,25 +1,58 @@
-import smtplib
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 import os
-from dotenv import load_dotenv
+import time
+from backend.utils import metrics
+from backend.utils.email_queue import get_email_queue
 
-load_dotenv()
 YOUR_GMAIL = os.getenv("GMAIL_ADDRESS")
 YOUR_APP_PASSWORD = os.getenv("GMAIL_APP")
-SMTP_SERVER = "smtp.gmail.com"
-SMTP_PORT = 587
+SMTP_SERVER = os.getenv("SMTP_SERVER", "smtp.gmail.com")
+SMTP_PORT = int(os.getenv("SMTP_PORT", "587"))
+SMTP_STARTTLS = os.getenv("SMTP_STARTTLS", "1").strip().lower() in ("1", "true", "yes", "on")
+# Set EMAIL_ASYNC=0 to send inline (useful when debugging SMTP problems)
+EMAIL_ASYNC = os.getenv("EMAIL_ASYNC", "1").strip().lower() in ("1", "true", "yes", "on")
 
-def _send_html_email(to_email: str, subject: str, html_body: str):
+EMAIL_QUEUE_CONFIG = {
+    "host": SMTP_SERVER,
+    "port": SMTP_PORT,
+    "username": YOUR_GMAIL,
+    "password": YOUR_APP_PASSWORD,
+    "starttls": SMTP_STARTTLS,
+    "workers": int(os.getenv("EMAIL_WORKERS", "2")),
+    "max_retries": int(os.getenv("EMAIL_MAX_RETRIES", "3")),
+    "backoff": float(os.getenv("EMAIL_RETRY_BACKOFF", "2")),
+    "session_idle": float(os.getenv("EMAIL_SESSION_IDLE", "60")),
+    "maxsize": int(os.getenv("EMAIL_QUEUE_MAX", "1000")),
+}
+
+def _build_message(to_email: str, subject: str, html_body: str):
     msg = MIMEMultipart("alternative")
     msg["Subject"] = subject
     msg["From"] = f"Marmu Barber & Tattoo Shop <{YOUR_GMAIL}>"
     msg["To"] = to_email
     msg.attach(MIMEText(html_body, "html"))
-    with smtplib.SMTP(SMTP_SERVER, SMTP_PORT) as server:
-        server.starttls()
-        server.login(YOUR_GMAIL, YOUR_APP_PASSWORD)
-        server.send_message(msg)
+    return msg
+
+def _send_html_email(to_email: str, subject: str, html_body: str):
+    msg = _build_message(to_email, subject, html_body)
+    started = time.perf_counter()
+    try:
+        if EMAIL_ASYNC:
+            get_email_queue(**EMAIL_QUEUE_CONFIG).enqueue(msg)
+            return
+        import smtplib  # only the inline (EMAIL_ASYNC=0) path needs it here
+        with smtplib.SMTP(SMTP_SERVER, SMTP_PORT) as server:
+            if SMTP_STARTTLS:
+                server.starttls()
+            if YOUR_GMAIL and YOUR_APP_PASSWORD:
+                server.login(YOUR_GMAIL, YOUR_APP_PASSWORD)
+            server.send_message(msg)
+    finally:
+        metrics.record("smtp", time.perf_counter() - started)
+
+def email_queue_stats():
+    return get_email_queue(**EMAIL_QUEUE_CONFIG).stats()
 
 def send_email_otp(email: str, subject: str, otp: str, expiry_minutes: int = 5):
     html_body = f"""
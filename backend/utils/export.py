@@ -0,0 +1,113 @@
+import csv
+import io
+import json
+import os
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from flask import Response, stream_with_context
+
+from backend.db import get_dedicated_connection
+
+# Streaming exports. Rows are read from an unbuffered cursor on a connection
+# of its own (an export can run for minutes and must not hold a pooled one)
+# and written out in batches as they arrive, so memory stays flat and the
+# first bytes go out as soon as MySQL starts returning rows.
+
+EXPORT_FORMATS = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+# Seconds MySQL waits on a slow HTTP client before dropping the stream.
+EXPORT_NET_WRITE_TIMEOUT = int(os.getenv("EXPORT_NET_WRITE_TIMEOUT", "600"))
+# Text a spreadsheet would run as a formula; such CSV cells get a leading "'".
+CSV_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+class ExportError(ValueError):
+    pass
+
+
+def _plain(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat(sep=" ") if isinstance(value, datetime) else value.isoformat()
+    if isinstance(value, timedelta):
+        total = int(value.total_seconds())
+        return f"{total // 3600:02d}:{total % 3600 // 60:02d}:{total % 60:02d}"
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (bytes, bytearray)):
+        return value.decode("utf-8", "replace")
+    return value
+
+
+def _csv_cell(value):
+    if value is None:
+        return ""
+    value = _plain(value)
+    if isinstance(value, str) and value.startswith(CSV_FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def _csv_chunks(columns, batches):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    yield buffer.getvalue()
+    for rows in batches:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows([[_csv_cell(v) for v in row] for row in rows])
+        yield buffer.getvalue()
+
+
+def _ndjson_chunks(columns, batches):
+    for rows in batches:
+        yield "".join(json.dumps(dict(zip(columns, map(_plain, row))), ensure_ascii=False) + "\n" for row in rows)
+
+
+def stream_query(statement, params, fmt, filename):
+    # The statement runs before the response is returned, so a bad query is
+    # still an ordinary 500 rather than a truncated download.
+    if fmt not in EXPORT_FORMATS:
+        raise ExportError(f"format must be one of {', '.join(EXPORT_FORMATS)}")
+
+    conn = get_dedicated_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SET SESSION net_write_timeout = %s", (EXPORT_NET_WRITE_TIMEOUT,))
+        cursor.execute(statement, tuple(params))
+        columns = list(cursor.column_names)
+    except Exception:
+        conn.close()
+        raise
+
+    closed = []
+
+    def close():
+        if closed:
+            return
+        closed.append(True)
+        try:
+            cursor.close()
+        except Exception:
+            pass
+        conn.close()
+
+    def batches():
+        try:
+            while True:
+                rows = cursor.fetchmany(EXPORT_BATCH_SIZE)
+                if not rows:
+                    break
+                yield rows
+        finally:
+            close()
+
+    chunks = _csv_chunks(columns, batches()) if fmt == "csv" else _ndjson_chunks(columns, batches())
+    response = Response(stream_with_context(chunks), mimetype=EXPORT_FORMATS[fmt])
+    response.headers["Content-Disposition"] = f'attachment; filename="{filename}.{fmt}"'
+    response.headers["Cache-Control"] = "no-store"
+    response.headers["X-Accel-Buffering"] = "no"
+    # Covers a client that disconnects before the first chunk is pulled.
+    response.call_on_close(close)
+    return response
@@ -0,0 +1,166 @@
+import threading
+import time
+
+from flask import g, has_request_context, request
+from flask.json.provider import DefaultJSONProvider
+
+from backend.db import add_observer
+
+# Per-request timing. Every request gets a small accumulator in flask.g that
+# the database hooks (backend.db observers), the email sender and the JSON
+# provider add to. after_request turns it into a Server-Timing header and
+# feeds the per-route histograms rendered by /metrics.
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 50)
+
+
+class Histogram:
+    def __init__(self, name, help_text, labels, buckets=BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, label_values, value):
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted(self._series.items())
+            for label_values, (counts, total, count) in items:
+                base = ",".join(f'{k}="{_escape(v)}"' for k, v in zip(self.labels, label_values))
+                for bound, n in zip(self.buckets, counts):
+                    lines.append(f'{self.name}_bucket{{{base},le="{bound}"}} {n}')
+                lines.append(f'{self.name}_bucket{{{base},le="+Inf"}} {count}')
+                lines.append(f"{self.name}_sum{{{base}}} {total}")
+                lines.append(f"{self.name}_count{{{base}}} {count}")
+        return lines
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+LABELS = ("route", "method")
+REQUEST_SECONDS = Histogram("http_request_duration_seconds", "Time spent handling requests", LABELS + ("status",))
+DB_SECONDS = Histogram("http_request_db_seconds", "Database time per request (checkout + queries + fetches)", LABELS)
+DB_CONNECT_SECONDS = Histogram("http_request_db_connect_seconds", "Connection checkout time per request", LABELS)
+DB_QUERIES = Histogram("http_request_db_queries", "Statements executed per request", LABELS, QUERY_BUCKETS)
+SMTP_SECONDS = Histogram("http_request_smtp_seconds", "Time spent handing mail to SMTP/queue per request", LABELS)
+JSON_SECONDS = Histogram("http_request_json_seconds", "JSON serialization time per request", LABELS)
+HISTOGRAMS = (REQUEST_SECONDS, DB_SECONDS, DB_CONNECT_SECONDS, DB_QUERIES, SMTP_SECONDS, JSON_SECONDS)
+
+# Extra gauge sources (name -> callable returning a flat dict of numbers).
+_gauge_sources = {}
+
+
+def record(kind, seconds, count=0):
+    if not has_request_context():
+        return
+    timings = g.get("_timings")
+    if timings is None:
+        return
+    timings[kind] = timings.get(kind, 0.0) + seconds
+    if count:
+        timings[kind + "_count"] = timings.get(kind + "_count", 0) + count
+
+
+def _on_db_event(event, seconds, **info):
+    if event == "checkout":
+        record("db_connect", seconds)
+    elif event == "query":
+        record("db", seconds, count=1)
+    else:
+        record("db", seconds)
+
+
+class TimedJSONProvider(DefaultJSONProvider):
+    def dumps(self, obj, **kwargs):
+        started = time.perf_counter()
+        try:
+            return super().dumps(obj, **kwargs)
+        finally:
+            record("json", time.perf_counter() - started)
+
+
+def add_gauge_source(name, fn):
+    _gauge_sources[name] = fn
+
+
+def _before_request():
+    g._timings = {}
+    g._request_started = time.perf_counter()
+
+
+def _after_request(response):
+    timings = g.pop("_timings", None)
+    started = g.pop("_request_started", None)
+    if timings is None or started is None:
+        return response
+
+    total = time.perf_counter() - started
+    route = request.url_rule.rule if request.url_rule else "unmatched"
+    if route == "/metrics":
+        return response
+    labels = (route, request.method)
+
+    db_time = timings.get("db", 0.0)
+    connect_time = timings.get("db_connect", 0.0)
+    queries = timings.get("db_count", 0)
+    smtp_time = timings.get("smtp", 0.0)
+    json_time = timings.get("json", 0.0)
+
+    REQUEST_SECONDS.observe(labels + (str(response.status_code),), total)
+    DB_SECONDS.observe(labels, db_time + connect_time)
+    DB_CONNECT_SECONDS.observe(labels, connect_time)
+    DB_QUERIES.observe(labels, queries)
+    SMTP_SECONDS.observe(labels, smtp_time)
+    JSON_SECONDS.observe(labels, json_time)
+
+    response.headers["Server-Timing"] = ", ".join([
+        f"dbconn;dur={connect_time * 1000:.2f}",
+        f'db;dur={db_time * 1000:.2f};desc="{queries} queries"',
+        f"smtp;dur={smtp_time * 1000:.2f}",
+        f"json;dur={json_time * 1000:.2f}",
+        f"total;dur={total * 1000:.2f}",
+    ])
+    if "Server-Timing" not in response.headers.get("Access-Control-Expose-Headers", ""):
+        response.headers.add("Access-Control-Expose-Headers", "Server-Timing")
+    return response
+
+
+def init_app(app):
+    add_observer(_on_db_event)
+    app.json = TimedJSONProvider(app)
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+
+
+def render():
+    lines = []
+    for histogram in HISTOGRAMS:
+        lines.extend(histogram.render())
+    for source, fn in sorted(_gauge_sources.items()):
+        try:
+            values = fn()
+        except Exception:
+            continue
+        for key, value in sorted(values.items()):
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                continue
+            name = f"{source}_{key}"
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {value}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,128 @@
+import hashlib
+import hmac
+import os
+import threading
+import time
+
+from flask import current_app, has_app_context
+
+from backend.db import get_connection
+
+# OTPs are keyed by (purpose, email) so a signup code can never be used to
+# reset a password. verify_and_consume() checks and deletes in one step, so a
+# code can only be used once even if two requests race.
+
+OTP_STORE = os.getenv("OTP_STORE", "mysql").strip().lower()
+PURGE_BATCH = 500
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def _digest(key, email, otp):
+    # Keyed with the app's SECRET_KEY: a plain hash of a 6-digit code is
+    # reversed by trying all million of them, so a leaked tbl_otp would be as
+    # good as the codes themselves.
+    return hmac.new(key, f"{email}:{otp}".encode("utf-8"), hashlib.sha256).hexdigest()
+
+
+def _secret_key():
+    # The running app's key (which may be a generated debug key), else
+    # SECRET_KEY from the environment for CLIs and maintenance jobs.
+    key = current_app.config.get("SECRET_KEY") if has_app_context() else None
+    key = key or os.getenv("SECRET_KEY")
+    if not key:
+        raise RuntimeError("SECRET_KEY is not set; OTPs can't be stored or checked")
+    return key.encode("utf-8") if isinstance(key, str) else key
+
+
+class MemoryOTPStore:
+    # Single-process only; handy for local development.
+
+    def __init__(self, secret_key):
+        self._key = secret_key
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def put(self, purpose, email, otp, ttl_seconds):
+        with self._lock:
+            self._purge_locked()
+            self._entries[(purpose, email)] = (_digest(self._key, email, otp), time.monotonic() + ttl_seconds)
+
+    def verify_and_consume(self, purpose, email, otp):
+        with self._lock:
+            entry = self._entries.get((purpose, email))
+            if not entry or entry[1] < time.monotonic() or not hmac.compare_digest(entry[0], _digest(self._key, email, otp)):
+                return False
+            del self._entries[(purpose, email)]
+            return True
+
+    def purge_expired(self):
+        with self._lock:
+            return self._purge_locked()
+
+    def _purge_locked(self):
+        now = time.monotonic()
+        expired = [key for key, (_, expires) in self._entries.items() if expires < now]
+        for key in expired:
+            del self._entries[key]
+        return len(expired)
+
+
+class MySQLOTPStore:
+    # Shared across worker processes via tbl_otp (migration 0005_otp.sql).
+    # Expiry uses the database clock so every worker agrees on it.
+
+    def __init__(self, secret_key):
+        self._key = secret_key
+
+    def put(self, purpose, email, otp, ttl_seconds):
+        conn = get_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("""
+                INSERT INTO tbl_otp (purpose, email, otp_hash, expires_at)
+                VALUES (%s, %s, %s, DATE_ADD(NOW(), INTERVAL %s SECOND))
+                ON DUPLICATE KEY UPDATE otp_hash=VALUES(otp_hash), expires_at=VALUES(expires_at)
+            """, (purpose, email, _digest(self._key, email, otp), int(ttl_seconds)))
+            cursor.execute("DELETE FROM tbl_otp WHERE expires_at < NOW() LIMIT %s", (PURGE_BATCH,))
+            conn.commit()
+        finally:
+            cursor.close()
+            conn.close()
+
+    def verify_and_consume(self, purpose, email, otp):
+        conn = get_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("""
+                DELETE FROM tbl_otp
+                WHERE purpose=%s AND email=%s AND otp_hash=%s AND expires_at >= NOW()
+            """, (purpose, email, _digest(self._key, email, otp)))
+            consumed = cursor.rowcount == 1
+            conn.commit()
+            return consumed
+        finally:
+            cursor.close()
+            conn.close()
+
+    def purge_expired(self):
+        conn = get_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("DELETE FROM tbl_otp WHERE expires_at < NOW()")
+            conn.commit()
+            return cursor.rowcount
+        finally:
+            cursor.close()
+            conn.close()
+
+
+def get_otp_store():
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                store_class = MemoryOTPStore if OTP_STORE == "memory" else MySQLOTPStore
+                _store = store_class(_secret_key())
+    return _store
@@ -0,0 +1,302 @@
+import base64
+import json
+import threading
+import time
+
+# Keyset ("cursor") pagination for the admin list endpoints. Each sort is a
+# list of (sql_expression, "ASC"/"DESC") columns ending in a unique id, and a
+# cursor is the opaque encoding of the boundary row's values for those columns.
+# Sort expressions must never be NULL (COALESCE nullable columns): "x > NULL"
+# matches nothing, so a NULL key would end the listing early.
+# Pages are fetched with a WHERE on those values instead of OFFSET, so page
+# 500 costs the same as page 1.
+
+TOTAL_MODES = ("exact", "cached", "approx", "none")
+COUNT_CACHE_TTL = 30
+COUNT_CACHE_MAX = 512
+MAX_PER_PAGE = 200
+
+_count_cache = {}
+_count_cache_lock = threading.Lock()
+
+
+class CursorError(ValueError):
+    pass
+
+
+def encode_cursor(values, direction, sort):
+    payload = json.dumps({"k": list(values), "d": direction, "s": sort}, default=str, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token, sort, width):
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        values, direction = data["k"], data["d"]
+    except Exception:
+        raise CursorError("Invalid cursor")
+    if data.get("s") != sort or direction not in ("next", "prev") or len(values) != width:
+        raise CursorError("Cursor does not match this query")
+    return values, direction
+
+
+def _flip(direction):
+    return "DESC" if direction == "ASC" else "ASC"
+
+
+def order_sql(columns, reverse=False):
+    return ", ".join(f"{expr} {_flip(d) if reverse else d}" for expr, d in columns)
+
+
+def keyset_condition(columns, values, reverse=False):
+    # (a, b, c) "after" (x, y, z), honouring per-column direction:
+    #   a > x OR (a = x AND (b > y OR (b = y AND c > z)))
+    if any(value is None for value in values):
+        raise CursorError("Cursor does not match this query")
+    sql, params = None, []
+    for (expr, direction), value in reversed(list(zip(columns, values))):
+        if reverse:
+            direction = _flip(direction)
+        op = ">" if direction == "ASC" else "<"
+        if sql is None:
+            sql = f"{expr} {op} %s"
+            params = [value]
+        else:
+            sql = f"({expr} {op} %s OR ({expr} = %s AND {sql}))"
+            params = [value, value] + params
+    return sql, params
+
+
+def clamp_per_page(value, default):
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        return default
+    return min(max(value, 1), MAX_PER_PAGE)
+
+
+def keyset_statement(select_sql, from_sql, where_clauses, params, columns, sort, per_page, token):
+    # Returns (statement, params, state); pass the fetched rows and the state
+    # to keyset_result(). Split so the sync and async drivers share it.
+    values, direction = (None, "next")
+    if token:
+        values, direction = decode_cursor(token, sort, len(columns))
+
+    reverse = direction == "prev"
+    clauses, exec_params = list(where_clauses), list(params)
+    if values is not None:
+        cond, cond_params = keyset_condition(columns, values, reverse=reverse)
+        clauses.append(cond)
+        exec_params.extend(cond_params)
+    where_sql = "WHERE " + " AND ".join(clauses) if clauses else ""
+
+    key_sql = ", ".join(f"{expr} AS _k{i}" for i, (expr, _) in enumerate(columns))
+    statement = f"""
+        SELECT {select_sql}, {key_sql}
+        {from_sql}
+        {where_sql}
+        ORDER BY {order_sql(columns, reverse=reverse)}
+        LIMIT %s
+    """
+    return statement, (*exec_params, per_page + 1), (columns, sort, per_page, values, reverse)
+
+
+def keyset_result(rows, state):
+    columns, sort, per_page, values, reverse = state
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+    if reverse:
+        rows.reverse()
+
+    keys = [[row.pop(f"_k{i}") for i in range(len(columns))] for row in rows]
+    # Going forward there is a previous page iff we came from a cursor; going
+    # back there is a next page by construction.
+    more_after = has_more if not reverse else True
+    more_before = (values is not None) if not reverse else has_more
+
+    next_cursor = encode_cursor(keys[-1], "next", sort) if rows and more_after else None
+    prev_cursor = encode_cursor(keys[0], "prev", sort) if rows and more_before else None
+    return rows, next_cursor, prev_cursor
+
+
+def fetch_keyset_page(cursor, select_sql, from_sql, where_clauses, params, columns, sort, per_page, token):
+    statement, exec_params, state = keyset_statement(
+        select_sql, from_sql, where_clauses, params, columns, sort, per_page, token)
+    cursor.execute(statement, exec_params)
+    return keyset_result(cursor.fetchall(), state)
+
+
+def _approx_table_rows(cursor, table):
+    cursor.execute("""
+        SELECT TABLE_ROWS AS total FROM information_schema.TABLES
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+    """, (table,))
+    row = cursor.fetchone()
+    if not row:
+        return None
+    return row["total"] if isinstance(row, dict) else row[0]
+
+
+def _exact_count(cursor, from_sql, where_sql, params):
+    cursor.execute(f"SELECT COUNT(*) AS total {from_sql} {where_sql}", tuple(params))
+    row = cursor.fetchone()
+    if not row:
+        return 0
+    return row["total"] if isinstance(row, dict) else row[0]
+
+
+def _count_plan(mode, table, from_sql, where_clauses, params):
+    # How count_total() gets its number: (where_sql, cache key or None).
+    where_sql = "WHERE " + " AND ".join(where_clauses) if where_clauses else ""
+    if mode == "exact":
+        return where_sql, None
+    return where_sql, (table, from_sql, where_sql, tuple(str(p) for p in params))
+
+
+def _cached_count(key):
+    with _count_cache_lock:
+        hit = _count_cache.get(key)
+    if hit and hit[1] > time.monotonic():
+        return hit[0]
+    return None
+
+
+def _store_count(key, total):
+    with _count_cache_lock:
+        if len(_count_cache) >= COUNT_CACHE_MAX:
+            for stale in sorted(_count_cache, key=lambda k: _count_cache[k][1])[:COUNT_CACHE_MAX // 4]:
+                del _count_cache[stale]
+        _count_cache[key] = (total, time.monotonic() + COUNT_CACHE_TTL)
+
+
+def count_total(cursor, mode, table, from_sql, where_clauses, params):
+    # exact: COUNT(*) every call. cached: COUNT(*) at most every COUNT_CACHE_TTL
+    # seconds per filter. approx: the InnoDB row estimate when unfiltered,
+    # otherwise cached. none: skip.
+    if mode == "none":
+        return None
+    where_sql, key = _count_plan(mode, table, from_sql, where_clauses, params)
+    if key is None:
+        return _exact_count(cursor, from_sql, where_sql, params)
+    if mode == "approx" and not where_clauses:
+        estimate = _approx_table_rows(cursor, table)
+        if estimate is not None:
+            return estimate
+
+    total = _cached_count(key)
+    if total is None:
+        total = _exact_count(cursor, from_sql, where_sql, params)
+        _store_count(key, total)
+    return total
+
+
+def invalidate_counts(table):
+    with _count_cache_lock:
+        for key in [k for k in _count_cache if k[0] == table]:
+            del _count_cache[key]
+
+
+def _page_args(args, default_per_page):
+    per_page = clamp_per_page(args.get("per_page"), default_per_page)
+    keyset = "cursor" in args
+    total_mode = args.get("total") or ("cached" if keyset else "exact")
+    if total_mode not in TOTAL_MODES:
+        raise CursorError(f"total must be one of {', '.join(TOTAL_MODES)}")
+    return per_page, keyset, total_mode
+
+
+def _offset_statement(args, select_sql, from_sql, where_clauses, params, columns, per_page):
+    try:
+        page = max(int(args.get("page", 1)), 1)
+    except (TypeError, ValueError):
+        raise CursorError("page must be a whole number")
+    where_sql = "WHERE " + " AND ".join(where_clauses) if where_clauses else ""
+    statement = f"""
+        SELECT {select_sql}
+        {from_sql}
+        {where_sql}
+        ORDER BY {order_sql(columns)}
+        LIMIT %s OFFSET %s
+    """
+    return page, statement, (*params, per_page, (page - 1) * per_page)
+
+
+def paginate_query(cursor, args, select_sql, from_sql, where_clauses, params, columns, sort, table,
+                   count_from=None, default_per_page=20):
+    # Shared driver for the admin list endpoints. Passing ?cursor= (empty for
+    # the first page) switches to keyset mode; otherwise the legacy page/offset
+    # mode is kept for existing clients. ?total= picks how the total is computed.
+    per_page, keyset, total_mode = _page_args(args, default_per_page)
+
+    total = count_total(cursor, total_mode, table, count_from or from_sql, where_clauses, params)
+
+    if keyset:
+        rows, next_cursor, prev_cursor = fetch_keyset_page(
+            cursor, select_sql, from_sql, where_clauses, params, columns, sort, per_page, args.get("cursor"))
+        return {"data": rows, "total": total, "total_mode": total_mode, "per_page": per_page,
+                "next_cursor": next_cursor, "prev_cursor": prev_cursor}
+
+    page, statement, exec_params = _offset_statement(args, select_sql, from_sql, where_clauses, params, columns,
+                                                     per_page)
+    cursor.execute(statement, exec_params)
+    rows = cursor.fetchall()
+    return {"data": rows, "total": total, "page": page, "per_page": per_page}
+
+
+# Async twins of the above for the ASGI handlers (backend/asgi.py); the cursor
+# is a backend.db_async.AsyncCursor opened with dictionary=True.
+
+async def _exact_count_async(cursor, from_sql, where_sql, params):
+    await cursor.execute(f"SELECT COUNT(*) AS total {from_sql} {where_sql}", tuple(params))
+    row = await cursor.fetchone()
+    return row["total"] if row else 0
+
+
+async def count_total_async(cursor, mode, table, from_sql, where_clauses, params):
+    if mode == "none":
+        return None
+    where_sql, key = _count_plan(mode, table, from_sql, where_clauses, params)
+    if key is None:
+        return await _exact_count_async(cursor, from_sql, where_sql, params)
+    if mode == "approx" and not where_clauses:
+        await cursor.execute("""
+            SELECT TABLE_ROWS AS total FROM information_schema.TABLES
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+        """, (table,))
+        row = await cursor.fetchone()
+        if row:
+            return row["total"]
+
+    total = _cached_count(key)
+    if total is None:
+        total = await _exact_count_async(cursor, from_sql, where_sql, params)
+        _store_count(key, total)
+    return total
+
+
+async def fetch_keyset_page_async(cursor, select_sql, from_sql, where_clauses, params, columns, sort, per_page,
+                                  token):
+    statement, exec_params, state = keyset_statement(
+        select_sql, from_sql, where_clauses, params, columns, sort, per_page, token)
+    await cursor.execute(statement, exec_params)
+    return keyset_result(await cursor.fetchall(), state)
+
+
+async def paginate_query_async(cursor, args, select_sql, from_sql, where_clauses, params, columns, sort, table,
+                               count_from=None, default_per_page=20):
+    per_page, keyset, total_mode = _page_args(args, default_per_page)
+
+    total = await count_total_async(cursor, total_mode, table, count_from or from_sql, where_clauses, params)
+
+    if keyset:
+        rows, next_cursor, prev_cursor = await fetch_keyset_page_async(
+            cursor, select_sql, from_sql, where_clauses, params, columns, sort, per_page, args.get("cursor"))
+        return {"data": rows, "total": total, "total_mode": total_mode, "per_page": per_page,
+                "next_cursor": next_cursor, "prev_cursor": prev_cursor}
+
+    page, statement, exec_params = _offset_statement(args, select_sql, from_sql, where_clauses, params, columns,
+                                                     per_page)
+    await cursor.execute(statement, exec_params)
+    rows = await cursor.fetchall()
+    return {"data": rows, "total": total, "page": page, "per_page": per_page}
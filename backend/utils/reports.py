@@ -0,0 +1,183 @@
+import argparse
+import os
+from datetime import date, timedelta
+
+from backend.db import get_connection
+
+# Appointment reports over arbitrary date ranges, read from the daily rollup
+# (tbl_appointment_daily, migration 0007) instead of the raw appointments.
+# The rollup is kept current by the counters hooks on every appointment write
+# (bump_daily below); backfill() rebuilds any range from the raw table.
+
+GRANULARITIES = {
+    "day": "r.day",
+    "week": "DATE_SUB(r.day, INTERVAL WEEKDAY(r.day) DAY)",  # weeks start on Monday
+    "month": "CAST(DATE_FORMAT(r.day, '%Y-%m-01') AS DATE)",
+}
+GROUP_COLUMNS = {
+    "service": ["r.service"],
+    "artist": ["r.artist_id", "COALESCE(s.fullname, 'Unassigned') AS artist_name"],
+    "status": ["r.status"],
+}
+MAX_REPORT_DAYS = int(os.getenv("REPORT_MAX_DAYS", "3660"))
+BACKFILL_CHUNK_DAYS = 31
+
+
+class ReportError(ValueError):
+    pass
+
+
+def bump_daily(cursor, deltas):
+    # deltas: (day, service, artist_id, status, delta) tuples.
+    rows = [(day, service or "", artist_id or 0, status or "Pending", delta)
+            for day, service, artist_id, status, delta in deltas if delta]
+    if not rows:
+        return
+    values = ", ".join(["(%s, %s, %s, %s, %s)"] * len(rows))
+    cursor.execute(f"""
+        INSERT INTO tbl_appointment_daily (day, service, artist_id, status, appointments) VALUES {values}
+        ON DUPLICATE KEY UPDATE appointments = appointments + VALUES(appointments)
+    """, tuple(v for row in rows for v in row))
+
+
+def period_start(day, granularity):
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    if granularity == "month":
+        return day.replace(day=1)
+    return day
+
+
+def iter_periods(start, end, granularity):
+    current = period_start(start, granularity)
+    while current <= end:
+        yield current
+        if granularity == "day":
+            current += timedelta(days=1)
+        elif granularity == "week":
+            current += timedelta(days=7)
+        else:
+            current = (current.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def parse_range(start, end):
+    try:
+        today = date.today()
+        start = date.fromisoformat(start) if start else today.replace(day=1)
+        end = date.fromisoformat(end) if end else today
+    except ValueError:
+        raise ReportError("start and end must be YYYY-MM-DD")
+    if end < start:
+        raise ReportError("end must not be before start")
+    if (end - start).days + 1 > MAX_REPORT_DAYS:
+        raise ReportError(f"range is limited to {MAX_REPORT_DAYS} days")
+    return start, end
+
+
+def appointment_report(cursor, start, end, granularity="day", group_by=(), service=None, artist_id=None,
+                       status=None):
+    if granularity not in GRANULARITIES:
+        raise ReportError(f"granularity must be one of {', '.join(GRANULARITIES)}")
+    unknown = [g for g in group_by if g not in GROUP_COLUMNS]
+    if unknown:
+        raise ReportError(f"group_by must be any of {', '.join(GROUP_COLUMNS)}")
+
+    where, params = ["r.day BETWEEN %s AND %s"], [start, end]
+    for column, value in (("r.service", service), ("r.artist_id", artist_id), ("r.status", status)):
+        if value not in (None, ""):
+            where.append(f"{column}=%s")
+            params.append(value)
+
+    columns = [c for g in group_by for c in GROUP_COLUMNS[g]]
+    group_sql = ", ".join(["period"] + [c.split(" AS ")[0] for c in columns])
+    join_sql = "LEFT JOIN tbl_staff s ON s.id = NULLIF(r.artist_id, 0)" if "artist" in group_by else ""
+    cursor.execute(f"""
+        SELECT {GRANULARITIES[granularity]} AS period{''.join(', ' + c for c in columns)},
+               SUM(r.appointments) AS appointments
+        FROM tbl_appointment_daily r
+        {join_sql}
+        WHERE {' AND '.join(where)}
+        GROUP BY {group_sql}
+        HAVING SUM(r.appointments) <> 0
+        ORDER BY {group_sql}
+    """, tuple(params))
+
+    rows, total = [], 0
+    for row in cursor.fetchall():
+        row = dict(row) if isinstance(row, dict) else dict(zip(cursor.column_names, row))
+        row["period"] = row["period"].isoformat()
+        row["appointments"] = int(row["appointments"])
+        total += row["appointments"]
+        rows.append(row)
+    return {
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "granularity": granularity,
+        "group_by": list(group_by),
+        "periods": [p.isoformat() for p in iter_periods(start, end, granularity)],
+        "rows": rows,
+        "total": total,
+    }
+
+
+def backfill(conn=None, start=None, end=None):
+    # Recomputes the rollup for [start, end] (default: every appointment date)
+    # from tbl_appointment, one month-sized chunk per transaction.
+    own_conn = conn is None
+    conn = conn or get_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT GET_LOCK('appointment_daily_backfill', 0)")
+        if not cursor.fetchone()[0]:
+            return None
+        try:
+            if start is None or end is None:
+                cursor.execute("SELECT MIN(appointment_date), MAX(appointment_date) FROM tbl_appointment")
+                first, last = cursor.fetchone()
+                conn.commit()
+                if first is None:
+                    return 0
+                start, end = start or first, end or last
+
+            days = 0
+            chunk_start = start
+            while chunk_start <= end:
+                chunk_end = min(chunk_start + timedelta(days=BACKFILL_CHUNK_DAYS - 1), end)
+                cursor.execute("DELETE FROM tbl_appointment_daily WHERE day BETWEEN %s AND %s",
+                               (chunk_start, chunk_end))
+                cursor.execute("""
+                    INSERT INTO tbl_appointment_daily (day, service, artist_id, status, appointments)
+                    SELECT appointment_date, COALESCE(service, ''), COALESCE(artist_id, 0),
+                           COALESCE(status, 'Pending'), COUNT(*)
+                    FROM tbl_appointment
+                    WHERE appointment_date BETWEEN %s AND %s
+                    GROUP BY 1, 2, 3, 4
+                """, (chunk_start, chunk_end))
+                conn.commit()
+                days += (chunk_end - chunk_start).days + 1
+                chunk_start = chunk_end + timedelta(days=1)
+            return days
+        finally:
+            cursor.execute("SELECT RELEASE_LOCK('appointment_daily_backfill')")
+            cursor.fetchall()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+        if own_conn:
+            conn.close()
+
+
+if __name__ == "__main__":
+    # python -m backend.utils.reports backfill [--start YYYY-MM-DD] [--end YYYY-MM-DD]
+    parser = argparse.ArgumentParser(prog="python -m backend.utils.reports")
+    parser.add_argument("command", choices=["backfill"])
+    parser.add_argument("--start", type=date.fromisoformat)
+    parser.add_argument("--end", type=date.fromisoformat)
+    args = parser.parse_args()
+    result = backfill(start=args.start, end=args.end)
+    if result is None:
+        print("another process is backfilling")
+    else:
+        print(f"rebuilt {result} day(s) of tbl_appointment_daily")
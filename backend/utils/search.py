@@ -0,0 +1,45 @@
+import os
+import re
+
+# Admin search on top of the FULLTEXT indexes from migration 0003_search_indexes.sql.
+# Every term must match as a word prefix (MATCH ... AGAINST '+foo* +bar*' IN
+# BOOLEAN MODE); terms shorter than the index's minimum token size match the
+# start of any word instead. A purely numeric query is treated as an exact id
+# lookup.
+
+FT_MIN_TOKEN_SIZE = int(os.getenv("FT_MIN_TOKEN_SIZE", "3"))
+MAX_TERMS = 8
+
+
+def search_terms(q):
+    return re.findall(r"\w+", q or "", re.UNICODE)[:MAX_TERMS]
+
+
+def search_clause(q, columns, id_column=None):
+    q = (q or "").strip()
+    if not q:
+        return None, []
+    if id_column and q.isdigit():
+        return f"{id_column} = %s", [int(q)]
+
+    terms = search_terms(q)
+    if not terms:
+        return None, []
+
+    clauses, params = [], []
+    indexed = [t for t in terms if len(t) >= FT_MIN_TOKEN_SIZE]
+    if indexed:
+        clauses.append(f"MATCH({', '.join(columns)}) AGAINST (%s IN BOOLEAN MODE)")
+        params.append(" ".join(f"+{t}*" for t in indexed))
+
+    # Terms below the FULLTEXT minimum token size are not in the index, so
+    # they are matched as word starts with LIKE ('jo%' OR '% jo%'). That can't
+    # use an index: with a longer term alongside, it only filters the
+    # FULLTEXT matches; on its own it scans the table.
+    for term in terms:
+        if len(term) >= FT_MIN_TOKEN_SIZE:
+            continue
+        term = term.replace("_", "\\_")
+        clauses.append("(" + " OR ".join(f"{col} LIKE %s OR {col} LIKE %s" for col in columns) + ")")
+        params.extend([f"{term}%", f"% {term}%"] * len(columns))
+    return " AND ".join(clauses), params
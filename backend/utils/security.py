@@ -1,8 +1,105 @@
+import base64
 import hashlib
+import hmac
+import os
 import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
-def hash_password(password: str) -> str:
-    return hashlib.sha256(password.encode("utf-8")).hexdigest()
+# Passwords are stored as "pbkdf2_sha256$<iterations>$<salt>$<hash>". Older
+# accounts still hold a bare unsalted SHA-256 hex digest; verify_password
+# accepts both and needs_rehash() tells login to upgrade them.
+#
+# PBKDF2 is deliberately slow, so it runs on a small bounded pool: at most
+# PASSWORD_HASH_WORKERS hashes run at once and at most PASSWORD_HASH_MAX_PENDING
+# wait, so a login burst cannot eat every CPU the other endpoints need.
+
+PASSWORD_ALGORITHM = "pbkdf2_sha256"
+PASSWORD_ITERATIONS = int(os.getenv("PASSWORD_ITERATIONS", "260000"))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "32"))
+SALT_BYTES = 16
+
+_executor = None
+_executor_lock = threading.Lock()
+_pending = threading.BoundedSemaphore(PASSWORD_HASH_WORKERS + PASSWORD_HASH_MAX_PENDING)
+
+class PasswordHasherBusy(Exception):
+    pass
+
+def _b64(raw):
+    return base64.b64encode(raw).decode("ascii").rstrip("=")
+
+def _unb64(text):
+    return base64.b64decode(text + "=" * (-len(text) % 4))
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash")
+    return _executor
+
+def reset_executor():
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=False)
+
+def _run(fn, *args):
+    if not _pending.acquire(blocking=False):
+        raise PasswordHasherBusy("Too many password checks in progress, try again shortly")
+    try:
+        return _get_executor().submit(fn, *args).result()
+    finally:
+        _pending.release()
+
+def _pbkdf2(password, salt, iterations):
+    return hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, iterations)
+
+def _hash(password, iterations):
+    salt = os.urandom(SALT_BYTES)
+    digest = _pbkdf2(password, salt, iterations)
+    return f"{PASSWORD_ALGORITHM}${iterations}${_b64(salt)}${_b64(digest)}"
+
+def _verify(password, stored):
+    if not stored:
+        return False
+    if "$" not in stored:
+        legacy = hashlib.sha256(password.encode("utf-8")).hexdigest()
+        return hmac.compare_digest(legacy, stored)
+    try:
+        algorithm, iterations, salt, digest = stored.split("$")
+        if algorithm != PASSWORD_ALGORITHM:
+            return False
+        candidate = _pbkdf2(password, _unb64(salt), int(iterations))
+        return hmac.compare_digest(candidate, _unb64(digest))
+    except ValueError:
+        return False
+
+def hash_password(password: str, iterations: int = None) -> str:
+    return _run(_hash, password, iterations or PASSWORD_ITERATIONS)
+
+def verify_password(password: str, stored: str) -> bool:
+    return _run(_verify, password, stored)
+
+_DUMMY_HASH = f"{PASSWORD_ALGORITHM}${PASSWORD_ITERATIONS}${_b64(bytes(SALT_BYTES))}${_b64(bytes(32))}"
+
+def burn_password_check(password: str) -> None:
+    # Same work as checking a real current-cost hash, for logins that name no
+    # account, so response time doesn't reveal which usernames exist.
+    _run(_verify, password, _DUMMY_HASH)
+
+def needs_rehash(stored: str) -> bool:
+    parts = (stored or "").split("$")
+    if len(parts) != 4 or parts[0] != PASSWORD_ALGORITHM:
+        return True
+    try:
+        return int(parts[1]) < PASSWORD_ITERATIONS
+    except ValueError:
+        return True
 
 def is_strong_password(password: str) -> bool:
     if not password or len(password) < 8:
@@ -0,0 +1,181 @@
+import argparse
+import os
+import re
+from datetime import time as time_cls, timedelta
+from functools import lru_cache
+
+import mysql.connector
+from mysql.connector import errorcode
+
+from backend.db import get_connection
+
+# Time-slot codec. Appointment and unavailability times used to be stored
+# only as free-form strings ("14:00", "2:00 PM"); migration 0008 adds a
+# minute-of-day column next to each (time_minute, unavailable_minute). Writes
+# store both, reads use the integer and format it only when building a
+# response. backfill() fills the integers for rows written before 0008:
+#
+#   python -m backend.utils.slots backfill
+
+BACKFILL_BATCH_SIZE = int(os.getenv("SLOT_BACKFILL_BATCH_SIZE", "5000"))
+
+_SLOT_TEXT = re.compile(r"^(\d{1,2}):(\d{2})(?::(\d{2}))?\s*([AaPp][Mm])?$")
+
+# (table, text column, minute column) converted by backfill().
+SLOT_COLUMNS = [
+    ("tbl_appointment", "time", "time_minute"),
+    ("tbl_staff_unavailability", "unavailable_time", "unavailable_minute"),
+]
+
+
+@lru_cache(maxsize=256)
+def _parse_text(text):
+    match = _SLOT_TEXT.match(text.strip())
+    if not match:
+        return None
+    hour, minute, _, meridiem = match.groups()
+    hour, minute = int(hour), int(minute)
+    if meridiem:
+        if not 1 <= hour <= 12:
+            return None
+        hour = hour % 12 + (12 if meridiem.upper() == "PM" else 0)
+    if hour > 23 or minute > 59:
+        return None
+    return hour * 60 + minute
+
+
+def parse_slot(value):
+    # Minute of day (0..1439) for "14:00", "2:00 PM", "14:00:00", a TIME /
+    # timedelta or an int that already is one; None if it is not a time.
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value if 0 <= value < 24 * 60 else None
+    if isinstance(value, timedelta):
+        return parse_slot(int(value.total_seconds()) // 60)
+    if isinstance(value, time_cls):
+        return value.hour * 60 + value.minute
+    if isinstance(value, (bytes, bytearray)):
+        value = value.decode("ascii", "replace")
+    return _parse_text(str(value))
+
+
+def format_slot(minute, padded=False):
+    # 840 -> "2:00 PM" (the labels the availability endpoints hand out), or
+    # "02:00 PM" with padded=True.
+    hour, minute = divmod(minute, 60)
+    text = f"{hour % 12 or 12}:{minute:02d} {'AM' if hour < 12 else 'PM'}"
+    return text.zfill(8) if padded else text
+
+
+def row_minute(minute, text):
+    # Reads prefer the stored integer; rows that predate the backfill fall
+    # back to the (cached) parse of their text.
+    return minute if minute is not None else parse_slot(text)
+
+
+def _convert_chunk(cursor, table, minute_col, rows):
+    by_minute, unparsed = {}, 0
+    for row_id, text in rows:
+        minute = parse_slot(text)
+        if minute is None:
+            unparsed += 1
+        else:
+            by_minute.setdefault(minute, []).append(row_id)
+    for minute, ids in by_minute.items():
+        cursor.execute(
+            f"UPDATE {table} SET {minute_col}=%s WHERE id IN ({', '.join(['%s'] * len(ids))})",
+            (minute, *ids),
+        )
+    return sum(len(ids) for ids in by_minute.values()), unparsed
+
+
+def _convert_rows_one_by_one(conn, cursor, table, minute_col, rows):
+    # Slow path for a chunk that trips uq_appointment_active_minute: two active
+    # bookings of the same slot under different spellings. Those rows keep a
+    # NULL minute and are reported instead of failing the whole backfill.
+    converted, conflicts = 0, []
+    for row_id, text in rows:
+        minute = parse_slot(text)
+        if minute is None:
+            continue
+        try:
+            cursor.execute(f"UPDATE {table} SET {minute_col}=%s WHERE id=%s", (minute, row_id))
+            conn.commit()
+            converted += 1
+        except mysql.connector.Error as e:
+            conn.rollback()
+            if e.errno != errorcode.ER_DUP_ENTRY:
+                raise
+            conflicts.append(row_id)
+    return converted, conflicts
+
+
+def backfill(conn=None, batch_size=BACKFILL_BATCH_SIZE):
+    # Converts rows with a NULL minute column in id ranges of batch_size, one
+    # transaction per range, so it can run against a live database. Returns
+    # {table: {"converted", "unparsed", "conflicts"}}, or None if another
+    # process holds the backfill lock.
+    own_conn = conn is None
+    conn = conn or get_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT GET_LOCK('slot_minute_backfill', 0)")
+        if not cursor.fetchone()[0]:
+            return None
+        try:
+            result = {}
+            for table, text_col, minute_col in SLOT_COLUMNS:
+                converted, unparsed, conflicts = 0, 0, []
+                cursor.execute(f"SELECT MIN(id), MAX(id) FROM {table} WHERE {minute_col} IS NULL")
+                first, last = cursor.fetchone()
+                conn.commit()
+                start = first
+                while first is not None and start <= last:
+                    end = start + batch_size - 1
+                    cursor.execute(f"""
+                        SELECT id, {text_col} FROM {table}
+                        WHERE id BETWEEN %s AND %s AND {minute_col} IS NULL AND {text_col} IS NOT NULL
+                    """, (start, end))
+                    rows = cursor.fetchall()
+                    try:
+                        done, skipped = _convert_chunk(cursor, table, minute_col, rows)
+                        conn.commit()
+                    except mysql.connector.Error as e:
+                        conn.rollback()
+                        if e.errno != errorcode.ER_DUP_ENTRY:
+                            raise
+                        done, clashing = _convert_rows_one_by_one(conn, cursor, table, minute_col, rows)
+                        skipped = sum(1 for _, text in rows if parse_slot(text) is None)
+                        conflicts.extend(clashing)
+                    converted += done
+                    unparsed += skipped
+                    start = end + 1
+                result[table] = {"converted": converted, "unparsed": unparsed, "conflicts": conflicts}
+            return result
+        finally:
+            cursor.execute("SELECT RELEASE_LOCK('slot_minute_backfill')")
+            cursor.fetchall()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+        if own_conn:
+            conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="python -m backend.utils.slots")
+    parser.add_argument("command", choices=["backfill"])
+    parser.add_argument("--batch-size", type=int, default=BACKFILL_BATCH_SIZE)
+    args = parser.parse_args()
+    result = backfill(batch_size=args.batch_size)
+    if result is None:
+        print("another process is backfilling")
+    else:
+        for table, stats in result.items():
+            print(f"{table}: {stats['converted']} converted, {stats['unparsed']} unparseable left as-is")
+            if stats["conflicts"]:
+                print(f"  {len(stats['conflicts'])} double-booked row(s) left without a minute: "
+                      f"{', '.join(map(str, stats['conflicts'][:20]))}")
@@ -0,0 +1,132 @@
+import hashlib
+import os
+import re
+import threading
+import time
+
+from backend.db import add_observer, get_connection
+
+# Slow-query log fed by the backend.db cursor hooks. Statements slower than
+# SLOW_QUERY_MS are grouped by their normalized SQL (literals and placeholders
+# replaced by ?, IN lists and VALUES lists collapsed), and the first time a
+# statement shows up its EXPLAIN plan is captured on a separate connection.
+
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+MAX_STATEMENTS = int(os.getenv("SLOW_QUERY_MAX_STATEMENTS", "500"))
+EXPLAINABLE = ("select", "update", "delete", "insert", "replace")
+
+_entries = {}
+_lock = threading.Lock()
+_local = threading.local()
+
+_COMMENTS = re.compile(r"(--[^\n]*|/\*.*?\*/)", re.S)
+_STRINGS = re.compile(r"'(?:[^'\\]|\\.|'')*'|\"(?:[^\"\\]|\\.)*\"")
+_NUMBERS = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDERS = re.compile(r"%s|%\([^)]+\)s")
+_IN_LISTS = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.I)
+_VALUES_LISTS = re.compile(r"\bVALUES\s*(\([^()]*\))(?:\s*,\s*\([^()]*\))*", re.I)
+_SPACES = re.compile(r"\s+")
+
+
+def normalize(statement):
+    if isinstance(statement, (bytes, bytearray)):
+        statement = statement.decode("utf-8", "replace")
+    sql = _COMMENTS.sub(" ", statement)
+    sql = _STRINGS.sub("?", sql)
+    sql = _PLACEHOLDERS.sub("?", sql)
+    sql = _NUMBERS.sub("?", sql)
+    sql = _IN_LISTS.sub("IN (?+)", sql)
+    sql = _VALUES_LISTS.sub(r"VALUES \1+", sql)
+    return _SPACES.sub(" ", sql).strip()
+
+
+def params_shape(params):
+    if params is None:
+        return None
+    if isinstance(params, dict):
+        return {k: type(v).__name__ for k, v in params.items()}
+    shape = [type(p).__name__ for p in params]
+    if len(shape) > 12:
+        return shape[:12] + [f"... {len(shape)} total"]
+    return shape
+
+
+def _explain(key, statement, params):
+    _local.explaining = True
+    conn = None
+    try:
+        conn = get_connection()
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute(f"EXPLAIN {statement}", params)
+        plan = [{k: (v if isinstance(v, (int, float)) or v is None else str(v)) for k, v in row.items()}
+                for row in cursor.fetchall()]
+        cursor.close()
+    except Exception as e:
+        plan = {"error": str(e)}
+    finally:
+        if conn is not None:
+            conn.close()
+        _local.explaining = False
+    with _lock:
+        if key in _entries:
+            _entries[key]["explain"] = plan
+
+
+def observe(event, seconds, statement=None, params=None, **info):
+    if event != "query" or statement is None or getattr(_local, "explaining", False):
+        return
+    duration_ms = seconds * 1000
+    if duration_ms < SLOW_QUERY_MS:
+        return
+
+    sql = normalize(statement)
+    key = hashlib.sha1(sql.encode("utf-8")).hexdigest()[:16]
+    now = time.time()
+    capture = False
+    with _lock:
+        entry = _entries.get(key)
+        if entry is None:
+            if len(_entries) >= MAX_STATEMENTS:
+                del _entries[min(_entries, key=lambda k: _entries[k]["total_ms"])]
+            entry = _entries[key] = {
+                "id": key,
+                "sql": sql,
+                "params_shape": params_shape(params),
+                "count": 0,
+                "total_ms": 0.0,
+                "max_ms": 0.0,
+                "first_seen": now,
+                "explain": None,
+            }
+            # executemany() reports no params; a templated statement can't be explained then.
+            verb = sql.lstrip("(").split(" ", 1)[0].lower()
+            capture = verb in EXPLAINABLE and not (params is None and _PLACEHOLDERS.search(str(statement)))
+        entry["count"] += 1
+        entry["total_ms"] += duration_ms
+        entry["max_ms"] = max(entry["max_ms"], duration_ms)
+        entry["last_seen"] = now
+
+    if capture:
+        print(f"Slow query ({duration_ms:.1f} ms): {sql}")
+        threading.Thread(target=_explain, args=(key, statement, params), daemon=True).start()
+
+
+def top(limit=20, sort="total_ms"):
+    with _lock:
+        entries = [dict(e) for e in _entries.values()]
+    for e in entries:
+        e["avg_ms"] = round(e["total_ms"] / e["count"], 2) if e["count"] else 0.0
+        e["total_ms"] = round(e["total_ms"], 2)
+        e["max_ms"] = round(e["max_ms"], 2)
+    key = sort if sort in ("total_ms", "max_ms", "avg_ms", "count") else "total_ms"
+    return sorted(entries, key=lambda e: e[key], reverse=True)[:limit]
+
+
+def reset():
+    with _lock:
+        _entries.clear()
+
+
+def init():
+    if SLOW_QUERY_MS > 0:
+        add_observer(observe)
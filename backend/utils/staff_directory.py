@@ -0,0 +1,115 @@
+import os
+import threading
+import time
+
+from backend.db import get_connection
+from backend.utils import cache
+
+# Process-wide copy of the staff roster (a handful of rows that only change
+# when an admin adds a Barber or TattooArtist), indexed by staff id and by
+# specialization, so booking and the staff routes resolve artists without
+# a query.
+#
+# The directory reloads when the "staff" tag of the response cache moves
+# (invalidate() bumps it; with CACHE_BACKEND=sqlite every worker sees the
+# bump), when it is older than STAFF_DIRECTORY_TTL (covers rows edited
+# directly in the database), and, at most every STAFF_DIRECTORY_MISS_RELOAD
+# seconds, when asked for an id it doesn't know (staff added in another
+# worker that didn't see the bump yet).
+
+STAFF_DIRECTORY_TTL = float(os.getenv("STAFF_DIRECTORY_TTL", "300"))
+STAFF_DIRECTORY_MISS_RELOAD = float(os.getenv("STAFF_DIRECTORY_MISS_RELOAD", "5"))
+STAFF_TAG = "staff"
+
+_directory = None  # {"by_id", "by_specialization", "version", "loaded_at"}
+_lock = threading.Lock()
+_stale = False
+_last_miss_reload = 0.0
+
+
+def _load():
+    conn = get_connection()
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute("""
+            SELECT s.id, s.account_id, s.fullname, s.specialization, a.role
+            FROM tbl_staff s
+            LEFT JOIN tbl_accounts a ON a.id = s.account_id
+            ORDER BY s.id
+        """)
+        rows = cursor.fetchall()
+    finally:
+        cursor.close()
+        conn.close()
+
+    by_specialization = {}
+    for row in rows:
+        by_specialization.setdefault((row["specialization"] or "").lower(), []).append(row)
+    return {"by_id": {row["id"]: row for row in rows}, "by_specialization": by_specialization}
+
+
+def reload():
+    global _directory, _stale
+    requested = time.monotonic()
+    with _lock:
+        if _directory is not None and not _stale and _directory["loaded_at"] >= requested:
+            return _directory  # another thread reloaded while we waited
+        # Read the version first: a bump that lands during the load makes the
+        # next access reload again instead of keeping pre-write rows.
+        versions = cache.tag_versions(STAFF_TAG)
+        directory = _load()
+        directory["version"] = versions
+        directory["loaded_at"] = time.monotonic()
+        _directory, _stale = directory, False
+    return directory
+
+
+def _current():
+    directory = _directory
+    if directory is None or _stale or time.monotonic() - directory["loaded_at"] > STAFF_DIRECTORY_TTL:
+        return reload()
+    versions = cache.tag_versions(STAFF_TAG)
+    if versions is not None and versions != directory["version"]:
+        return reload()
+    return directory
+
+
+def get(staff_id):
+    # The staff row ({"id", "account_id", "fullname", "specialization",
+    # "role"}) or None.
+    global _last_miss_reload
+    try:
+        staff_id = int(staff_id)
+    except (TypeError, ValueError):
+        return None
+    member = _current()["by_id"].get(staff_id)
+    if member is None and time.monotonic() - _last_miss_reload > STAFF_DIRECTORY_MISS_RELOAD:
+        _last_miss_reload = time.monotonic()
+        member = reload()["by_id"].get(staff_id)
+    return member
+
+
+def by_specialization(specialization):
+    return list(_current()["by_specialization"].get((specialization or "").lower(), []))
+
+
+def names():
+    # {staff id: fullname}
+    return {staff_id: member["fullname"] for staff_id, member in _current()["by_id"].items()}
+
+
+def invalidate():
+    # Called after a staff write commits: this process reloads on next use,
+    # other workers when they see the "staff" tag move.
+    global _stale
+    _stale = True
+    cache.invalidate(STAFF_TAG)
+
+
+def warm():
+    # Startup load; a database that isn't reachable yet just means the
+    # first request loads it instead.
+    try:
+        reload()
+    except Exception as e:
+        print("Staff directory not loaded at startup:", e)
@@ -0,0 +1,6 @@
+from backend.app import create_app
+
+# WSGI entry point for production servers:
+#   gunicorn -c backend/gunicorn.conf.py backend.wsgi:app
+
+app = create_app()